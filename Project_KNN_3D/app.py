@@ -1,14 +1,33 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import subprocess
 import os
 import json
-import tempfile
+import shutil
+import time
 import base64
-import math
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import hashlib
+import atexit
+import functools
+import threading
 import random  # PENTING: Untuk fitur acak data
+from concurrent.futures import ThreadPoolExecutor, wait
+from blender_pool import BlenderWorkerPool, DEFAULT_WORKERS
+from model_artifact import load_artifact, file_stat
+from dataset_format import resolve
+from data_splitter import reshuffle, SPLIT_RATIO
+from streamlit_knn import run_evaluation
+from visualize_data import render_png
+from job_queue import JobQueue, QueueFull, QUEUED, RUNNING, DONE, RETENTION_SECONDS
+from result_cache import ResultCache, model_version
+from backend_processor import KNN_BACKEND, KNN_CONDENSE
+from stage_metrics import METRICS_LOG, ProfilingFlags, StageTimer, finish, load_metrics, summarize
+import fast_analyzer
+
+POLL_INTERVAL = 1.0  # Detik antar cek status job di tab Home
+ADMIN_WINDOW = 1000  # Analisis terakhir yang dihitung di panel admin (p50/p95)
+# Preview disajikan sebagai file statis (server.enableStaticServing di .streamlit/config.toml):
+# folder static/ di samping app.py tersedia di URL app/static/...
+STATIC_PREVIEW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "preview")
 
 # --- BAGIAN 1: UTILS & HELPER FUNCTIONS ---
 
@@ -26,155 +45,62 @@ def load_local_css(file_name, logo, bg):
     css = css.replace('__BG__', f'data:image/png;base64,{bg_b64}')
     st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
 
+def publish_preview(glb_path):
+    """
+    Tautkan preview ke folder static -> URL relatif. Browser mengunduh GLB secara streaming
+    (bisa di-cache) alih-alih menerima seluruh file sebagai base64 di dalam HTML.
+    Nama file = hash path + mtime, sehingga tidak bisa ditebak dari nama upload.
+    """
+    os.makedirs(STATIC_PREVIEW_DIR, exist_ok=True)
+    stat = os.stat(glb_path)
+    name = hashlib.sha256(f"{os.path.abspath(glb_path)}|{stat.st_mtime_ns}".encode()).hexdigest()[:32] + ".glb"
+    target = os.path.join(STATIC_PREVIEW_DIR, name)
+    if not os.path.exists(target):
+        now = time.time()
+        for old in os.listdir(STATIC_PREVIEW_DIR):  # Retensi sama dengan folder job
+            old = os.path.join(STATIC_PREVIEW_DIR, old)
+            try:
+                if now - os.path.getmtime(old) > RETENTION_SECONDS: os.remove(old)
+            except OSError:
+                pass  # Sudah dihapus sesi lain yang publish bersamaan
+        try:
+            os.link(glb_path, target)
+        except OSError:
+            shutil.copyfile(glb_path, target)
+    return f"app/static/preview/{name}"
+
 def render_3d_viewer(glb_path):
-    with open(glb_path, "rb") as f: b64 = base64.b64encode(f.read()).decode()
+    if st.get_option("server.enableStaticServing"):
+        src = publish_preview(glb_path)
+    else:
+        # Static serving mati -> inline (ukuran preview sudah dibatasi PREVIEW_MAX_BYTES)
+        with open(glb_path, "rb") as f: src = "data:model/gltf-binary;base64," + base64.b64encode(f.read()).decode()
     html = f"""
     <script type="module" src="https://ajax.googleapis.com/ajax/libs/model-viewer/3.1.1/model-viewer.min.js"></script>
     <style> model-viewer {{ width: 100%; height: 500px; background-color: #111418; border-radius: 18px; border: 1px solid #333; }} </style>
-    <model-viewer src="data:model/gltf-binary;base64,{b64}" alt="3D" auto-rotate camera-controls ar shadow-intensity="1"></model-viewer>
+    <model-viewer src="{src}" alt="3D" auto-rotate camera-controls ar shadow-intensity="1"></model-viewer>
     """
     components.html(html, height=520)
 
-# --- CLASS KNN UNTUK STREAMLIT (Agar Tab 2 & 3 jalan tanpa Blender) ---
-class StreamlitKNN:
-    def __init__(self, k=5):
-        self.k = k
-        self.training_data = []
-        self.min_vals = [] 
-        self.max_vals = []
-
-    def fit(self, dataset_path):
-        if os.path.exists(dataset_path):
-            with open(dataset_path, 'r') as f:
-                self.training_data = json.load(f)
-        else: return False
-            
-        self.min_vals = [float('inf')] * 5
-        self.max_vals = [float('-inf')] * 5
-        for row in self.training_data:
-            for i in range(5):
-                val = float(row[i])
-                if val < self.min_vals[i]: self.min_vals[i] = val
-                if val > self.max_vals[i]: self.max_vals[i] = val
-        return True
-
-    def _normalize(self, features):
-        norm = []
-        for i in range(5):
-            denom = self.max_vals[i] - self.min_vals[i]
-            if denom == 0: norm.append(0.0)
-            else: norm.append((features[i] - self.min_vals[i]) / denom)
-        return norm
-
-    def predict(self, input_row):
-        norm_input = self._normalize(input_row)
-        distances = []
-        for row in self.training_data:
-            train_feats = [float(x) for x in row[:5]]
-            norm_train = self._normalize(train_feats)
-            dist = math.sqrt(sum((norm_input[i] - norm_train[i])**2 for i in range(5)))
-            distances.append((row[-1], dist))
-        
-        distances.sort(key=lambda x: x[1])
-        neighbors = [d[0] for d in distances[:self.k]]
-        if not neighbors: return "Unknown"
-        unique_labels = sorted(list(set(neighbors)))
-        return max(unique_labels, key=neighbors.count)
-
-# --- FUNGSI EVALUASI (INI YANG HILANG TADI) ---
-def run_evaluation(test_file, train_file):
-    knn = StreamlitKNN(k=5)
-    # Coba load data latih
-    if not knn.fit(train_file): 
-        return None, None, 0
+def render_result(d, glb_path=None):
+    """Dashboard hasil analisis (result.json) + preview 3D"""
+    st.success("Analysis Complete!")
+    st.markdown("---")
     
-    # Coba load data uji
-    if not os.path.exists(test_file):
-        return None, None, 0
-        
-    with open(test_file, 'r') as f: test_data = json.load(f)
-    
-    correct = 0
-    labels = ["Low-Poly", "Medium-Poly", "High-Poly"]
-    matrix = {l: {l2: 0 for l2 in labels} for l in labels}
+    # Parsing Data
+    poly = f"{d['stats']['poly']:,}"
+    vert = f"{d['stats']['vert']:,}"
+    mat = d['stats']['mat']
+    rig = "Yes ✅" if d['stats']['rig'] else "No ❌"
+    lbl = d['classification'].upper().replace("-", "<br>")
+    price = d['business']['price']
+    render = d['business']['render']
     
-    for row in test_data:
-        actual = row[-1]
-        predicted = knn.predict(row[:5])
-        
-        if predicted == actual: correct += 1
-        if actual in labels and predicted in labels:
-            matrix[actual][predicted] += 1
-            
-    accuracy = (correct / len(test_data)) * 100
-    return matrix, labels, accuracy
-
-# --- APP CONFIG & SETUP ---
-st.set_page_config(page_title="PolyPix AI", page_icon="🧊", layout="wide")
-load_local_css("style.css", "logo.png", "bgr_new.png")
-
-
-with st.sidebar:
-    st.header("⚙️ Settings")
-    exe = st.text_input("Blender Path:", r"D:\blender.exe")
-
-# PATH DATASET
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-TRAIN_FILE = os.path.join(BASE_DIR, "train_dataset.json")
-TEST_FILE = os.path.join(BASE_DIR, "test_dataset.json")
-
-# --- TABS SYSTEM ---
-# [MODIFIKASI] Ubah nama tab jadi bhs Inggris agar CSS Navbar bekerja (Home, Evaluation, 3D Vis)
-tab_main, tab_eval, tab_vis = st.tabs(["Home", "Evaluation", "3D Visualization"])
+    if "HIGH" in lbl: cls="status-high"
+    elif "MEDIUM" in lbl: cls="status-med"
+    else: cls="status-low"
 
-# ================= TAB 1: MAIN ANALYSIS (ORIGINAL) =================
-with tab_main:
-
-    # JUDUL & SIDEBAR
-    st.title("ANALYZE YOUR 3D ASSETS INSTANTLY")
-    st.markdown('<p class="subtitle">Automatic complexity classification & pricing engine for studios.</p>', unsafe_allow_html=True)
-
-    uploaded = st.file_uploader("", type=["blend", "obj"])
-
-    if uploaded:
-        st.write("")
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2: run = st.button("🚀 RUN ANALYSIS", type="primary", use_container_width=True)
-
-        if run:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded.name.split('.')[-1]}") as tmp:
-                tmp.write(uploaded.getvalue())
-                path = tmp.name
-            
-            script = os.path.join(BASE_DIR, "backend_processor.py")
-            res_json = os.path.join(BASE_DIR, "result.json")
-            res_glb = os.path.join(BASE_DIR, "preview.glb")
-
-            with st.spinner('Processing Geometry & AI Classification...'):
-                try:
-                    subprocess.run([exe, "-b", "--python", script, "--", path, res_json, res_glb], capture_output=True)
-                    
-                    if os.path.exists(res_json):
-                        with open(res_json, 'r') as f: d = json.load(f)
-                        
-                        if d["status"] == "success":
-                            st.success("Analysis Complete!")
-                            st.markdown("---")
-                            
-                            # Parsing Data
-                            poly = f"{d['stats']['poly']:,}"
-                            vert = f"{d['stats']['vert']:,}"
-                            mat = d['stats']['mat']
-                            rig = "Yes ✅" if d['stats']['rig'] else "No ❌"
-                            lbl = d['classification'].upper().replace("-", "<br>")
-                            price = d['business']['price']
-                            render = d['business']['render']
-                            
-                            if "HIGH" in lbl: cls="status-high"
-                            elif "MEDIUM" in lbl: cls="status-med"
-                            else: cls="status-low"
-
-                            html_dashboard = f"""
+    html_dashboard = f"""
 <div class="result-container">
 <div class="card">
     <div class="card-title">Technical Stats</div>
@@ -211,15 +137,169 @@ with tab_main:
 </div>
 </div>
 """
-                            st.markdown(html_dashboard, unsafe_allow_html=True)
-                            
-                            st.markdown("### 🧊 Interactive 3D Preview")
-                            if os.path.exists(res_glb): render_3d_viewer(res_glb)
-                        else: st.error("Processing Failed.")
-                    else: st.error("No Result Data.")
-                except Exception as e: st.error(f"Error: {e}")
-                finally:
-                     if os.path.exists(path): os.remove(path)
+    st.markdown(html_dashboard, unsafe_allow_html=True)
+    stats = d['stats']
+    if stats.get('objects', 0) > stats.get('mesh_data', 0):
+        st.caption(f"Instancing: {stats['objects']:,} objek memakai {stats['mesh_data']:,} mesh unik "
+                   f"({stats['unique_poly']:,} poligon unik, {stats['instanced_poly']:,} poligon dari instance)")
+    
+    st.markdown("### 🧊 Interactive 3D Preview")
+    if glb_path: render_3d_viewer(glb_path)
+
+    metrics = d.get("metrics")
+    if metrics:
+        source = ", cache hit" if metrics.get("cached") else ""
+        with st.expander(f"⏱️ Stage Timing ({metrics.get('total_ms', 0):.0f} ms{source})"):
+            st.table([{"Stage": name, "ms": round(ms, 1)} for name, ms in metrics["stages"].items()])
+            if "py_peak_mb" in metrics: st.caption(f"Peak alokasi Python: {metrics['py_peak_mb']:.1f} MB")
+            if metrics.get("profile"): st.code(metrics["profile"], language=None)
+
+@st.cache_resource(show_spinner=False)
+def get_pool_holder():
+    """Satu pool Blender per proses server (bukan per pengaturan); ditutup saat server berhenti"""
+    holder = {"pool": None, "key": None, "lock": threading.Lock()}
+    atexit.register(lambda: holder["pool"] and holder["pool"].close(wait=False))
+    return holder
+
+def get_blender_pool(exe_path, workers):
+    """
+    Pool Blender headless dipakai ulang antar rerun & sesi. Path / jumlah worker berubah -> pool baru
+    dibuat, lalu pool lama ditutup (di background, setelah job yang sedang berjalan selesai).
+    OSError jika Blender tidak bisa dijalankan (pool lama tetap dipakai).
+    """
+    holder = get_pool_holder()
+    with holder["lock"]:
+        if holder["key"] != (exe_path, workers):
+            old = holder["pool"]
+            holder["pool"] = BlenderWorkerPool(exe_path, size=workers)
+            holder["key"] = (exe_path, workers)
+            if old is not None:
+                threading.Thread(target=old.close, daemon=True, name="polypix-pool-close").start()
+        return holder["pool"]
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue():
+    """Satu antrian job per proses server, dipakai bersama semua sesi/pengguna"""
+    return JobQueue()
+
+@st.cache_resource(show_spinner=False)
+def get_reshuffle_state():
+    """Satu reshuffle per proses server: file dataset dipakai bersama semua sesi"""
+    return {"executor": ThreadPoolExecutor(1, thread_name_prefix="polypix-split"), "future": None, "seed": None}
+
+@st.cache_resource(show_spinner=False)
+def get_profiling_flags():
+    """Flag profiling panel admin: satu objek per proses server, dibaca per job (bukan os.environ)"""
+    return ProfilingFlags()
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    return ResultCache()
+
+def run_analysis(path, res_json, res_glb, pool=None, cache=None, version=None, filename=None, flags=None):
+    """
+    Runner job: file yang sama (isi byte + versi model) diambil dari cache hasil.
+    Jika belum ada: OBJ/GLB dianalisis in-process (tanpa Blender), .blend lewat pool Blender.
+    flags: snapshot flag profiling saat job disubmit.
+    """
+    key = cache.make_key(path, version) if cache else None
+    if key:
+        timer = StageTimer(profile=False, trace_memory=False)
+        with timer:
+            with timer.stage("cache_hit"): result = cache.get(key, res_json, res_glb)
+        if result is not None:
+            # Nama file & metrik milik upload ini, bukan milik analisis pertama yang mengisi cache
+            result["filename"] = filename or result.get("filename")
+            finish(timer, result, result["filename"], "cache", cached=True)
+            tmp = f"{res_json}.tmp"   # result.json bisa berupa hardlink ke entri cache -> jangan ditulis di tempat
+            with open(tmp, 'w') as f: json.dump(result, f, indent=4)
+            os.replace(tmp, res_json)
+            return
+
+    if os.path.splitext(path)[1].lower() in fast_analyzer.FAST_FORMATS:
+        fast_analyzer.analyze_file(path, res_json, res_glb, flags=flags)
+    elif not pool.run(path, res_json, res_glb, flags=flags):
+        raise RuntimeError("Worker Blender crash / timeout")
+    if key: cache.put(key, res_json, res_glb)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_evaluation(test_file, train_file, test_stat, train_stat, index="brute"):
+    """run_evaluation sekali per versi dataset; stat (ukuran, mtime) file = kunci cache"""
+    return run_evaluation(test_file, train_file, index)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def vis_png_cached(path, stat, mode):
+    return render_png(path, mode)
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def load_metrics_cached(stat, limit):
+    return load_metrics(limit=limit)
+
+# --- APP CONFIG & SETUP ---
+st.set_page_config(page_title="PolyPix AI", page_icon="🧊", layout="wide")
+load_local_css("style.css", "logo.png", "bgr_new.png")
+
+
+with st.sidebar:
+    st.header("⚙️ Settings")
+    exe = st.text_input("Blender Path:", r"D:\blender.exe")
+    n_workers = st.number_input("Blender Workers:", min_value=1, max_value=8, value=DEFAULT_WORKERS)
+    knn_index = st.selectbox("KNN Search:", ["brute", "kdtree"], help="kdtree: indeks KD-Tree, hasil identik dengan brute-force")
+
+# PATH DATASET
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRAIN_FILE = resolve(os.path.join(BASE_DIR, "train_dataset.pds"))  # .json lama dikonversi otomatis
+TEST_FILE = resolve(os.path.join(BASE_DIR, "test_dataset.pds"))
+
+# --- TABS SYSTEM ---
+# [MODIFIKASI] Ubah nama tab jadi bhs Inggris agar CSS Navbar bekerja (Home, Evaluation, 3D Vis)
+tab_main, tab_eval, tab_vis, tab_admin = st.tabs(["Home", "Evaluation", "3D Visualization", "Admin"])
+
+# ================= TAB 1: MAIN ANALYSIS (ORIGINAL) =================
+with tab_main:
+
+    # JUDUL & SIDEBAR
+    st.title("ANALYZE YOUR 3D ASSETS INSTANTLY")
+    st.markdown('<p class="subtitle">Automatic complexity classification & pricing engine for studios.</p>', unsafe_allow_html=True)
+
+    uploaded = st.file_uploader("", type=["blend", "obj", "glb"])
+
+    if uploaded:
+        st.write("")
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2: run = st.button("🚀 RUN ANALYSIS", type="primary", use_container_width=True)
+
+        if run:
+            try:
+                # Pool Blender diambil di thread script (cache_resource), job berjalan di background
+                ext = os.path.splitext(uploaded.name)[1].lower()
+                pool = None if ext in fast_analyzer.FAST_FORMATS else get_blender_pool(exe, int(n_workers))
+                runner = functools.partial(run_analysis, pool=pool, cache=get_result_cache(),
+                                           version=model_version(TRAIN_FILE, KNN_CONDENSE, KNN_BACKEND),
+                                           filename=uploaded.name, flags=get_profiling_flags().snapshot())
+                st.session_state["job_id"] = get_job_queue().submit(uploaded.name, uploaded.getvalue(), runner)
+            except QueueFull as e: st.warning(str(e))
+            except OSError as e: st.error(f"Blender tidak bisa dijalankan ({exe}): {e}")
+            except Exception as e: st.error(f"Error: {e}")
+
+    # POLLING STATUS JOB (tiap sesi hanya melihat job miliknya sendiri)
+    job_id = st.session_state.get("job_id")
+    if job_id:
+        jobs = get_job_queue()
+        job = jobs.status(job_id)
+        if job is None:
+            st.info("Hasil analisis sebelumnya sudah kedaluwarsa. Silakan jalankan ulang.")
+            del st.session_state["job_id"]
+        elif job["state"] in (QUEUED, RUNNING):
+            if job["state"] == QUEUED: st.info(f"⏳ {job['filename']}: menunggu antrian (posisi {job.get('position', 1)})...")
+            else: st.info(f"⚙️ {job['filename']}: Processing Geometry & AI Classification...")
+            jobs.wait(job_id, POLL_INTERVAL)  # Kembali lebih cepat jika job selesai (mis. cache hit)
+            st.rerun()
+        elif job["state"] == DONE:
+            d = jobs.result(job_id)
+            if d["status"] == "success": render_result(d, jobs.preview_path(job_id))
+            else: st.error(f"Processing Failed. {d.get('message', '')}")
+        else: st.error(f"Error: {job.get('error')}")
 
 # ================= TAB 2: LIVE TRAINING & EVALUATION =================
 with tab_eval:
@@ -228,42 +308,38 @@ with tab_eval:
         st.header("📊 Live Model Evaluation")
         st.caption("Uji validitas model dengan data acak (Real-time).")
     
-    # TOMBOL SAKTI: RETRAIN
+    # TOMBOL SAKTI: RETRAIN (reshuffle streaming di background; UI tetap responsif)
+    reshuffle_state = get_reshuffle_state()
+    future = reshuffle_state["future"]
     with c_btn:
-        if st.button("🔄 Retrain & Reshuffle", help="Kocok ulang dataset dan latih model baru", type="secondary"):
+        if st.button("🔄 Retrain & Reshuffle", help="Kocok ulang dataset dan latih model baru", type="secondary",
+                     disabled=future is not None and not future.done()):
             if os.path.exists(TRAIN_FILE) and os.path.exists(TEST_FILE):
-                with st.spinner("Mengocok ulang data & Melatih model..."):
-                    try:
-                        with open(TRAIN_FILE, 'r') as f: d1 = json.load(f)
-                        with open(TEST_FILE, 'r') as f: d2 = json.load(f)
-                        
-                        full_data = d1 + d2
-                        random.shuffle(full_data)
-                        
-                        split_idx = int(len(full_data) * 0.8)
-                        new_train = full_data[:split_idx]
-                        new_test = full_data[split_idx:]
-                        
-                        with open(TRAIN_FILE, 'w') as f: json.dump(new_train, f)
-                        with open(TEST_FILE, 'w') as f: json.dump(new_test, f)
-                        
-                        st.cache_data.clear() # Reset cache
-                        st.success("Model berhasil dilatih ulang!")
-                    except Exception as e:
-                        st.error(f"Error saat retrain: {e}")
+                seed = random.randrange(1 << 31)
+                future = reshuffle_state["executor"].submit(reshuffle, TRAIN_FILE, TEST_FILE, SPLIT_RATIO, seed)
+                reshuffle_state.update(future=future, seed=seed)
             else:
                 st.error("Dataset tidak lengkap.")
 
+    if future is not None:
+        if not future.done():
+            st.info(f"⏳ Mengocok ulang data (seed {reshuffle_state['seed']})... evaluasi di bawah masih memakai split sebelumnya.")
+        elif st.session_state.get("reshuffle_seen") != reshuffle_state["seed"]:
+            st.session_state["reshuffle_seen"] = reshuffle_state["seed"]
+            # Cache evaluasi/visualisasi ber-kunci stat file -> otomatis memakai split baru
+            if future.exception(): st.error(f"Error saat retrain: {future.exception()}")
+            else: st.success(f"Model berhasil dilatih ulang! (seed {reshuffle_state['seed']})")
+
     # TAMPILAN EVALUASI
     if os.path.exists(TRAIN_FILE) and os.path.exists(TEST_FILE):
-        matrix, labels, acc = run_evaluation(TEST_FILE, TRAIN_FILE)
+        matrix, labels, acc, n_test = cached_evaluation(TEST_FILE, TRAIN_FILE, file_stat(TEST_FILE), file_stat(TRAIN_FILE), knn_index)
         
         if matrix:
             st.markdown("---")
             m1, m2, m3 = st.columns(3)
             m1.metric("Current Accuracy", f"{acc:.2f}%", delta="Live Result")
-            m2.metric("Training Data", f"{len(json.load(open(TRAIN_FILE)))} Samples", "80%")
-            m3.metric("Testing Data", f"{len(json.load(open(TEST_FILE)))} Samples", "20%")
+            m2.metric("Training Data", f"{load_artifact(TRAIN_FILE).n_rows} Samples", "80%")
+            m3.metric("Testing Data", f"{n_test} Samples", "20%")
             
             st.subheader("Confusion Matrix (Real-Time)")
             
@@ -309,38 +385,52 @@ with tab_vis:
     st.header("📈 3D Data Distribution")
     
     if os.path.exists(TRAIN_FILE):
-        with open(TRAIN_FILE, 'r') as f: data = json.load(f)
-        
-        groups = {
-            "Low-Poly": {"x": [], "y": [], "z": [], "c": "green", "m": "o"},
-            "Medium-Poly": {"x": [], "y": [], "z": [], "c": "orange", "m": "^"},
-            "High-Poly": {"x": [], "y": [], "z": [], "c": "red", "m": "x"}
-        }
-
-        for row in data:
-            lbl = row[-1]
-            if lbl in groups:
-                groups[lbl]["x"].append(row[0])
-                groups[lbl]["y"].append(row[1])
-                groups[lbl]["z"].append(row[2])
-                
-        fig = plt.figure(figsize=(10, 6))
-        ax = fig.add_subplot(111, projection='3d')
-        ax.set_facecolor('#0E1117') 
-        fig.patch.set_facecolor('#0E1117')
-        
-        for label, grp in groups.items():
-            ax.scatter(grp["x"], grp["y"], grp["z"], c=grp["c"], marker=grp["m"], label=label)
-
-        ax.set_xlabel('Polygon', color='white')
-        ax.set_ylabel('Vertex', color='white')
-        ax.set_zlabel('Material', color='white')
-        ax.tick_params(axis='x', colors='white')
-        ax.tick_params(axis='y', colors='white')
-        ax.tick_params(axis='z', colors='white')
-        ax.legend(facecolor='#262730', labelcolor='white')
-        
-        st.pyplot(fig)
+        # Agregasi & render di server (lihat visualize_data.py), cache PNG per hash dataset
+        mode = st.radio("Mode:", ["auto", "sample", "bin", "full"], horizontal=True,
+                        help="auto: semua titik untuk dataset kecil, di-bin jika besar | sample: acak per label | bin: grid 3D, ukuran titik = jumlah aset")
+        st.image(vis_png_cached(TRAIN_FILE, file_stat(TRAIN_FILE), mode))
         st.info("Grafik ini membuktikan bahwa data terkelompok dengan baik secara geometri.")
     else:
-        st.warning("Data latih belum tersedia.")
\ No newline at end of file
+        st.warning("Data latih belum tersedia.")
+
+# ================= TAB 4: ADMIN (METRIK PER TAHAP) =================
+with tab_admin:
+    st.header("⏱️ Analysis Metrics")
+    st.caption("Waktu per tahap dari log metrik (semua worker). Dipakai untuk mengarahkan optimasi & menemukan aset bermasalah.")
+
+    # Flag bersama (satu per server), di-snapshot per job -> berlaku untuk analisis berikutnya.
+    # Hanya ditulis saat checkbox diubah; rerun sesi lain tidak menimpa pilihan admin.
+    flags = get_profiling_flags()
+    current = flags.snapshot()
+    c_prof, c_mem = st.columns(2)
+    for col, name, label in ((c_prof, "profile", "cProfile per analisis"), (c_mem, "trace_memory", "Peak memori (tracemalloc)")):
+        with col:
+            key = f"admin_{name}"
+            st.session_state[key] = current[name]
+            st.checkbox(label, key=key, on_change=lambda name=name, key=key: flags.set(name, st.session_state[key]))
+
+    if os.path.exists(METRICS_LOG):
+        records = load_metrics_cached(file_stat(METRICS_LOG), ADMIN_WINDOW)
+        summary = summarize(records)
+        n_cached = sum(1 for r in records if r.get("cached"))
+        st.subheader(f"Per Stage ({len(records) - n_cached} analisis terakhir)")
+        if n_cached: st.caption(f"{n_cached} cache hit tidak dihitung di tabel ini.")
+        st.table([{"Stage": name, "Count": v["count"], "p50 (ms)": round(v["p50"], 1),
+                   "p95 (ms)": round(v["p95"], 1), "Max (ms)": round(v["max"], 1)}
+                  for name, v in summary.items()])
+
+        st.subheader("Slowest Assets")
+        slowest = sorted((r for r in records if "total_ms" in r), key=lambda r: r["total_ms"], reverse=True)[:10]
+        st.table([{"File": r.get("file"), "Backend": r.get("backend"), "Status": r.get("status"),
+                   "Total (ms)": round(r["total_ms"], 1),
+                   "Slowest Stage": max(r["stages"], key=r["stages"].get) if r.get("stages") else "-",
+                   "Peak RSS (MB)": r.get("rss_peak_mb")}
+                  for r in slowest])
+    else:
+        st.info("Belum ada metrik. Jalankan analisis terlebih dahulu.")
+
+# Reshuffle berjalan -> cek lagi setelah seluruh halaman dirender (bukan di tengah tab)
+reshuffle_future = get_reshuffle_state()["future"]
+if reshuffle_future is not None and not reshuffle_future.done():
+    wait([reshuffle_future], timeout=POLL_INTERVAL)
+    st.rerun()
@@ -1,8 +1,33 @@
-import bpy
+try:
+    import bpy  # Hanya tersedia di dalam Blender; modul ini tetap bisa di-import tanpa Blender
+except ImportError:
+    bpy = None
 import sys
 import os
 import json
-import math
+import time
+
+# Blender tidak otomatis memasukkan folder script ke sys.path -> modul pendamping tidak ketemu
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from knn_engine import KNNEngine
+from stage_metrics import StageTimer, finish
+try:
+    from condensation import condensed_dataset  # Butuh numpy
+except ImportError:
+    condensed_dataset = None
+
+# Backend KNN produksi (lihat knn_engine.py). "ivf" = pencarian approximate untuk katalog
+# referensi sangat besar (jutaan aset); kenop akurasi/kecepatan: knn_engine.IVF_N_PROBE
+KNN_BACKEND = "auto"
+# Kondensasi data latih saat fit (lihat condensation.py): None = data penuh, "cnn" / "enn" / "enn+cnn"
+# -> model lebih kecil & query lebih cepat; cek perubahan akurasi dengan `python condensation.py`
+KNN_CONDENSE = None
+
+# Anggaran preview GLB untuk viewer web (bukan export resolusi penuh)
+PREVIEW_MAX_TRIANGLES = 100_000   # Segitiga setelah decimation
+PREVIEW_MAX_BYTES = 8 << 20       # Ukuran file maksimum; lebih dari ini anggaran dibagi dua & diulang
+PREVIEW_TEXTURE_SIZE = 1024       # Sisi terpanjang tekstur (px)
+PREVIEW_ATTEMPTS = 3              # Tetap terlalu besar setelah ini -> tanpa preview
 
 # --- 1. STRUKTUR DATA (OOP: Class Data Transfer Object) ---
 class ModelFeatures:
@@ -13,53 +38,50 @@ class ModelFeatures:
         self.material_count = 0
         self.texture_count = 0
         self.rig_count = 0
+        # Statistik instancing (bukan input KNN): poly/vert di atas dihitung per objek,
+        # unique_* hanya sekali per datablock mesh
+        self.object_count = 0
+        self.mesh_data_count = 0
+        self.unique_polygon_count = 0
+        self.unique_vertex_count = 0
+
+    def instancing_stats(self):
+        """Statistik unique vs instanced untuk result.json["stats"]"""
+        return {
+            "objects": self.object_count, "mesh_data": self.mesh_data_count,
+            "unique_poly": self.unique_polygon_count, "unique_vert": self.unique_vertex_count,
+            "instanced_poly": self.polygon_count - self.unique_polygon_count,
+            "instanced_vert": self.vertex_count - self.unique_vertex_count
+        }
 
 # --- 2. CORE AI ENGINE (OOP: Class Native KNN) ---
-class NativeKNNClassifier:
+class NativeKNNClassifier(KNNEngine):
     """
     Implementasi K-Nearest Neighbors (KNN) murni (Native).
     Dibungkus dalam Class untuk memenuhi standar OOP (Rubrik Nilai 5).
+
+    Perhitungan (Min-Max, Euclidean, voting, backend native/numpy/kdtree) ada di knn_engine.py,
+    dipakai bersama oleh Streamlit & evaluasi -> hasil produksi = hasil evaluasi.
+    Kelas ini hanya menambah input ModelFeatures dan data cadangan jika dataset hilang.
     """
-    def __init__(self, k=5):
-        self.k = k
-        self.training_data = []
-        self.min_vals = []
-        self.max_vals = []
+    def __init__(self, k=5, backend="auto", condense=None, **kwargs):
+        super().__init__(k, backend, **kwargs)
+        self.condense = condense
 
     def fit(self, dataset_path):
-        """
-        Tahap Training: Memuat data & mempelajari skala (Min-Max).
-        """
-        if not os.path.exists(dataset_path):
+        """Tahap Training: Memuat data & mempelajari skala (Min-Max)"""
+        try:
+            if self.condense and condensed_dataset is not None:
+                dataset_path = condensed_dataset(dataset_path, self.condense, self.k)
+            return super().fit(dataset_path)
+        except FileNotFoundError:
             # Fallback data jika file hilang (Safety Net)
             print(f"Warning: {dataset_path} not found. Using dummy fallback.")
-            self.training_data = [
-                [1240, 1350, 1, 1, 0, "Low-Poly"],   
-                [25400, 26100, 5, 3, 1, "Medium-Poly"], 
+            return self.fit_rows([
+                [1240, 1350, 1, 1, 0, "Low-Poly"],
+                [25400, 26100, 5, 3, 1, "Medium-Poly"],
                 [150500, 152000, 10, 8, 1, "High-Poly"]
-            ]
-        else:
-            with open(dataset_path, 'r') as f:
-                self.training_data = json.load(f)
-
-        # Hitung Min-Max untuk Normalisasi
-        self.min_vals = [float('inf')] * 5
-        self.max_vals = [float('-inf')] * 5
-        
-        for row in self.training_data:
-            for i in range(5): # 5 Fitur pertama
-                val = float(row[i])
-                if val < self.min_vals[i]: self.min_vals[i] = val
-                if val > self.max_vals[i]: self.max_vals[i] = val
-
-    def _normalize(self, features):
-        """Method Private untuk normalisasi data (Encapsulation)"""
-        norm = []
-        for i in range(5):
-            denom = self.max_vals[i] - self.min_vals[i]
-            if denom == 0: norm.append(0.0)
-            else: norm.append((features[i] - self.min_vals[i]) / denom)
-        return norm
+            ])
 
     def predict(self, features_obj):
         """
@@ -68,39 +90,13 @@ class NativeKNNClassifier:
         Output: (Label Prediksi, Nilai Raw)
         """
         input_vals = [
-            features_obj.polygon_count, 
+            features_obj.polygon_count,
             features_obj.vertex_count,
-            features_obj.material_count, 
+            features_obj.material_count,
             features_obj.texture_count,
             features_obj.rig_count
         ]
-        
-        norm_input = self._normalize(input_vals)
-        distances = []
-
-        # Hitung Jarak Euclidean ke semua data latih
-        for row in self.training_data:
-            train_feats = [float(x) for x in row[:5]]
-            norm_train = self._normalize(train_feats)
-            
-            # Rumus Euclidean Native
-            dist = math.sqrt(sum((norm_input[i] - norm_train[i])**2 for i in range(5)))
-            distances.append((row[-1], dist)) # Tuple (Label, Jarak)
-        
-        # Urutkan dari jarak terdekat
-        distances.sort(key=lambda x: x[1])
-        
-        # Ambil K tetangga
-        k_neighbors = distances[:self.k]
-        neighbor_labels = [d[0] for d in k_neighbors]
-        
-        # Voting Terbanyak (Mode)
-        if not neighbor_labels: return "Unknown", input_vals
-        # Urutkan label secara abjad dulu agar jika seri, pemenangnya selalu sama (misal: 'High' selalu menang lawan 'Low')
-        unique_labels = sorted(list(set(neighbor_labels))) 
-        prediction = max(unique_labels, key=neighbor_labels.count)
-        
-        return prediction, input_vals
+        return super().predict(input_vals), input_vals
 
 # --- 3. BUSINESS LOGIC ENGINE (OOP: Static Method Wrapper) ---
 class BusinessIntelligence:
@@ -115,109 +111,248 @@ class BusinessIntelligence:
             return {"price": "$45 - $60+", "render": "Heavy", "hw": "High-End GPU (>6GB)"}
 
 # --- 4. MAIN CONTROLLER ---
-def main():
+def classify_features(features, filename, dataset_path, timer=None):
+    """Fitur -> KNN -> Business Logic -> payload result.json (dipakai juga oleh fast_analyzer.py)"""
+    timer = timer or StageTimer(profile=False, trace_memory=False)
+    # --- INSTANTIASI MODEL (Gaya OOP) ---
+    ai_model = NativeKNNClassifier(k=5, backend=KNN_BACKEND, condense=KNN_CONDENSE)
+    with timer.stage("fit"):
+        ai_model.fit(dataset_path) # Training
+    
+    with timer.stage("predict"):
+        prediction, raw_vals = ai_model.predict(features) # Inference
+    market_info = BusinessIntelligence.get_market_analysis(prediction) # Business Logic
+    
+    return {
+        "status": "success",
+        "filename": filename,
+        "stats": {
+            "poly": raw_vals[0], "vert": raw_vals[1], "mat": raw_vals[2],
+            "tex": raw_vals[3], "rig": raw_vals[4],
+            **features.instancing_stats()
+        },
+        "classification": prediction,
+        "business": market_info
+    }
+
+def analyze_file(target_file, output_json_path, output_glb_path=None, startup=None, profile=None,
+                 trace_memory=None):
+    """
+    Analisis satu file 3D -> tulis result.json (dan preview GLB jika diminta).
+    Waktu per tahap (+ profil cProfile/tracemalloc jika diaktifkan) ada di result["metrics"]
+    dan dicatat ke log metrik. startup = detik cold start Blender yang dibayar job ini.
+    """
+    timer = StageTimer(profile, trace_memory)
+    if startup is not None: timer.record("blender_startup", startup)
+    with timer:
+        result_data = _analyze(target_file, output_glb_path, timer)
+    finish(timer, result_data, os.path.basename(target_file), "blender")
+    with open(output_json_path, 'w') as f:
+        json.dump(result_data, f, indent=4)
+
+def _analyze(target_file, output_glb_path, timer):
     try:
-        # Parsing Argument
-        argv = sys.argv
-        if "--" in argv:
-            args = argv[argv.index("--") + 1:]
-            if len(args) < 2: return
-            target_file, output_json_path = args[0], args[1]
-            output_glb_path = args[2] if len(args) > 2 else None
-        else:
-            return 
-        
         # Setup Path Dataset (Menggunakan TRAIN dataset hasil splitting)
         base_dir = os.path.dirname(os.path.abspath(__file__))
-        dataset_path = os.path.join(base_dir, "train_dataset.json") # PENTING: Gunakan data latih
+        dataset_path = os.path.join(base_dir, "train_dataset.pds") # PENTING: Gunakan data latih
         
         # A. LOAD FILE 3D
         ext = os.path.splitext(target_file)[1].lower()
-        if ext == ".blend":
-            bpy.ops.wm.open_mainfile(filepath=target_file)
-       # GANTI BAGIAN INI:
-        elif ext in [".obj", ".glb", ".gltf"]:
-            bpy.ops.wm.read_homefile(use_empty=True) 
-            try:
-                if ext == ".obj":
-                    # Coba pakai importer baru (Blender 4.0+)
-                    if hasattr(bpy.ops.wm, "obj_import"):
-                        bpy.ops.wm.obj_import(filepath=target_file)
-                    # Fallback ke importer lama (Blender 3.6 ke bawah)
-                    else:
-                        bpy.ops.import_scene.obj(filepath=target_file)
-                elif ext in [".glb", ".gltf"]: 
-                    bpy.ops.import_scene.gltf(filepath=target_file)
-            except Exception as e:
-                # Tangkap errornya biar ketahuan di log
-                print(f"Error Importing: {e}")
-                with open(output_json_path, 'w') as f:
-                     json.dump({"status": "error", "message": f"Import Failed: {str(e)}"}, f)
-                return
+        with timer.stage("load"):
+            if ext == ".blend":
+                bpy.ops.wm.open_mainfile(filepath=target_file)
+            elif ext in [".obj", ".glb", ".gltf"]:
+                bpy.ops.wm.read_homefile(use_empty=True) 
+                try:
+                    if ext == ".obj":
+                        # Coba pakai importer baru (Blender 4.0+)
+                        if hasattr(bpy.ops.wm, "obj_import"):
+                            bpy.ops.wm.obj_import(filepath=target_file)
+                        # Fallback ke importer lama (Blender 3.6 ke bawah)
+                        else:
+                            bpy.ops.import_scene.obj(filepath=target_file)
+                    elif ext in [".glb", ".gltf"]: 
+                        bpy.ops.import_scene.gltf(filepath=target_file)
+                except Exception as e:
+                    # Tangkap errornya biar ketahuan di log
+                    print(f"Error Importing: {e}")
+                    return {"status": "error", "message": f"Import Failed: {str(e)}"}
+
         # B. FEATURE EXTRACTION
-        features = ModelFeatures()
-        all_textures = set()
-        has_rig = False
-        mesh_found = False
-        
-        if bpy.context.active_object: bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.select_all(action='DESELECT')
-
-        for obj in bpy.context.scene.objects:
-            if obj.type == 'MESH':
-                mesh_found = True
-                features.polygon_count += len(obj.data.polygons)
-                features.vertex_count += len(obj.data.vertices)
-                features.material_count += len(obj.material_slots)
-                
-                # Cek Tekstur
-                for slot in obj.material_slots:
-                    if slot.material and slot.material.use_nodes and slot.material.node_tree:
-                        for node in slot.material.node_tree.nodes:
-                            if node.type == 'TEX_IMAGE' and node.image:
-                                all_textures.add(node.image.name)
-                
-                # Cek Rigging
-                if any(m.type == 'ARMATURE' for m in obj.modifiers) or (obj.parent and obj.parent.type == 'ARMATURE'):
-                    has_rig = True
-
-        features.texture_count = len(all_textures)
-        features.rig_count = 1 if has_rig else 0
+        with timer.stage("features"):
+            features, mesh_found = extract_scene_features()
 
         # C. AI PREDICTION & OUTPUT
-        result_data = {}
-        if mesh_found:
-            # --- INSTANTIASI MODEL (Gaya OOP) ---
-            ai_model = NativeKNNClassifier(k=5)
-            ai_model.fit(dataset_path) # Training
+        if not mesh_found:
+            return {"status": "error", "message": "No Mesh Found."}
+        result_data = classify_features(features, os.path.basename(target_file), dataset_path, timer)
+
+        # Export GLB Preview jika diminta (ringan, sesuai anggaran)
+        if output_glb_path:
+            with timer.stage("export_preview"):
+                export_preview(output_glb_path)
+        return result_data
+
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _material_images(material):
+    """Nama gambar TEX_IMAGE di node tree satu material"""
+    if not (material.use_nodes and material.node_tree): return frozenset()
+    return frozenset(node.image.name for node in material.node_tree.nodes
+                     if node.type == 'TEX_IMAGE' and node.image)
+
+def extract_scene_features():
+    """
+    Scene Blender aktif -> (ModelFeatures, ada mesh?). Objek yang berbagi datablock mesh /
+    material (foliage, modular kit) dibaca sekali: hitungan mesh di-memo per obj.data dan
+    scan node tree per material -> waktu ~ jumlah data unik, bukan jumlah objek.
+    """
+    features = ModelFeatures()
+    all_textures = set()
+    has_rig = False
+    mesh_found = False
+    mesh_counts = {}       # pointer datablock mesh -> (poly, vert)
+    material_images = {}   # pointer material -> nama gambar
+    
+    if bpy.context.active_object: bpy.ops.object.mode_set(mode='OBJECT')
+    bpy.ops.object.select_all(action='DESELECT')
+
+    for obj in bpy.context.scene.objects:
+        if obj.type == 'MESH':
+            mesh_found = True
+            features.object_count += 1
+            key = obj.data.as_pointer()
+            counts = mesh_counts.get(key)
+            if counts is None:
+                counts = mesh_counts[key] = (len(obj.data.polygons), len(obj.data.vertices))
+                features.unique_polygon_count += counts[0]
+                features.unique_vertex_count += counts[1]
+            features.polygon_count += counts[0]
+            features.vertex_count += counts[1]
+            features.material_count += len(obj.material_slots)
             
-            prediction, raw_vals = ai_model.predict(features) # Inference
-            market_info = BusinessIntelligence.get_market_analysis(prediction) # Business Logic
+            # Cek Tekstur
+            for slot in obj.material_slots:
+                if not slot.material: continue
+                key = slot.material.as_pointer()
+                if key not in material_images:
+                    material_images[key] = _material_images(slot.material)
+                    all_textures |= material_images[key]
             
-            result_data = {
-                "status": "success",
-                "filename": os.path.basename(target_file),
-                "stats": {
-                    "poly": raw_vals[0], "vert": raw_vals[1], "mat": raw_vals[2],
-                    "tex": raw_vals[3], "rig": raw_vals[4]
-                },
-                "classification": prediction,
-                "business": market_info
-            }
-
-            # Export GLB Preview jika diminta
-            if output_glb_path:
-                bpy.ops.export_scene.gltf(filepath=output_glb_path, export_format='GLB')
-        else:
-            result_data = {"status": "error", "message": "No Mesh Found."}
-
-        with open(output_json_path, 'w') as f:
-            json.dump(result_data, f, indent=4)
+            # Cek Rigging
+            if not has_rig and (any(m.type == 'ARMATURE' for m in obj.modifiers) or
+                                (obj.parent and obj.parent.type == 'ARMATURE')):
+                has_rig = True
 
-    except Exception as e:
-        err = {"status": "error", "message": str(e)}
-        if 'output_json_path' in locals():
-            with open(output_json_path, 'w') as f: json.dump(err, f)
+    features.mesh_data_count = len(mesh_counts)
+    features.texture_count = len(all_textures)
+    features.rig_count = 1 if has_rig else 0
+    return features, mesh_found
+
+def _shrink_images(max_size):
+    for img in bpy.data.images:
+        w, h = img.size
+        if max(w, h) <= max_size: continue
+        scale = max_size / max(w, h)
+        try:
+            img.scale(max(1, int(w * scale)), max(1, int(h * scale)))
+        except RuntimeError:
+            pass  # Gambar tanpa data piksel (file hilang) -> diekspor apa adanya
+
+def _export_glb(path):
+    try:
+        bpy.ops.export_scene.gltf(filepath=path, export_format='GLB', export_apply=True,
+                                  export_draco_mesh_compression_enable=True,
+                                  export_draco_mesh_compression_level=6)
+    except (TypeError, RuntimeError):
+        # Build Blender tanpa library Draco -> geometri tanpa kompresi
+        bpy.ops.export_scene.gltf(filepath=path, export_format='GLB', export_apply=True)
+
+def export_preview(output_glb_path, max_triangles=PREVIEW_MAX_TRIANGLES, max_bytes=PREVIEW_MAX_BYTES,
+                   texture_size=PREVIEW_TEXTURE_SIZE):
+    """
+    Preview GLB untuk viewer: semua mesh di-decimate (modifier Decimate, diterapkan saat export)
+    ke anggaran segitiga, tekstur diperkecil & geometri dikompresi Draco. Jika file masih lebih
+    besar dari max_bytes, anggaran dibagi dua lalu diulang. Dipanggil setelah fitur dihitung,
+    jadi scene boleh diubah (di-reset sebelum job berikutnya). Return False jika tanpa preview.
+    """
+    meshes = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+    # Jumlah segitiga = sum(sisi - 2) per polygon = loops - 2 * polygons (tanpa loop per polygon)
+    triangles = sum(len(obj.data.loops) - 2 * len(obj.data.polygons) for obj in meshes)
+    modifiers = [obj.modifiers.new("PolyPixPreview", 'DECIMATE') for obj in meshes]
+
+    tmp = output_glb_path + ".tmp.glb"  # Exporter menambah ekstensi jika bukan .glb
+    for _ in range(PREVIEW_ATTEMPTS):
+        ratio = min(1.0, max_triangles / triangles) if triangles else 1.0
+        for mod in modifiers: mod.ratio = ratio
+        _shrink_images(texture_size)
+        _export_glb(tmp)
+        if os.path.getsize(tmp) <= max_bytes:
+            os.replace(tmp, output_glb_path)
+            return True
+        max_triangles //= 2
+        texture_size //= 2
+    os.remove(tmp)
+    print(f"Preview dilewati: masih > {max_bytes} byte setelah {PREVIEW_ATTEMPTS} percobaan")
+    return False
+
+# --- 5. WORKER MODE (Dipakai oleh blender_pool.py) ---
+WORKER_MARKER = "@@POLYPIX_JOB@@"
+
+def reset_scene():
+    """Kosongkan scene agar job berikutnya tidak tercampur data job sebelumnya"""
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+def serve_worker(startup=None):
+    """
+    Loop request untuk Blender yang hidup terus (tanpa cold start per file).
+    Input  (stdin) : satu baris JSON per job {"id", "target", "out_json", "out_glb", "profile", "trace_memory"}
+    Output (stdout): satu baris "WORKER_MARKER {"id", "status"}" setelah job selesai
+    Cold start (startup detik) dicatat pada job pertama saja.
+    """
+    def reply(payload):
+        sys.stdout.write(f"{WORKER_MARKER} {json.dumps(payload)}\n")
+        sys.stdout.flush()
+
+    reply({"id": None, "status": "ready"})
+    for line in sys.stdin:
+        line = line.strip()
+        if not line: continue
+        try:
+            job = json.loads(line)
+        except ValueError:
+            continue
+        if job.get("cmd") == "exit": break
+
+        reset_scene()
+        analyze_file(job["target"], job["out_json"], job.get("out_glb"), startup=startup,
+                     profile=job.get("profile"), trace_memory=job.get("trace_memory"))
+        startup = None
+        reset_scene()
+        reply({"id": job.get("id"), "status": "done"})
+
+def main():
+    # Parsing Argument
+    argv = sys.argv
+    if "--" in argv:
+        args = argv[argv.index("--") + 1:]
+    else:
+        return
+
+    # --spawned <epoch>: waktu proses Blender dijalankan -> cold start ikut tercatat di metrik
+    startup = None
+    if len(args) > 1 and args[0] == "--spawned":
+        startup = max(0.0, time.time() - float(args[1]))
+        args = args[2:]
+
+    if args and args[0] == "--worker":
+        serve_worker(startup)
+        return
+
+    if len(args) < 2: return
+    output_glb_path = args[2] if len(args) > 2 else None
+    analyze_file(args[0], args[1], output_glb_path, startup=startup)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import itertools
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import fast_analyzer
+from stage_metrics import StageTimer, finish
+from blender_pool import BlenderWorkerPool, DEFAULT_WORKERS, JOB_TIMEOUT
+from deadline_pool import DeadlinePool, OK, TIMEOUT, CRASH
+
+# --- KONFIGURASI ---
+SUPPORTED_FORMATS = (".blend",) + fast_analyzer.FAST_FORMATS
+WORKERS = max(1, (os.cpu_count() or 2) - 1)   # Proses jalur cepat (OBJ/GLB/glTF tanpa Blender)
+RETRIES = 2                                    # Percobaan ulang per aset jika worker crash / timeout
+FAST_TIMEOUT = 120                             # Detik per aset di jalur cepat
+KILL_GRACE = 5                                 # Detik tambahan sebelum worker yang macet di-terminate induk
+POLL_INTERVAL = 0.1                            # Detik antar cek hasil Blender saat jalur cepat juga berjalan
+CLASSES = ["Low-Poly", "Medium-Poly", "High-Poly"]
+
+# --- 1. DAFTAR ASET ---
+def collect_assets(source):
+    """Folder (rekursif) atau manifest teks (satu path per baris, '#' = komentar) -> list path"""
+    if os.path.isdir(source):
+        assets = []
+        for root, dirs, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(SUPPORTED_FORMATS):
+                    assets.append(os.path.join(root, name))
+        return sorted(assets)  # Urutan stabil antar OS/filesystem
+
+    base = os.path.dirname(os.path.abspath(source))
+    assets = []
+    with open(source, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            # Path relatif di manifest dihitung dari folder manifest
+            assets.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return assets
+
+# --- 2. WORKER ---
+class AssetTimeout(BaseException):
+    # BaseException: tidak ikut tertangkap "except Exception" di dalam analyzer
+    pass
+
+def _on_alarm(signum, frame):
+    raise AssetTimeout()
+
+def analyze_fast(path, timeout=FAST_TIMEOUT):
+    """
+    Jalur cepat (di proses worker): stream counter + KNN. Timeout dihentikan rapi via SIGALRM
+    jika tersedia (POSIX); batas keras di semua OS ditegakkan DeadlinePool di proses induk.
+    """
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)   # Presisi sub-detik (alarm(int) -> 0 = mati)
+    try:
+        timer = StageTimer()
+        with timer:
+            result = fast_analyzer.analyze(path, timer=timer)
+        return finish(timer, result, os.path.basename(path), "fast")
+    except AssetTimeout:
+        raise TimeoutError(f"timeout > {timeout}s")
+    finally:
+        if use_alarm: signal.setitimer(signal.ITIMER_REAL, 0)
+
+def analyze_blend(pool, path, workdir, job_no):
+    """Jalur Blender (di thread): job dikirim ke pool Blender headless, hasil dibaca dari result.json sementara"""
+    out_json = os.path.join(workdir, f"job_{job_no}.json")
+    try:
+        if not pool.run(path, out_json) or not os.path.exists(out_json):
+            raise RuntimeError("Worker Blender crash / timeout")
+        with open(out_json, 'r') as f:
+            return json.load(f)
+    finally:
+        if os.path.exists(out_json): os.remove(out_json)
+
+# --- 3. BATCH RUNNER ---
+class BatchRunner:
+    """
+    Analisis banyak aset secara konkuren: OBJ/GLB/glTF di process pool (skala per core),
+    .blend di pool Blender headless. Aset yang worker-nya crash / timeout dicoba ulang
+    hingga `retries` kali; hasil "status: error" dari analyzer (file rusak, tanpa mesh)
+    sudah final dan tidak diulang.
+    Jalur cepat memakai DeadlinePool: satu aset per proses worker, deadline dihitung sejak
+    aset mulai diproses, dan worker yang macet / mati di-terminate & diganti. Crash maupun
+    timeout hanya menggagalkan aset milik worker itu sendiri (juga di Windows tanpa SIGALRM).
+    """
+    def __init__(self, workers=WORKERS, blender_exe=None, blender_workers=DEFAULT_WORKERS,
+                 retries=RETRIES, timeout=FAST_TIMEOUT, blender_timeout=JOB_TIMEOUT):
+        self.workers = workers
+        self.blender_exe = blender_exe
+        self.blender_workers = blender_workers
+        self.retries = retries
+        self.timeout = timeout
+        self.blender_timeout = blender_timeout
+        self.summary = Counter()
+        self.retried = 0
+
+    def _finish(self, emit, path, result):
+        record = {"path": path}
+        record.update(result)
+        record.setdefault("filename", os.path.basename(path))
+        self.summary[result.get("classification", "Unknown") if result.get("status") == "success" else "error"] += 1
+        emit(record)
+
+    def run(self, assets, emit):
+        """Proses semua aset; emit(record) dipanggil sekali per aset segera setelah aset selesai"""
+        fast, blend = [], []
+        for path in assets:
+            ext = os.path.splitext(path)[1].lower()
+            if ext in fast_analyzer.FAST_FORMATS: fast.append(path)
+            elif ext == ".blend" and self.blender_exe: blend.append(path)
+            elif ext == ".blend": self._finish(emit, path, {"status": "error", "message": "Path Blender belum diatur (--blender)."})
+            else: self._finish(emit, path, {"status": "error", "message": f"Format tidak didukung: {ext}"})
+
+        # Worker berhenti sendiri via SIGALRM (POSIX); KILL_GRACE = batas keras di sisi induk
+        deadline = self.timeout + KILL_GRACE if self.timeout else None
+        fast_pool = DeadlinePool(analyze_fast, self.workers, timeout=deadline) if fast else None
+        blender_pool = BlenderWorkerPool(self.blender_exe, size=self.blender_workers,
+                                         timeout=self.blender_timeout, retries=0) if blend else None
+        blend_executor = ThreadPoolExecutor(self.blender_workers) if blend else None
+        workdir = tempfile.mkdtemp(prefix="polypix_batch_")
+        job_ids = itertools.count(1)
+        attempts = Counter()
+        blend_pending = {}  # future -> path
+
+        def submit(path):
+            attempts[path] += 1
+            if path.lower().endswith(".blend"):
+                blend_pending[blend_executor.submit(analyze_blend, blender_pool, path, workdir, next(job_ids))] = path
+            else:
+                fast_pool.submit(path, path, self.timeout)
+
+        def failed(path, error):
+            if attempts[path] <= self.retries:
+                self.retried += 1
+                submit(path)
+            else:
+                self._finish(emit, path, {"status": "error",
+                                          "message": f"Gagal setelah {attempts[path]} percobaan: {error}"})
+
+        try:
+            for path in blend + fast: submit(path)
+            while blend_pending or (fast_pool and len(fast_pool)):
+                if fast_pool and len(fast_pool):
+                    for path, status, value in fast_pool.poll(POLL_INTERVAL if blend_pending else None):
+                        if status == OK: self._finish(emit, path, value)
+                        elif status == TIMEOUT: failed(path, f"timeout > {self.timeout}s (worker dihentikan)")
+                        elif status == CRASH: failed(path, f"worker crash (exit code {value})")
+                        else: failed(path, value)
+                else:
+                    wait(blend_pending, return_when=FIRST_COMPLETED)
+                for fut in [f for f in blend_pending if f.done()]:
+                    path = blend_pending.pop(fut)
+                    try:
+                        result = fut.result()
+                    except Exception as e:
+                        failed(path, e)
+                        continue
+                    self._finish(emit, path, result)
+        finally:
+            if fast_pool: fast_pool.close()
+            if blend_executor: blend_executor.shutdown(cancel_futures=True)
+            if blender_pool: blender_pool.close()
+            try: os.rmdir(workdir)
+            except OSError: pass
+
+# --- 4. CLI ---
+def print_summary(runner, total, elapsed, out):
+    print("-" * 40, file=out)
+    print("RINGKASAN BATCH ANALYSIS", file=out)
+    print("-" * 40, file=out)
+    for label in CLASSES + sorted(k for k in runner.summary if k not in CLASSES and k != "error"):
+        print(f"{label:<12}: {runner.summary[label]}", file=out)
+    print(f"{'Error':<12}: {runner.summary['error']}", file=out)
+    print(f"{'Retry':<12}: {runner.retried}", file=out)
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Total {total} aset dalam {elapsed:.1f} detik ({rate:.1f} aset/detik)", file=out)
+
+def main():
+    parser = argparse.ArgumentParser(description="Analisis batch aset 3D (.blend/.obj/.glb/.gltf) -> JSONL")
+    parser.add_argument("source", help="Folder aset (rekursif) atau file manifest (satu path per baris)")
+    parser.add_argument("--out", help="File JSONL output (default: stdout)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Jumlah proses jalur cepat OBJ/GLB/glTF")
+    parser.add_argument("--blender", help="Path executable Blender (wajib untuk file .blend)")
+    parser.add_argument("--blender-workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--retries", type=int, default=RETRIES, help="Percobaan ulang per aset saat crash/timeout")
+    parser.add_argument("--timeout", type=float, default=FAST_TIMEOUT, help="Detik per aset (jalur cepat)")
+    args = parser.parse_args()
+
+    assets = collect_assets(args.source)
+    if not assets:
+        print(f"GAGAL: Tidak ada aset 3D di {args.source}", file=sys.stderr)
+        sys.exit(1)
+
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    log = sys.stdout if args.out else sys.stderr  # Log & ringkasan tidak boleh tercampur dengan JSONL di stdout
+    done = 0
+
+    def emit(record):
+        nonlocal done
+        done += 1
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        if args.out:
+            print(f"[{done}/{len(assets)}] {record['filename']} -> "
+                  f"{record.get('classification') or 'ERROR: ' + record.get('message', '')}", file=log)
+
+    runner = BatchRunner(workers=args.workers, blender_exe=args.blender, blender_workers=args.blender_workers,
+                         retries=args.retries, timeout=args.timeout)
+    start = time.perf_counter()
+    try:
+        runner.run(assets, emit)
+    finally:
+        if args.out: out.close()
+    print_summary(runner, len(assets), time.perf_counter() - start, log)
+
+if __name__ == "__main__":
+    main()
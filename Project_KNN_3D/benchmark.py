@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import argparse
+import itertools
+import tempfile
+import tracemalloc
+import numpy as np
+
+import model_artifact
+import dataset_format
+import model_evaluation
+import process_local
+import fast_analyzer
+from backend_processor import NativeKNNClassifier, ModelFeatures
+from streamlit_knn import run_evaluation
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "..", "3d_model", "Models")   # Model Kenney bawaan repo
+BASELINE_FILE = os.path.join(BASE_DIR, "benchmark_baseline.json")
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000, "1m": 1000000}
+DEFAULT_SIZES = "1k,10k"
+N_QUERIES = 200            # Sampel latency per benchmark prediksi
+NATIVE_MAX_ROWS = 10000    # Jalur Python murni dilewati di atas ukuran ini (terlalu lama)
+IVF_PROBES = (1, 4, 8, 16) # Kenop n_probe backend ivf (approximate) yang diukur latency & recall-nya
+THRESHOLD = 1.25           # Gagal jika p50 > baseline * THRESHOLD
+MIN_REGRESSION_MS = 1.0    # ...dan selisihnya > nilai ini (timing sub-milidetik terlalu bising)
+
+# --- 1. DATASET SINTETIS ---
+def make_synthetic(n, seed=0):
+    """Baris [Poly, Vert, Mat, Tex, Rig, Label] dengan heuristik label yang sama seperti mining"""
+    rng = np.random.default_rng(seed)
+    poly = np.exp(rng.uniform(np.log(50), np.log(2_000_000), n)).astype(np.int64)
+    vert = (poly * rng.uniform(0.5, 1.5, n)).astype(np.int64)
+    mat = np.maximum(1, poly // 5000) + rng.integers(0, 3, n)
+    label = np.where(poly < 5000, "Low-Poly", np.where(poly < 50000, "Medium-Poly", "High-Poly"))
+    tex = np.where(label == "Low-Poly", 1, rng.integers(1, 6, n))
+    rig = ((label == "High-Poly") & (rng.random(n) > 0.5)).astype(np.int64)
+    return [[int(p), int(v), int(m), int(t), int(r), str(l)]
+            for p, v, m, t, r, l in zip(poly, vert, mat, tex, rig, label)]
+
+def to_features(row):
+    f = ModelFeatures()
+    f.polygon_count, f.vertex_count, f.material_count, f.texture_count, f.rig_count = row[:5]
+    return f
+
+# --- 2. PENGUKURAN ---
+def measure(name, n, fn, repeat=1, items=1):
+    """
+    Jalankan fn() sebanyak repeat kali. Catat latency (p50/p95/p99), throughput
+    (items per detik berdasarkan p50) dan puncak memori Python (tracemalloc, termasuk numpy).
+    Timing diukur tanpa tracemalloc (overhead-nya memperlambat alokasi hingga beberapa kali);
+    puncak memori diambil dari satu panggilan tambahan terpisah setelahnya.
+    """
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    times = np.array(times) * 1000.0
+    p50 = float(np.percentile(times, 50))
+    result = {
+        "name": name, "n": n,
+        "p50_ms": p50,
+        "p95_ms": float(np.percentile(times, 95)),
+        "p99_ms": float(np.percentile(times, 99)),
+        "throughput": items / (p50 / 1000.0) if p50 > 0 else float('inf'),
+        "peak_mb": peak / (1 << 20),
+    }
+    print(f"{name:<28} n={n:<8} p50={result['p50_ms']:>10.3f}ms  p95={result['p95_ms']:>10.3f}ms  "
+          f"p99={result['p99_ms']:>10.3f}ms  {result['throughput']:>12.1f}/s  peak={result['peak_mb']:.1f}MB")
+    return result
+
+def measure_ivf(n, train_path, test, queries):
+    """Latency predict backend ivf per n_probe + recall & kesesuaian label vs jalur exact"""
+    results = []
+    model = NativeKNNClassifier(k=5, backend="ivf")
+    results.append(measure("fit_ivf", n, lambda: model.fit(train_path), repeat=3))
+    for n_probe in IVF_PROBES:
+        model.n_probe = n_probe
+        it = itertools.cycle(queries)
+        result = measure(f"predict_ivf_p{n_probe}", n, lambda: model.predict(next(it)), repeat=len(queries))
+        result.update(model.recall(test))
+        print(f"{'':<28} recall@5={result['recall']:.4f}  label sama={result['label_agreement']:.4f}")
+        results.append(result)
+    return results
+
+def bench_knn(n, workdir):
+    results = []
+    rows = make_synthetic(n)
+    split = int(n * 0.8)
+    json_path = os.path.join(workdir, f"train_{n}.json")      # Format lama, pembanding load
+    train_path = os.path.join(workdir, f"train_{n}.pds")
+    test_path = os.path.join(workdir, f"test_{n}.pds")
+    with open(json_path, 'w') as f: json.dump(rows[:split], f)
+    dataset_format.save_rows(train_path, rows[:split])
+    dataset_format.save_rows(test_path, rows[split:])
+    train, test = rows[:split], rows[split:]
+    queries = [to_features(r) for r in test[:N_QUERIES]]
+
+    def load_json():
+        with open(json_path, 'r') as f: json.load(f)
+    results.append(measure("json_load", n, load_json, repeat=3, items=split))
+    results.append(measure("pds_load_rows", n, lambda: dataset_format.load_rows(train_path), repeat=3, items=split))
+    results.append(measure("pds_load_features", n, lambda: dataset_format.load_dataset(train_path).features(),
+                           repeat=3, items=split))
+
+    def build_artifact():
+        shutil.rmtree(model_artifact.artifact_dir(train_path), ignore_errors=True)
+        model_artifact._CACHE.clear()
+        model_artifact.load_artifact(train_path)
+    results.append(measure("artifact_build", n, build_artifact, repeat=1, items=split))
+
+    def load_artifact_cold():
+        model_artifact._CACHE.clear()
+        model_artifact.load_artifact(train_path)
+    results.append(measure("artifact_load", n, load_artifact_cold, repeat=5))
+
+    backends = ["numpy", "kdtree"] + (["native"] if split <= NATIVE_MAX_ROWS else [])
+    for backend in backends:
+        model = NativeKNNClassifier(k=5, backend=backend)
+        results.append(measure(f"fit_{backend}", n, lambda: model.fit(train_path), repeat=3, items=split))
+        it = itertools.cycle(queries)
+        results.append(measure(f"predict_{backend}", n, lambda: model.predict(next(it)), repeat=len(queries)))
+
+    results += measure_ivf(n, train_path, test, queries)
+
+    model = NativeKNNClassifier(k=5, backend="numpy")
+    model.fit(train_path)
+    results.append(measure("predict_batch_numpy", n, lambda: model.predict_batch(test), repeat=3, items=len(test)))
+
+    results.append(measure("streamlit_run_evaluation", n, lambda: run_evaluation(test_path, train_path),
+                           repeat=3, items=len(test)))
+
+    results.append(measure("eval_predict_knn_batch", n,
+                           lambda: model_evaluation.predict_knn_batch(test, train),
+                           repeat=3, items=len(test)))
+    if split <= NATIVE_MAX_ROWS:
+        it = itertools.cycle(test[:N_QUERIES])
+        results.append(measure("eval_predict_knn_single", n,
+                               lambda: model_evaluation.predict_knn_batch([next(it)], train, index="native"),
+                               repeat=min(N_QUERIES, len(test))))
+    return results
+
+def bench_extraction():
+    """Ekstraksi fitur pada model Kenney bawaan (GLB + OBJ)"""
+    files = sorted(glob.glob(os.path.join(MODELS_DIR, "GLB format", "*.glb")))
+    files += sorted(glob.glob(os.path.join(MODELS_DIR, "OBJ format", "*.obj")))
+    if not files:
+        print(f"(lewati ekstraksi: model tidak ditemukan di {MODELS_DIR})")
+        return []
+    results = []
+    process_local.SOURCE_FOLDER = MODELS_DIR  # Key cache & seed RNG file non-Objaverse relatif ke folder ini
+    it = itertools.cycle(files)
+    results.append(measure("process_local_extract", len(files),
+                           lambda: process_local.extract_features(next(it)), repeat=len(files)))
+    it = itertools.cycle(files)
+    results.append(measure("fast_analyzer_features", len(files),
+                           lambda: fast_analyzer.extract_features(next(it)), repeat=len(files)))
+    return results
+
+# --- 3. BASELINE & REGRESI ---
+def result_key(r):
+    return f"{r['name']}@{r['n']}"
+
+def check_regressions(results, baseline, threshold):
+    failures = []
+    for r in results:
+        base = baseline.get(result_key(r))
+        if not base: continue
+        if r["p50_ms"] > base["p50_ms"] * threshold and r["p50_ms"] - base["p50_ms"] > MIN_REGRESSION_MS:
+            failures.append(f"{result_key(r)}: p50 {r['p50_ms']:.3f}ms > baseline {base['p50_ms']:.3f}ms x {threshold}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline klasifikasi PolyPix")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Daftar ukuran dataset: 1k,10k,100k,1m")
+    parser.add_argument("--no-extract", action="store_true", help="Lewati benchmark ekstraksi fitur")
+    parser.add_argument("--save-baseline", action="store_true", help="Simpan hasil sebagai baseline baru")
+    parser.add_argument("--check", action="store_true", help="Gagal (exit 1) jika ada regresi vs baseline (exit 2 jika baseline belum ada)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--json", help="Tulis semua hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes.split(","):
+            n = SIZES[size.strip().lower()]
+            print(f"\n=== DATASET SINTETIS {size} ({n} baris) ===")
+            results += bench_knn(n, workdir)
+    if not args.no_extract:
+        print("\n=== EKSTRAKSI FITUR (Kenney 3d_model) ===")
+        results += bench_extraction()
+
+    if args.json:
+        with open(args.json, 'w') as f: json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f: baseline = json.load(f)
+        baseline.update({result_key(r): r for r in results})
+        with open(args.baseline, 'w') as f: json.dump(baseline, f, indent=2)
+        print(f"\nBaseline disimpan ke {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            # Baseline spesifik mesin -> tidak di-commit, dibuat sekali di mesin yang menjalankan --check
+            print(f"\nERROR: Baseline {args.baseline} belum ada. Buat dulu di mesin ini:\n"
+                  f"  python benchmark.py --sizes {args.sizes} --save-baseline")
+            sys.exit(2)
+        with open(args.baseline, 'r') as f: baseline = json.load(f)
+        failures = check_regressions(results, baseline, args.threshold)
+        if failures:
+            print("\nREGRESI TERDETEKSI:")
+            for line in failures: print(f"  - {line}")
+            sys.exit(1)
+        print("\nTidak ada regresi.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import queue
+import subprocess
+import threading
+import itertools
+
+from stage_metrics import profiling_flags
+from backend_processor import WORKER_MARKER   # Satu definisi protokol untuk pool & worker
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_SCRIPT = os.path.join(BASE_DIR, "backend_processor.py")
+DEFAULT_WORKERS = 2
+MAX_JOBS_PER_WORKER = 50            # Restart worker setelah N job (cegah memory leak Blender)
+JOB_TIMEOUT = 300                   # Detik, per job
+
+class BlenderWorker:
+    """
+    Satu proses Blender headless yang menjalankan backend_processor.py dalam mode --worker.
+    Komunikasi lewat pipe: job dikirim sebagai baris JSON ke stdin, balasan dibaca dari
+    baris stdout yang diawali WORKER_MARKER (log Blender lainnya diabaikan).
+    """
+    def __init__(self, exe, script=BACKEND_SCRIPT):
+        self.exe = exe
+        self.script = script
+        self.proc = None
+        self.jobs_done = 0
+        self._replies = None
+        self.start()
+
+    def start(self):
+        self.proc = subprocess.Popen(
+            [self.exe, "-b", "--python", self.script, "--", "--spawned", repr(time.time()), "--worker"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", errors="replace", bufsize=1
+        )
+        self.jobs_done = 0
+        self._replies = queue.Queue()
+        # Thread pembaca agar pipe stdout selalu dikuras (Blender cukup "cerewet")
+        threading.Thread(target=self._read_stdout, args=(self.proc, self._replies), daemon=True).start()
+
+    @staticmethod
+    def _read_stdout(proc, replies):
+        for line in proc.stdout:
+            if line.startswith(WORKER_MARKER):
+                try:
+                    replies.put(json.loads(line[len(WORKER_MARKER):]))
+                except ValueError:
+                    pass
+        replies.put(None)  # EOF -> proses mati
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def stop(self):
+        if self.proc is None: return
+        try:
+            if self.alive():
+                self.proc.stdin.write(json.dumps({"cmd": "exit"}) + "\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout=10)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self.proc.kill()
+        self.proc = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def run_job(self, job_id, target_file, output_json_path, output_glb_path=None, timeout=JOB_TIMEOUT,
+                flags=None):
+        """
+        Kirim satu job, tunggu balasan. Return True jika worker menyelesaikan job.
+        flags: {"profile", "trace_memory"} per job (None -> environment proses ini).
+        """
+        job = {"id": job_id, "target": target_file, "out_json": output_json_path, "out_glb": output_glb_path,
+               **(profiling_flags() if flags is None else flags)}  # Per job -> tanpa restart worker
+        try:
+            self.proc.stdin.write(json.dumps(job) + "\n")
+            self.proc.stdin.flush()
+        except (OSError, ValueError):
+            return False
+
+        while True:
+            try:
+                reply = self._replies.get(timeout=timeout)
+            except queue.Empty:
+                return False  # Timeout -> dianggap hang
+            if reply is None: return False  # Crash di tengah job
+            if reply.get("id") == job_id:
+                self.jobs_done += 1
+                return True
+            # Balasan lain (mis. "ready" saat startup) dilewati
+
+class BlenderWorkerPool:
+    """
+    Pool Blender headless yang hidup lama: biaya cold start dibayar sekali per worker,
+    bukan sekali per aset. Worker di-restart setelah MAX_JOBS_PER_WORKER job, saat crash,
+    atau saat timeout.
+    """
+    def __init__(self, exe, size=DEFAULT_WORKERS, max_jobs=MAX_JOBS_PER_WORKER,
+                 timeout=JOB_TIMEOUT, retries=1, script=BACKEND_SCRIPT):
+        self.exe = exe
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.retries = retries
+        self._ids = itertools.count(1)
+        self._closed = threading.Event()
+        self._workers = []
+        try:
+            for _ in range(size): self._workers.append(BlenderWorker(exe, script))
+        except OSError:
+            self.close()   # Path Blender salah dsb. -> worker yang sudah jalan ikut dihentikan
+            raise
+        self._idle = queue.Queue()
+        for w in self._workers: self._idle.put(w)
+
+    def run(self, target_file, output_json_path, output_glb_path=None, flags=None):
+        """
+        Analisis satu file (blocking). Output sama persis dengan pemanggilan
+        `blender -b --python backend_processor.py -- target out_json out_glb`.
+        Return True jika job selesai (status sukses/gagal ada di out_json).
+        RuntimeError jika pool sudah ditutup (mis. diganti karena pengaturan berubah).
+        flags: flag profiling untuk job ini (lihat BlenderWorker.run_job).
+        """
+        while True:
+            if self._closed.is_set(): raise RuntimeError("Pool Blender sudah ditutup")
+            try:
+                worker = self._idle.get(timeout=1.0)
+                break
+            except queue.Empty:
+                continue
+        try:
+            for _ in range(self.retries + 1):
+                if not worker.alive(): worker.restart()
+                if worker.run_job(next(self._ids), target_file, output_json_path,
+                                  output_glb_path, timeout=self.timeout, flags=flags):
+                    return True
+                worker.restart()  # Crash / hang -> ganti proses baru lalu coba lagi
+            return False
+        finally:
+            if worker.jobs_done >= self.max_jobs: worker.restart()
+            self._idle.put(worker)
+
+    def close(self, wait=True):
+        """
+        Hentikan semua worker. wait=True: job yang sedang berjalan ditunggu selesai dulu
+        (worker diambil dari antrian idle satu per satu); job baru ditolak sejak close() dipanggil.
+        """
+        if self._closed.is_set(): return   # Sudah ditutup (mis. oleh thread lain)
+        self._closed.set()
+        if not wait or not hasattr(self, "_idle"):
+            for w in self._workers: w.stop()
+            return
+        for _ in self._workers: self._idle.get().stop()
@@ -0,0 +1,163 @@
+import os
+import time
+import argparse
+import numpy as np
+
+from dataset_format import load_rows, save_rows, resolve, DATASET_SUFFIX
+from knn_engine import KNNEngine, N_FEATURES
+from data_splitter import read_pair
+
+# --- KONFIGURASI ---
+METHODS = ("cnn", "enn", "enn+cnn")
+ENN_K = 3            # Tetangga untuk editing (Wilson ENN)
+TRAIN_FILE = "train_dataset.pds"
+TEST_FILE = "test_dataset.pds"
+
+# Reduksi data latih (prototype selection) untuk KNN:
+#   ENN (Edited Nearest Neighbor): buang baris yang labelnya kalah suara dari ENN_K tetangganya (noise/overlap)
+#   CNN (Condensed Nearest Neighbor, Hart): simpan hanya baris yang dibutuhkan agar semua baris lain
+#        tetap terklasifikasi benar oleh himpunan prototipe -> baris jauh di dalam region satu kelas dibuang
+# Baris yang memegang nilai min/max tiap fitur SELALU disimpan (anchor): Min-Max hasil reduksi = data
+# penuh, sehingga skala normalisasi (dan artefak model) tetap konsisten.
+
+# --- 1. SELEKSI PROTOTIPE ---
+def _anchors(rows):
+    """Indeks baris pertama yang memegang min & max tiap fitur"""
+    keep = set()
+    for i in range(N_FEATURES):
+        values = [float(row[i]) for row in rows]
+        keep.add(values.index(min(values)))
+        keep.add(values.index(max(values)))
+    return keep
+
+def edit_enn(rows, k=ENN_K):
+    """Indeks baris yang lolos editing Wilson: label sama dengan hasil voting k tetangga (tanpa dirinya sendiri)"""
+    # Query seluruh data latih terhadap dirinya sendiri -> KD-Tree (hasil exact, tanpa matriks N x N)
+    engine = KNNEngine(k + 1, "kdtree").fit_rows(rows)
+    neighbor_idx, _ = engine.kneighbors(rows)
+    keep = []
+    for i, idx in enumerate(neighbor_idx):
+        others = [j for j in idx.tolist() if j != i][:k]
+        labels = [engine.label(j) for j in others]
+        # vote(): seri -> abjad, sama seperti prediksi produksi
+        if not labels or max(sorted(set(labels)), key=labels.count) == rows[i][-1]:
+            keep.append(i)
+    return keep
+
+def condense_cnn(rows, k=1, candidates=None, seed=0, chunk=1024):
+    """
+    Condensed Nearest Neighbor (Hart) dengan aturan voting yang sama dengan engine
+    (tetangga urut (jarak, indeks), seri voting -> kelas pertama menurut abjad).
+    Baris dipindai dalam urutan acak (seed); baris yang salah diklasifikasi oleh prototipe
+    saat itu ditambahkan. Diulang sampai satu putaran penuh tanpa penambahan.
+    Return: indeks prototipe (terurut)
+    """
+    engine = KNNEngine(k, "numpy").fit_rows(rows)
+    X = engine._train_matrix
+    y = np.asarray(engine.label_codes, dtype=np.int64)
+    n_classes = len(engine.classes)
+    pool = np.asarray(sorted(candidates) if candidates is not None else range(len(rows)), dtype=np.int64)
+    order = pool[np.random.default_rng(seed).permutation(len(pool))]
+
+    # Prototipe awal: anchor Min-Max + satu baris per kelas. Disimpan terurut -> posisi = urutan indeks
+    chosen = set(_anchors(rows))
+    for i in order.tolist():
+        if not any(y[j] == y[i] for j in chosen): chosen.add(i)
+    proto = np.asarray(sorted(chosen), dtype=np.int64)
+
+    def first_wrong(batch):
+        """Posisi baris pertama di batch yang salah diklasifikasi prototipe saat ini (atau None)"""
+        pts = X[proto]
+        # Kuadrat per kolom dijumlah kiri -> kanan (jarak identik dengan engine)
+        diff = X[batch, 0, None] - pts[None, :, 0]
+        sq = diff * diff
+        for c in range(1, N_FEATURES):
+            diff = X[batch, c, None] - pts[None, :, c]
+            sq += diff * diff
+        nearest = np.argsort(np.sqrt(sq), axis=1, kind='stable')[:, :k]   # Seri jarak -> indeks terkecil
+        votes = (y[proto[nearest]][:, :, None] == np.arange(n_classes)).sum(axis=1)
+        wrong = np.flatnonzero(votes.argmax(axis=1) != y[batch])           # argmax: seri voting -> abjad
+        return int(wrong[0]) if len(wrong) else None
+
+    # Prototipe hanya berubah saat ada baris salah -> baris sebelum itu bisa dicek sekaligus per chunk,
+    # hasilnya sama persis dengan pemindaian satu per satu
+    added = True
+    while added:
+        added = False
+        remaining = np.asarray([i for i in order.tolist() if i not in chosen], dtype=np.int64)
+        pos = 0
+        while pos < len(remaining):
+            batch = remaining[pos:pos + chunk]
+            j = first_wrong(batch)
+            if j is None:
+                pos += len(batch)
+                continue
+            i = int(batch[j])
+            chosen.add(i)
+            proto = np.insert(proto, np.searchsorted(proto, i), i)
+            added = True
+            pos += j + 1
+    return sorted(chosen)
+
+def condense(rows, method="cnn", k=5, seed=0):
+    """Baris hasil reduksi (urutan asli dipertahankan -> tie-break indeks tetap konsisten)"""
+    if method not in METHODS: raise ValueError(f"Metode kondensasi tidak dikenal: {method}")
+    keep = set(range(len(rows)))
+    if "enn" in method:
+        keep = set(edit_enn(rows)) | _anchors(rows)
+    if "cnn" in method:
+        keep = set(condense_cnn(rows, k, candidates=keep, seed=seed))
+    return [rows[i] for i in sorted(keep)]
+
+# --- 2. DATASET TERKONDENSASI (dipakai saat fit, di-cache sebagai file .pds) ---
+def condensed_path(dataset_path, method, k):
+    stem = os.path.splitext(dataset_path)[0]
+    return f"{stem}.{method.replace('+', '-')}-k{k}{DATASET_SUFFIX}"
+
+def condensed_dataset(dataset_path, method, k=5):
+    """
+    Path dataset terkondensasi untuk dataset_path; dibangun ulang jika belum ada atau
+    lebih lama dari sumbernya. Hasilnya file .pds biasa -> artefak model ikut kecil.
+    """
+    source = resolve(dataset_path)
+    target = condensed_path(source, method, k)
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source):
+        save_rows(target, condense(load_rows(source), method, k))
+    return target
+
+# --- 3. LAPORAN ---
+def accuracy(train_rows, test_rows, k):
+    predictions, _, _ = KNNEngine(k).fit_rows(train_rows).predict_batch(test_rows)
+    return sum(p == row[-1] for p, row in zip(predictions, test_rows)) / len(test_rows) * 100
+
+def main():
+    parser = argparse.ArgumentParser(description="Kondensasi data latih KNN (prototype selection)")
+    parser.add_argument("--train", default=TRAIN_FILE)
+    parser.add_argument("--test", default=TEST_FILE, help="Data uji untuk mengukur perubahan akurasi")
+    parser.add_argument("--method", default="cnn", choices=METHODS)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Simpan hasil ke file .pds (default: hanya laporan)")
+    args = parser.parse_args()
+
+    train_rows, test_rows = read_pair(args.train, args.test, lambda train, test: (load_rows(train), load_rows(test)))
+    start = time.perf_counter()
+    reduced = condense(train_rows, args.method, args.k, args.seed)
+    elapsed = time.perf_counter() - start
+
+    base_acc = accuracy(train_rows, test_rows, args.k)
+    new_acc = accuracy(reduced, test_rows, args.k)
+    print(f"Metode        : {args.method} (k={args.k}), {elapsed:.2f} detik")
+    print(f"Data latih    : {len(train_rows)} -> {len(reduced)} baris "
+          f"(kompresi {len(train_rows) / max(1, len(reduced)):.1f}x)")
+    for label in sorted(set(row[-1] for row in train_rows)):
+        before = sum(row[-1] == label for row in train_rows)
+        after = sum(row[-1] == label for row in reduced)
+        print(f"  {label:<12}: {before:>6} -> {after}")
+    print(f"Akurasi uji   : {base_acc:.2f}% -> {new_acc:.2f}% ({new_acc - base_acc:+.2f} poin)")
+    if args.out:
+        save_rows(args.out, reduced)
+        print(f"Disimpan ke {args.out}")
+
+if __name__ == "__main__":
+    main()
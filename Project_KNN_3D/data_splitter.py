@@ -1,57 +1,142 @@
-import json
-import random
 import os
+import math
+import time
+import uuid
+import hashlib
+import argparse
+import itertools
+from dataset_format import DatasetWriter, iter_rows, read_header, resolve, SPOOL_CHUNK
 
 # --- KONFIGURASI ---
-INPUT_FILE = "objaverse_dataset.json"  # Data mentah Anda (357 data tadi)
-TRAIN_OUTPUT = "train_dataset.json"    # Output untuk Training (80%)
-TEST_OUTPUT = "test_dataset.json"      # Output untuk Testing (20%)
+INPUT_FILE = "objaverse_dataset.pds"   # Data mentah Anda (357 data tadi)
+TRAIN_OUTPUT = "train_dataset.pds"     # Output untuk Training (80%)
+TEST_OUTPUT = "test_dataset.pds"       # Output untuk Testing (20%)
 SPLIT_RATIO = 0.8                      # Rasio pembagian
+SEED = 0                               # Seed yang sama + data yang sama -> pembagian yang sama
+PAIR_RETRIES = 50                      # read_pair: percobaan baca ulang saat pasangan sedang diganti
+PAIR_WAIT = 0.1                        # Detik antar percobaan
 
-def main():
-    # 1. Cek apakah file dataset ada
-    if not os.path.exists(INPUT_FILE):
-        print(f"ERROR: File {INPUT_FILE} tidak ditemukan!")
-        return
+# Pembagian streaming stratified: satu pass, memori konstan (hanya penghitung per label), tanpa shuffle.
+#  - Per label dihitung jumlah baris terlihat (seen) & yang sudah masuk test. Jumlah test dijaga di antara
+#    floor & ceil dari (1 - ratio) * seen -> proporsi tiap label selalu dalam satu baris dari SPLIT_RATIO
+#  - Di dalam rentang tsb. sisi ditentukan hash stabil blake2b(seed | baris) -> baris mana yang masuk test acak
+#  - Reproducible: data yang sama (urutan sama) + seed yang sama -> pembagian yang sama
+#  - Reshuffle = seed baru
+# Pasangan train/test: kedua file membawa ID split yang sama di header. Keduanya ditulis lengkap
+# dulu (prepare) lalu diganti berurutan; pembaca pasangan (read_pair) membandingkan ID sebelum &
+# sesudah membaca dan mengulang jika berbeda -> tidak pernah memakai train & test dari split berbeda.
 
-    # 2. Load data
-    print("Membaca dataset...")
-    with open(INPUT_FILE, 'r') as f:
-        data = json.load(f)
-    
-    total_data = len(data)
-    if total_data == 0:
-        print("Dataset kosong!")
-        return
+def row_fraction(row, seed=SEED):
+    """Posisi stabil baris di [0, 1)"""
+    key = f"{seed}|{list(row)!r}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") / 2 ** 64
 
-    # 3. ACAK DATA 
+def to_test(count, row, ratio=SPLIT_RATIO, seed=SEED):
+    """
+    Sisi baris berikutnya untuk labelnya (count = [n_train, n_test] sejauh ini, diperbarui).
+    Return True jika baris masuk test.
+    """
+    need = round((1 - ratio) * (count[0] + count[1] + 1), 9)   # round: 0.2 * 130 = 25.99.. di float
+    if count[1] < math.floor(need): side = True        # Test kurang -> wajib test
+    elif count[1] >= math.ceil(need): side = False     # Test sudah cukup -> wajib train
+    else: side = row_fraction(row, seed) >= ratio      # Keduanya masih dalam satu baris dari rasio
+    count[side] += 1
+    return side
 
-    random.shuffle(data)
+def split_stream(rows, train_path, test_path, ratio=SPLIT_RATIO, seed=SEED, chunk=SPOOL_CHUNK):
+    """
+    Tulis rows (iterable, boleh lebih besar dari RAM) ke train_path & test_path, stratified per label.
+    Kedua file ditulis bertahap lalu diganti di akhir, jadi input boleh berupa file output
+    itu sendiri (reshuffle). Jika salah satu gagal ditulis, tidak ada file yang diganti.
+    Return {label: [n_train, n_test]}.
+    """
+    counts = {}
+    rows = iter(rows)
+    batch = list(itertools.islice(rows, chunk))
+    if not batch: return counts   # Dataset kosong -> output lama tidak ditimpa
+    meta = {"split": uuid.uuid4().hex}
+    train, test = DatasetWriter(train_path, meta), DatasetWriter(test_path, meta)
+    try:
+        while batch:
+            sides = [to_test(counts.setdefault(row[-1], [0, 0]), row, ratio, seed) for row in batch]
+            train.extend([row for row, side in zip(batch, sides) if not side])
+            test.extend([row for row, side in zip(batch, sides) if side])
+            batch = list(itertools.islice(rows, chunk))
+        train.prepare()
+        test.prepare()
+    except BaseException:
+        train.abort()
+        test.abort()
+        raise
+    # Dua rename berurutan; jeda di antaranya terdeteksi read_pair lewat ID split yang berbeda
+    train.commit()
+    test.commit()
+    return counts
 
-    # 4. Hitung titik potong
-    split_index = int(total_data * SPLIT_RATIO)
+def split_id(path):
+    """ID split di header .pds (None: file belum ada atau dibuat sebelum ada ID split)"""
+    try:
+        return read_header(resolve(path))[0].get("split")
+    except (OSError, ValueError):
+        return None
 
-    # 5. Bagi Data
-    train_data = data[:split_index]
-    test_data = data[split_index:]
+def read_pair(train_path, test_path, reader, retries=PAIR_RETRIES, wait=PAIR_WAIT):
+    """
+    reader(train_path, test_path) dengan jaminan kedua file berasal dari split yang sama.
+    ID split dicek sebelum & sesudah membaca; berbeda / berubah (reshuffle sedang mengganti
+    file) -> baca ulang. RuntimeError jika pasangan tidak kunjung konsisten.
+    """
+    for _ in range(retries):
+        before = (split_id(train_path), split_id(test_path))
+        if None in before or before[0] == before[1]:
+            result = reader(train_path, test_path)
+            if (split_id(train_path), split_id(test_path)) == before: return result
+        time.sleep(wait)
+    raise RuntimeError(f"{train_path} & {test_path} berasal dari split berbeda (reshuffle belum selesai?)")
 
-    # 6. Simpan ke file terpisah
-    with open(TRAIN_OUTPUT, 'w') as f:
-        json.dump(train_data, f, indent=2)
-    
-    with open(TEST_OUTPUT, 'w') as f:
-        json.dump(test_data, f, indent=2)
+def reshuffle(train_path, test_path, ratio=SPLIT_RATIO, seed=SEED):
+    """Gabungkan train + test yang ada lalu bagi ulang dengan seed baru (streaming)"""
+    rows = itertools.chain(iter_rows(train_path), iter_rows(test_path))
+    return split_stream(rows, train_path, test_path, ratio, seed)
 
-    # 7. Laporan
+def print_report(counts, train_path, test_path):
+    n_train = sum(c[0] for c in counts.values())
+    n_test = sum(c[1] for c in counts.values())
+    total = n_train + n_test
     print("-" * 30)
     print("PEMBAGIAN DATA SELESAI")
     print("-" * 30)
-    print(f"Total Data Awal : {total_data}")
-    print(f"Data Latih (Train): {len(train_data)} ({len(train_data)/total_data*100:.1f}%) -> Disimpan di {TRAIN_OUTPUT}")
-    print(f"Data Uji (Test)   : {len(test_data)} ({len(test_data)/total_data*100:.1f}%) -> Disimpan di {TEST_OUTPUT}")
+    print(f"Total Data Awal : {total}")
+    print(f"Data Latih (Train): {n_train} ({n_train/total*100:.1f}%) -> Disimpan di {train_path}")
+    print(f"Data Uji (Test)   : {n_test} ({n_test/total*100:.1f}%) -> Disimpan di {test_path}")
+    for label in sorted(counts):
+        tr, te = counts[label]
+        print(f"  {label:<12}: train {tr:>8}  test {te:>8}  ({tr / (tr + te) * 100:.1f}% train)")
     print("-" * 30)
-    print("Gunakan 'train_dataset.json' untuk aplikasi utama.")
-    print("Gunakan 'test_dataset.json' HANYA untuk evaluasi akurasi.")
+    print(f"Gunakan '{train_path}' untuk aplikasi utama.")
+    print(f"Gunakan '{test_path}' HANYA untuk evaluasi akurasi.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bagi dataset train/test (streaming, hash stabil, stratified)")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--train", default=TRAIN_OUTPUT)
+    parser.add_argument("--test", default=TEST_OUTPUT)
+    parser.add_argument("--ratio", type=float, default=SPLIT_RATIO, help="Porsi data latih")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    # 1. Cek apakah file dataset ada
+    if not os.path.exists(resolve(args.input)):
+        print(f"ERROR: File {args.input} tidak ditemukan!")
+        return
+
+    # 2. Baca, bagi & tulis dalam satu pass
+    print("Membaca & membagi dataset...")
+    counts = split_stream(iter_rows(args.input), args.train, args.test, args.ratio, args.seed)
+    if not counts:
+        print("Dataset kosong!")
+        return
+    print_report(counts, args.train, args.test)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
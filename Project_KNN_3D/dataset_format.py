@@ -0,0 +1,404 @@
+import os
+import sys
+import json
+import array
+import struct
+
+try:
+    import numpy as np  # Opsional: load_dataset (memory-map). load_rows/save_rows cukup stdlib (Blender tanpa numpy)
+except ImportError:
+    np = None
+
+# --- KONFIGURASI ---
+# Layout file .pds (PolyPix DataSet), little-endian:
+#   [preamble 12 byte: magic, versi, panjang header] [header JSON] [padding ke ALIGN]
+#   [kolom poly][kolom vert][kolom mat][kolom tex][kolom rig][kolom kode label]
+# Tiap kolom = array bertipe tetap (int terkecil yang muat / float64, label uint16) di offset kelipatan ALIGN,
+# sehingga bisa di-memory-map langsung. Header memuat n_rows, min/max per kolom & kamus label.
+DATASET_SUFFIX = ".pds"
+FORMAT_VERSION = 1
+MAGIC = b"PPXDS\x00"
+ALIGN = 8
+FEATURE_NAMES = ("poly", "vert", "mat", "tex", "rig")
+LABEL_DTYPE = "<u2"
+SPOOL_CHUNK = 1 << 16   # Nilai per chunk saat streaming (DatasetWriter, iter_rows)
+
+_PREAMBLE = struct.Struct("<6sHI")   # magic, versi format, panjang header JSON
+_ARRAY_CODES = {"<i1": "b", "<i2": "h", "<i4": "i", "<i8": "q", "<f8": "d", "<u2": "H"}
+_INT_DTYPES = (("<i1", 1 << 7), ("<i2", 1 << 15), ("<i4", 1 << 31), ("<i8", 1 << 63))
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+def is_binary(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def json_sibling(path):
+    return os.path.splitext(path)[0] + ".json"
+
+def resolve(path):
+    """
+    Path dataset .pds yang siap dibaca. Jika file .pds belum ada tapi versi JSON
+    lama (nama sama, ekstensi .json) ada, JSON dikonversi sekali secara otomatis.
+    """
+    if os.path.exists(path) or not path.endswith(DATASET_SUFFIX): return path
+    legacy = json_sibling(path)
+    if os.path.exists(legacy):
+        convert(legacy, path)
+    return path
+
+# --- 1. TULIS ---
+def _column_dtype(values):
+    """Tipe int terkecil yang memuat semua nilai (format asli dataset), selain itu float64"""
+    if not all(isinstance(v, int) and not isinstance(v, bool) for v in values): return "<f8"
+    lo, hi = (min(values), max(values)) if values else (0, 0)
+    for dtype, limit in _INT_DTYPES:
+        if -limit <= lo and hi < limit: return dtype
+    return "<f8"
+
+def _to_bytes(values, dtype):
+    arr = array.array(_ARRAY_CODES[dtype], values)
+    if sys.byteorder == "big": arr.byteswap()
+    return arr.tobytes()
+
+def encode(rows):
+    """List baris [Poly, Vert, Mat, Tex, Rig, Label] -> bytes file .pds"""
+    for row in rows:
+        if len(row) != len(FEATURE_NAMES) + 1:
+            raise ValueError(f"Baris dataset harus berisi 5 fitur + label: {row!r}")
+
+    classes = sorted(set(row[-1] for row in rows))
+    if len(classes) > 0xFFFF: raise ValueError("Terlalu banyak kelas label untuk kolom uint16.")
+    code_of = {c: i for i, c in enumerate(classes)}
+
+    blobs, columns, offset = [], [], 0
+    for i, name in enumerate(FEATURE_NAMES):
+        values = [row[i] for row in rows]
+        dtype = _column_dtype(values)
+        blob = _to_bytes(values, dtype)
+        columns.append({"name": name, "dtype": dtype, "offset": offset,
+                        "min": min(values) if values else None,
+                        "max": max(values) if values else None})
+        blobs.append(blob)
+        offset = _align(offset + len(blob))
+    label_blob = _to_bytes([code_of[row[-1]] for row in rows], LABEL_DTYPE)
+    blobs.append(label_blob)
+
+    header = {
+        "n_rows": len(rows),
+        "columns": columns,
+        "labels": {"dtype": LABEL_DTYPE, "offset": offset},
+        "classes": classes,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    out = bytearray(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)) + header_bytes)
+    data_start = _align(len(out))
+    for col, blob in zip(columns + [header["labels"]], blobs):
+        out.extend(b"\x00" * (data_start + col["offset"] - len(out)))
+        out.extend(blob)
+    return bytes(out)
+
+def save_rows(path, rows):
+    """
+    Simpan dataset secara atomik (tmp + os.replace). Path berakhiran .json ditulis
+    sebagai JSON list (untuk konversi balik); selain itu format biner .pds.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"   # Beberapa worker bisa menulis file yang sama bersamaan
+    if path.endswith(".json"):
+        with open(tmp, 'w') as f: json.dump(rows, f, indent=2)
+    else:
+        with open(tmp, 'wb') as f: f.write(encode(rows))
+    os.replace(tmp, path)
+
+class _ColumnSpool:
+    """Satu kolom yang ditulis bertahap ke file sementara (int64, atau float64 begitu ada nilai non-int)"""
+    def __init__(self, path):
+        self.path = path
+        self.code = "q"
+        self.lo = self.hi = None
+        self._buf = array.array("q")
+        self._f = open(path, 'wb')
+
+    def extend(self, values):
+        if not values: return
+        if self.code == "q" and not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+            self._to_float()
+        self._buf.extend(values)
+        lo, hi = min(values), max(values)
+        if self.lo is None or lo < self.lo: self.lo = lo
+        if self.hi is None or hi > self.hi: self.hi = hi
+        if len(self._buf) >= SPOOL_CHUNK: self.flush()
+
+    def _to_float(self):
+        """Jarang terjadi: kolom int ternyata berisi float -> tulis ulang spool sebagai float64 (per chunk)"""
+        self.flush()
+        self._f.close()
+        tmp = self.path + ".f8"
+        with open(self.path, 'rb') as src, open(tmp, 'wb') as dst:
+            for chunk in iter(lambda: src.read(SPOOL_CHUNK * 8), b""):
+                ints = array.array("q")
+                ints.frombytes(chunk)
+                array.array("d", ints).tofile(dst)
+        os.replace(tmp, self.path)
+        self._f = open(self.path, 'ab')
+        self.code = "d"
+        self._buf = array.array("d")
+
+    def flush(self):
+        self._buf.tofile(self._f)
+        del self._buf[:]
+
+    def chunks(self):
+        """Isi spool per chunk (array.array)"""
+        self.flush()
+        self._f.close()
+        size = array.array(self.code).itemsize
+        with open(self.path, 'rb') as f:
+            for data in iter(lambda: f.read(SPOOL_CHUNK * size), b""):
+                arr = array.array(self.code)
+                arr.frombytes(data)
+                yield arr
+
+    def discard(self):
+        if not self._f.closed: self._f.close()
+        try: os.remove(self.path)
+        except OSError: pass
+
+class DatasetWriter:
+    """
+    Tulis file .pds baris demi baris dengan memori konstan (dataset lebih besar dari RAM).
+    Kolom di-spool ke file sementara di folder tujuan; close() menyusun header (dtype terkecil,
+    min/max, kamus label terurut) lalu menyalin kolom per chunk ke file akhir secara atomik.
+    Hasilnya identik byte-per-byte dengan save_rows() untuk baris yang sama (tanpa meta).
+    meta: field tambahan di header (mis. ID split). close() = prepare() + commit(); beberapa
+    file bisa di-prepare dulu agar penggantian semuanya terjadi berurutan di akhir.
+
+        with DatasetWriter("train.pds") as w:
+            w.extend(rows)
+    """
+    def __init__(self, path, meta=None):
+        self.path = path
+        self.meta = meta
+        self.n_rows = 0
+        self._tmp = f"{path}.{os.getpid()}.tmp"
+        self._spools = [_ColumnSpool(f"{self._tmp}.{name}") for name in FEATURE_NAMES]
+        self._labels = _ColumnSpool(f"{self._tmp}.label")
+        self._label_ids = {}   # Label -> id urutan kemunculan (kode final baru diketahui di akhir)
+
+    def append(self, row):
+        self.extend([row])
+
+    def extend(self, rows):
+        """Tambah banyak baris sekaligus (per kolom -> jauh lebih cepat dari append per baris)"""
+        for row in rows:
+            if len(row) != len(FEATURE_NAMES) + 1:
+                raise ValueError(f"Baris dataset harus berisi 5 fitur + label: {row!r}")
+        for i, spool in enumerate(self._spools): spool.extend([row[i] for row in rows])
+        ids = self._label_ids
+        self._labels.extend([ids[row[-1]] if row[-1] in ids else ids.setdefault(row[-1], len(ids)) for row in rows])
+        self.n_rows += len(rows)
+
+    def close(self):
+        self.prepare()
+        self.commit()
+
+    def prepare(self):
+        """Tulis file akhir lengkap ke file sementara (path tujuan belum disentuh)"""
+        classes = sorted(self._label_ids)
+        if len(classes) > 0xFFFF: raise ValueError("Terlalu banyak kelas label untuk kolom uint16.")
+        final_code = {i: classes.index(label) for label, i in self._label_ids.items()}
+        remap = [final_code[i] for i in range(len(final_code))]
+
+        columns, offset = [], 0
+        for name, spool in zip(FEATURE_NAMES, self._spools):
+            if spool.code == "d": dtype = "<f8"
+            else: dtype = _column_dtype([spool.lo, spool.hi] if self.n_rows else [])
+            columns.append({"name": name, "dtype": dtype, "offset": offset, "min": spool.lo, "max": spool.hi})
+            offset = _align(offset + self.n_rows * array.array(_ARRAY_CODES[dtype]).itemsize)
+        header = {
+            "n_rows": self.n_rows,
+            "columns": columns,
+            "labels": {"dtype": LABEL_DTYPE, "offset": offset},
+            "classes": classes,
+        }
+        if self.meta: header.update(self.meta)
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_start = _align(_PREAMBLE.size + len(header_bytes))
+
+        with open(self._tmp, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)) + header_bytes)
+            for col, spool in zip(columns, self._spools):
+                f.write(b"\x00" * (data_start + col["offset"] - f.tell()))
+                for chunk in spool.chunks(): f.write(_to_bytes(chunk, col["dtype"]))
+            f.write(b"\x00" * (data_start + offset - f.tell()))
+            for chunk in self._labels.chunks(): f.write(_to_bytes([remap[i] for i in chunk], LABEL_DTYPE))
+        self._discard_spools()
+
+    def commit(self):
+        """Ganti path tujuan dengan file hasil prepare() secara atomik"""
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        self._discard_spools()
+        try: os.remove(self._tmp)
+        except OSError: pass
+
+    def _discard_spools(self):
+        for spool in self._spools + [self._labels]: spool.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None: self.close()
+        else: self.abort()
+        return False
+
+# --- 2. BACA ---
+def read_header(path):
+    """(header, offset awal blok data) dari file .pds"""
+    with open(path, 'rb') as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC: raise ValueError(f"{path} bukan file dataset .pds")
+        if version != FORMAT_VERSION: raise ValueError(f"Versi format dataset {version} tidak didukung")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    return header, _align(_PREAMBLE.size + header_len)
+
+def _read_column(data, start, dtype, n):
+    arr = array.array(_ARRAY_CODES[dtype])
+    arr.frombytes(data[start:start + n * arr.itemsize])
+    if sys.byteorder == "big": arr.byteswap()
+    return arr
+
+def load_rows(path):
+    """
+    Dataset (.pds atau JSON lama) -> list baris [Poly, Vert, Mat, Tex, Rig, Label].
+    Hanya butuh stdlib, sehingga bisa dipakai di Blender/backend native tanpa numpy.
+    """
+    path = resolve(path)
+    if not is_binary(path):
+        with open(path, 'r') as f: return json.load(f)
+
+    header, data_start = read_header(path)
+    with open(path, 'rb') as f: data = f.read()
+    n = header["n_rows"]
+    cols = [_read_column(data, data_start + c["offset"], c["dtype"], n).tolist() for c in header["columns"]]
+    labels = header["labels"]
+    codes = _read_column(data, data_start + labels["offset"], labels["dtype"], n)
+    classes = header["classes"]
+    return [list(values) + [classes[code]] for values, code in zip(zip(*cols), codes)]
+
+def iter_rows(path, chunk_rows=SPOOL_CHUNK):
+    """
+    Baris dataset satu per satu dengan memori konstan: kolom .pds dibaca per chunk (seek).
+    JSON lama tidak bisa di-stream -> dibaca utuh lewat load_rows.
+    """
+    path = resolve(path)
+    if not is_binary(path):
+        yield from load_rows(path)
+        return
+    header, data_start = read_header(path)
+    n = header["n_rows"]
+    specs = header["columns"] + [header["labels"]]
+    classes = header["classes"]
+    with open(path, 'rb') as f:
+        for start in range(0, n, chunk_rows):
+            count = min(chunk_rows, n - start)
+            cols = []
+            for spec in specs:
+                arr = array.array(_ARRAY_CODES[spec["dtype"]])
+                f.seek(data_start + spec["offset"] + start * arr.itemsize)
+                arr.frombytes(f.read(count * arr.itemsize))
+                if sys.byteorder == "big": arr.byteswap()
+                cols.append(arr.tolist())
+            for values in zip(*cols):
+                yield list(values[:-1]) + [classes[values[-1]]]
+
+class Dataset:
+    """
+    Dataset kolumnar: kolom fitur (N,) bertipe tetap, kode label, kamus kelas & Min-Max dari header.
+    Untuk file .pds, kolom adalah view numpy di atas satu memory-map (tanpa parsing/konversi per nilai).
+    """
+    def __init__(self, header, columns, label_codes):
+        self.header = header
+        self.columns = columns
+        self.label_codes = label_codes
+        self.n_rows = header["n_rows"]
+        self.classes = header["classes"]
+        self.min_vals = [float('inf') if c["min"] is None else float(c["min"]) for c in header["columns"]]
+        self.max_vals = [float('-inf') if c["max"] is None else float(c["max"]) for c in header["columns"]]
+
+    def __len__(self):
+        return self.n_rows
+
+    def features(self):
+        """Matriks fitur float64 (N x 5)"""
+        out = np.empty((self.n_rows, len(self.columns)), dtype=np.float64)
+        for i, col in enumerate(self.columns): out[:, i] = col
+        return out
+
+    def labels(self):
+        return [self.classes[code] for code in self.label_codes.tolist()]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Dataset di memori dari list baris (mis. hasil load JSON lama)"""
+        blob = encode(rows)
+        return cls._from_buffer(np.frombuffer(blob, dtype=np.uint8), *read_header_bytes(blob))
+
+    @classmethod
+    def _from_buffer(cls, buf, header, data_start):
+        n = header["n_rows"]
+        def view(spec):
+            start = data_start + spec["offset"]
+            dtype = np.dtype(spec["dtype"])
+            return buf[start:start + n * dtype.itemsize].view(dtype)
+        return cls(header, [view(c) for c in header["columns"]], view(header["labels"]))
+
+def read_header_bytes(blob):
+    magic, version, header_len = _PREAMBLE.unpack_from(blob)
+    if magic != MAGIC or version != FORMAT_VERSION: raise ValueError("Buffer bukan dataset .pds yang valid")
+    header = json.loads(blob[_PREAMBLE.size:_PREAMBLE.size + header_len].decode("utf-8"))
+    return header, _align(_PREAMBLE.size + header_len)
+
+def load_dataset(path):
+    """Dataset (.pds di-memory-map, JSON lama dibaca ke memori) -> Dataset. Butuh numpy."""
+    path = resolve(path)
+    if not is_binary(path):
+        return Dataset.from_rows(load_rows(path))
+    header, data_start = read_header(path)
+    buf = np.memmap(path, dtype=np.uint8, mode='r')
+    return Dataset._from_buffer(buf, header, data_start)
+
+# --- 3. KONVERSI ---
+def convert(src, dst=None):
+    """
+    Konversi JSON <-> .pds (arah ditentukan ekstensi dst). Hasil dibaca ulang dan
+    dibandingkan dengan sumber; ValueError jika tidak identik.
+    """
+    if dst is None:
+        stem = os.path.splitext(src)[0]
+        dst = stem + (DATASET_SUFFIX if src.endswith(".json") else ".json")
+    rows = load_rows(src)
+    save_rows(dst, rows)
+    if load_rows(dst) != rows:
+        raise ValueError(f"Konversi {src} -> {dst} tidak lossless")
+    return dst
+
+def main():
+    # python dataset_format.py <input.json|.pds> [output]   -> konversi (JSON <-> .pds)
+    # python dataset_format.py --info <file.pds>            -> tampilkan header
+    args = sys.argv[1:]
+    if not args: return
+    if args[0] == "--info":
+        header, _ = read_header(args[1])
+        print(f"{args[1]}: {header['n_rows']} baris, kelas {header['classes']}")
+        for c in header["columns"]:
+            print(f"  {c['name']:<5} {c['dtype']}  min={c['min']}  max={c['max']}")
+        return
+    dst = convert(args[0], args[1] if len(args) > 1 else None)
+    print(f"{args[0]} -> {dst} ({os.path.getsize(args[0])} -> {os.path.getsize(dst)} byte)")
+
+if __name__ == "__main__":
+    main()
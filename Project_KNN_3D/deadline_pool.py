@@ -0,0 +1,155 @@
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+# --- KONFIGURASI ---
+MAX_TASKS_PER_WORKER = 200   # Worker didaur ulang berkala (loader 3D bisa menahan memori besar)
+
+OK, ERROR, TIMEOUT, CRASH = "ok", "error", "timeout", "crash"
+
+def _worker_loop(func, conn):
+    """Loop di proses worker: terima (args) -> kirim (True, hasil) atau (False, pesan error)"""
+    while True:
+        try:
+            args = conn.recv()
+        except (EOFError, OSError):
+            return
+        if args is None: return
+        try:
+            reply = (True, func(*args))
+        except Exception as e:
+            reply = (False, str(e) or type(e).__name__)
+        conn.send(reply)
+
+class _Worker:
+    def __init__(self, ctx, func):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_loop, args=(func, child), daemon=True)
+        self.proc.start()
+        child.close()
+        self.key = None        # Task yang sedang dikerjakan (None = idle)
+        self.deadline = None
+        self.tasks = 0
+
+    def kill(self):
+        self.proc.terminate()
+        self.proc.join()
+        self.conn.close()
+
+    def stop(self):
+        try: self.conn.send(None)
+        except OSError: pass
+        self.proc.join(1)
+        if self.proc.is_alive(): self.kill()
+        else: self.conn.close()
+
+class DeadlinePool:
+    """
+    Process pool dengan deadline per task yang benar-benar ditegakkan di semua OS.
+    Setiap worker hanya memegang satu task; deadline dihitung sejak task dikirim ke worker
+    (bukan sejak antre). Worker yang melewati deadline di-terminate & diganti proses baru,
+    sehingga file yang macet tidak menahan slot dan task lain tetap jalan. Worker yang mati
+    (segfault, OOM kill) hanya menggagalkan task miliknya sendiri.
+
+    poll() mengembalikan list (key, status, value):
+      ok      -> value = hasil func(*args)
+      error   -> value = pesan exception dari func
+      timeout -> value = None (worker sudah dihentikan)
+      crash   -> value = exit code worker
+    """
+    def __init__(self, func, workers, timeout=None, max_tasks=MAX_TASKS_PER_WORKER):
+        self.func = func
+        self.size = max(1, workers)
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+        self._ctx = multiprocessing.get_context()
+        self._queue = deque()
+        self._workers = []
+
+    def submit(self, key, *args):
+        self._queue.append((key, args))
+
+    def __len__(self):
+        """Jumlah task yang belum selesai (antre + sedang jalan)"""
+        return len(self._queue) + sum(1 for w in self._workers if w.key is not None)
+
+    def _dispatch(self):
+        for w in [w for w in self._workers if w.key is None and w.tasks >= self.max_tasks]:
+            self._workers.remove(w)
+            w.stop()
+        while self._queue:
+            idle = next((w for w in self._workers if w.key is None), None)
+            if idle is None:
+                if len(self._workers) >= self.size: return
+                idle = _Worker(self._ctx, self.func)
+                self._workers.append(idle)
+            key, args = self._queue.popleft()
+            try:
+                idle.conn.send(args)
+            except OSError:
+                # Worker idle sudah mati -> ganti, task dikirim ulang ke worker lain
+                self._queue.appendleft((key, args))
+                self._retire(idle)
+                continue
+            idle.key, idle.tasks = key, idle.tasks + 1
+            idle.deadline = time.monotonic() + self.timeout if self.timeout else None
+
+    def _retire(self, worker):
+        self._workers.remove(worker)
+        worker.kill()
+
+    def poll(self, wait_for=None):
+        """Kirim task ke worker yang idle, lalu tunggu hasil (maks. wait_for detik; None = sampai ada yang selesai)"""
+        self._dispatch()
+        busy = [w for w in self._workers if w.key is not None]
+        if not busy: return []
+
+        deadlines = [w.deadline for w in busy if w.deadline is not None]
+        limit = wait_for
+        if deadlines:
+            remaining = max(0.0, min(deadlines) - time.monotonic())
+            limit = remaining if limit is None else min(limit, remaining)
+        ready = set(wait([w.conn for w in busy] + [w.proc.sentinel for w in busy], limit))
+
+        finished, now = [], time.monotonic()
+        for w in busy:
+            key = w.key
+            if w.conn in ready:
+                try:
+                    success, value = w.conn.recv()
+                except (EOFError, OSError):
+                    # Pipe putus: worker mati di tengah task
+                    w.proc.join()
+                    self._retire(w)
+                    finished.append((key, CRASH, w.proc.exitcode))
+                    continue
+                w.key = w.deadline = None
+                finished.append((key, OK if success else ERROR, value))
+            elif w.proc.sentinel in ready:
+                self._retire(w)
+                finished.append((key, CRASH, w.proc.exitcode))
+            elif w.deadline is not None and now >= w.deadline:
+                self._retire(w)
+                finished.append((key, TIMEOUT, None))
+        self._dispatch()
+        return finished
+
+    def run(self, items):
+        """Jalankan func(item) untuk semua item -> yield (item, status, value) sesuai urutan selesai"""
+        for item in items: self.submit(item, item)
+        while len(self):
+            yield from self.poll()
+
+    def close(self):
+        self._queue.clear()
+        for w in self._workers:
+            if w.key is None: w.stop()
+            else: w.kill()
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,107 @@
+import os
+import json
+import hashlib
+
+# Penanda "belum ada di cache" (None sudah dipakai untuk file kosong/tanpa mesh)
+MISS = object()
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha256 isi file (hex), dibaca per chunk; satu-satunya helper hash file (dipakai juga artefak model & cache hasil)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ExtractionCache:
+    """
+    Cache hasil ekstraksi fitur yang persisten & bisa dilanjutkan (resumable).
+    Disimpan sebagai JSONL append-only: satu baris per file yang selesai diproses,
+    {"key", "size", "mtime_ns", "sha256", "version", "row"}. Baris terakhir untuk key yang sama menang.
+    Jika proses mati di tengah jalan, semua baris yang sudah ditulis tetap terpakai.
+    `version` = versi logika ekstraksi; entri dari versi lain dianggap tidak ada (diekstrak ulang).
+    """
+    def __init__(self, path, version=1):
+        self.path = path
+        self.version = version
+        self.entries = {}
+        self._load()
+        self._fh = None
+
+    def _load(self):
+        if not os.path.exists(self.path): return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Baris terpotong akibat crash -> abaikan
+                if entry.get("version", 1) != self.version: continue
+                self.entries[entry["key"]] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def keys(self):
+        return self.entries.keys()
+
+    def lookup(self, key, file_path=None):
+        """
+        Ambil row hasil ekstraksi untuk key. Jika file_path diberikan, entri hanya dipakai
+        bila file belum berubah: (ukuran, mtime) sama -> langsung pakai; jika berbeda,
+        hash isi dibandingkan. Return MISS jika harus diekstrak ulang.
+        """
+        entry = self.entries.get(key)
+        if entry is None: return MISS
+        if file_path is None: return entry["row"]
+
+        st = os.stat(file_path)
+        if (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            return entry["row"]
+        if entry["size"] == st.st_size and entry.get("sha256") == file_hash(file_path):
+            # Isi sama (mis. file di-touch / disalin ulang) -> perbarui stat saja
+            self.record(key, entry["row"], file_path, entry["sha256"])
+            return entry["row"]
+        return MISS
+
+    def record(self, key, row, file_path=None, digest=None):
+        """Tambahkan hasil satu file ke cache & langsung flush ke disk"""
+        entry = {"key": key, "size": None, "mtime_ns": None, "sha256": digest,
+                 "version": self.version, "row": row}
+        if file_path is not None:
+            st = os.stat(file_path)
+            entry["size"], entry["mtime_ns"] = st.st_size, st.st_mtime_ns
+            if digest is None: entry["sha256"] = file_hash(file_path)
+        self.entries[key] = entry
+
+        if self._fh is None:
+            needs_newline = os.path.exists(self.path) and os.path.getsize(self.path) > 0 and not self._ends_with_newline()
+            self._fh = open(self.path, 'a', encoding='utf-8')
+            if needs_newline: self._fh.write("\n")
+        self._fh.write(json.dumps(entry) + "\n")
+        self._fh.flush()
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def compact(self, keep=None):
+        """Tulis ulang file cache hanya dengan entri terbaru (opsional: hanya key di `keep`)"""
+        self.close()
+        if keep is not None:
+            keep = set(keep)
+            self.entries = {k: e for k, e in self.entries.items() if k in keep}
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self.path)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import numpy as np
+import trimesh
+
+try:
+    from PIL import Image  # Opsional: memperkecil tekstur preview (tanpa PIL trimesh tidak memuat tekstur)
+except ImportError:
+    Image = None
+
+from backend_processor import (ModelFeatures, classify_features, PREVIEW_MAX_TRIANGLES, PREVIEW_MAX_BYTES,
+                               PREVIEW_TEXTURE_SIZE, PREVIEW_ATTEMPTS)
+from stream_counter import count_file
+from stage_metrics import StageTimer, finish
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(BASE_DIR, "train_dataset.pds")
+FAST_FORMATS = (".obj", ".glb", ".gltf")   # Format yang dianalisis tanpa Blender (.blend tetap via Blender)
+
+# --- 1. EKSTRAKSI FITUR (streaming, tanpa memuat geometri) ---
+def extract_features(path):
+    """
+    File OBJ/GLB/GLTF -> ModelFeatures. Hitungan diambil dari stream_counter:
+    OBJ dibaca per chunk, GLB/glTF hanya chunk JSON -> memori konstan.
+    """
+    return count_file(path).to_features(ModelFeatures())
+
+# --- 2. PREVIEW (decimation + anggaran ukuran, sama seperti jalur Blender) ---
+def cluster_decimate(mesh, max_faces):
+    """
+    Decimation vertex clustering (numpy): vertex dalam satu sel grid digabung ke titik rata-ratanya,
+    face yang kolaps / duplikat dibuang. Grid diperkasar sampai jumlah face <= max_faces.
+    """
+    if len(mesh.faces) <= max_faces: return mesh
+    vertices = np.asarray(mesh.vertices, dtype=np.float64)
+    faces = np.asarray(mesh.faces)
+    lo = vertices.min(axis=0)
+    size = max(float(np.ptp(vertices, axis=0).max()), 1e-12)
+    resolution = max(2.0, np.sqrt(max_faces))  # Face di permukaan ~ sebanding resolution^2
+
+    for _ in range(16):
+        # Sel & face dikodekan jadi satu int64 -> np.unique 1D (jauh lebih cepat dari axis=0)
+        cells = np.floor((vertices - lo) / size * resolution).astype(np.int64)
+        side = int(resolution) + 1
+        _, first, inverse = np.unique((cells[:, 0] * side + cells[:, 1]) * side + cells[:, 2],
+                                      return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        merged = inverse[faces]
+        alive = np.flatnonzero((merged[:, 0] != merged[:, 1]) & (merged[:, 1] != merged[:, 2]) &
+                               (merged[:, 0] != merged[:, 2]))
+        tri = np.sort(merged[alive], axis=1)
+        n = len(first)
+        if n < 1 << 21:
+            _, unique_idx = np.unique((tri[:, 0] * n + tri[:, 1]) * n + tri[:, 2], return_index=True)
+        else:
+            _, unique_idx = np.unique(tri, axis=0, return_index=True)
+        kept = alive[np.sort(unique_idx)]  # Urutan & winding face asli dipertahankan
+        if len(kept) <= max_faces: break
+        resolution *= min(0.9, 0.95 * np.sqrt(max_faces / len(kept)))
+
+    counts = np.bincount(inverse, minlength=len(first))
+    centers = np.stack([np.bincount(inverse, weights=vertices[:, i], minlength=len(first))
+                        for i in range(3)], axis=1) / counts[:, None]
+    # Atribut per-vertex (UV, warna) diambil dari vertex pertama di tiap sel
+    visual = None
+    if mesh.visual.kind == 'texture':
+        visual = trimesh.visual.TextureVisuals(uv=np.asarray(mesh.visual.uv)[first], material=mesh.visual.material)
+    elif mesh.visual.kind == 'vertex':
+        visual = trimesh.visual.ColorVisuals(vertex_colors=mesh.visual.vertex_colors[first])
+    elif mesh.visual.kind == 'face':
+        visual = trimesh.visual.ColorVisuals(face_colors=mesh.visual.face_colors[kept])
+    out = trimesh.Trimesh(centers, merged[kept], visual=visual, process=False)
+    out.remove_unreferenced_vertices()
+    return out
+
+def _shrink_textures(mesh, max_size):
+    material = getattr(mesh.visual, "material", None)
+    if Image is None or material is None: return
+    for attr in ("image", "baseColorTexture", "emissiveTexture", "normalTexture",
+                 "metallicRoughnessTexture", "occlusionTexture"):
+        img = getattr(material, attr, None)
+        if isinstance(img, Image.Image) and max(img.size) > max_size:
+            img = img.copy()
+            img.thumbnail((max_size, max_size))
+            setattr(material, attr, img)
+
+def _reduce_scene(scene, max_triangles, texture_size):
+    """Anggaran segitiga dibagi proporsional ke tiap geometri (dikali jumlah instance-nya di scene)"""
+    instances = {name: len(nodes) for name, nodes in scene.graph.geometry_nodes.items()}
+    meshes = {name: g for name, g in scene.geometry.items() if isinstance(g, trimesh.Trimesh)}
+    total = sum(len(g.faces) * instances.get(name, 1) for name, g in meshes.items())
+    for name, geom in meshes.items():
+        budget = max(1, int(max_triangles * len(geom.faces) / total)) if total else len(geom.faces)
+        geom = cluster_decimate(geom, budget)
+        _shrink_textures(geom, texture_size)
+        scene.geometry[name] = geom
+
+def export_preview(path, output_glb_path, max_triangles=PREVIEW_MAX_TRIANGLES, max_bytes=PREVIEW_MAX_BYTES,
+                   texture_size=PREVIEW_TEXTURE_SIZE):
+    """
+    Preview GLB via trimesh (satu-satunya langkah yang memuat geometri penuh): decimation ke
+    anggaran segitiga + tekstur diperkecil. Jika file masih > max_bytes, anggaran dibagi dua
+    dan diulang. trimesh tidak punya encoder Draco, jadi kompresi Draco hanya di jalur Blender.
+    Return False (tanpa file) jika tetap terlalu besar.
+    """
+    scene = trimesh.load(path, force='scene')
+    for _ in range(PREVIEW_ATTEMPTS):
+        _reduce_scene(scene, max_triangles, texture_size)
+        data = scene.export(file_type='glb')
+        if len(data) <= max_bytes:
+            tmp = output_glb_path + ".tmp"
+            with open(tmp, 'wb') as f: f.write(data)
+            os.replace(tmp, output_glb_path)
+            return True
+        max_triangles //= 2
+        texture_size //= 2
+    return False
+
+# --- 3. MAIN CONTROLLER (Schema result.json sama dengan backend_processor) ---
+def analyze(target_file, output_glb_path=None, dataset_path=DATASET_PATH, timer=None):
+    """Analisis satu file -> payload result.json (dict), tanpa menulis file JSON"""
+    timer = timer or StageTimer(profile=False, trace_memory=False)
+    try:
+        with timer.stage("features"):
+            features = extract_features(target_file)
+        if features.polygon_count == 0:
+            return {"status": "error", "message": "No Mesh Found."}
+        result_data = classify_features(features, os.path.basename(target_file), dataset_path, timer)
+        # Export GLB Preview jika diminta
+        if output_glb_path:
+            with timer.stage("export_preview"):
+                export_preview(target_file, output_glb_path)
+        return result_data
+    except Exception as e:
+        return {"status": "error", "message": f"Import Failed: {str(e)}"}
+
+def analyze_file(target_file, output_json_path, output_glb_path=None, dataset_path=DATASET_PATH, flags=None):
+    """
+    analyze() + metrik per tahap (result["metrics"] & log metrik) -> tulis result.json.
+    flags: {"profile", "trace_memory"} (None -> environment proses ini).
+    """
+    timer = StageTimer(**(flags or {}))
+    with timer:
+        result_data = analyze(target_file, output_glb_path, dataset_path, timer)
+    finish(timer, result_data, os.path.basename(target_file), "fast")
+    with open(output_json_path, 'w') as f:
+        json.dump(result_data, f, indent=4)
+    return result_data
+
+def main():
+    # python fast_analyzer.py <file.obj|glb|gltf> <result.json> [preview.glb]
+    args = sys.argv[1:]
+    if len(args) < 2: return
+    analyze_file(args[0], args[1], args[2] if len(args) > 2 else None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import numpy as np
+
+# --- KONFIGURASI ---
+KMEANS_ITERS = 10          # Iterasi Lloyd untuk melatih centroid
+SAMPLE_PER_LIST = 64       # Titik sampel per list untuk k-means (data penuh hanya di-assign sekali)
+ASSIGN_BLOCK_ELEMS = 1 << 22
+
+class IVFIndex:
+    """
+    Inverted File Index (IVF) untuk pencarian K tetangga APPROXIMATE pada fitur ternormalisasi.
+    Data dipartisi ke n_lists cluster (k-means); query hanya memindai n_probe cluster dengan
+    centroid terdekat -> biaya per query ~ n_probe * N / n_lists, bukan N.
+
+    n_probe adalah kenop akurasi/kecepatan: n_probe = n_lists (atau None) memindai semua
+    cluster dan hasilnya identik dengan brute-force (jarak dihitung dengan urutan operasi yang
+    sama, tetangga diurutkan (jarak, indeks)).
+    centroids: pakai centroid yang sudah ada (tanpa k-means), mis. saat indeks dibangun ulang
+    setelah data latih bertambah/berkurang tanpa perubahan skala normalisasi.
+    """
+    def __init__(self, data, n_lists=None, seed=0, arrays=None, centroids=None):
+        data = np.asarray(data, dtype=np.float64)
+        self.n, self.dim = data.shape
+        if arrays is not None:
+            # Partisi yang sudah dibangun (lihat to_arrays) -> tanpa k-means & assign ulang
+            self.centroids = arrays["centroids"]
+            self.n_lists = len(self.centroids)
+            self._perm = arrays["perm"]
+            self._offsets = arrays["offsets"]
+        else:
+            if centroids is not None:
+                self.centroids = np.asarray(centroids, dtype=np.float64)
+                self.n_lists = len(self.centroids)
+            else:
+                # Default sqrt(N) list: ~sqrt(N) titik per list -> seimbang antara scan centroid & scan list
+                self.n_lists = min(self.n, n_lists or max(1, int(round(np.sqrt(self.n)))))
+                self.centroids = self._kmeans(data, np.random.default_rng(seed)) if self.n else np.empty((0, self.dim))
+            assign = self._assign(data)
+            self._perm = np.argsort(assign, kind='stable')   # Titik diurutkan per list -> scan list kontigu
+            counts = np.bincount(assign, minlength=self.n_lists)
+            self._offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self._points = data[self._perm]
+
+    def to_arrays(self):
+        return {"centroids": self.centroids, "perm": self._perm, "offsets": self._offsets}
+
+    def _assign(self, points):
+        """
+        Cluster terdekat tiap titik: argmin ||c||^2 - 2 p.c (||p||^2 konstan per titik).
+        float32 cukup untuk partisi (jarak exact tetap dihitung float64 saat query).
+        """
+        out = np.empty(len(points), dtype=np.int64)
+        if not len(points): return out
+        c_sq = (self.centroids ** 2).sum(axis=1).astype(np.float32)
+        neg2_ct = (-2.0 * self.centroids.T).astype(np.float32)
+        block = max(1, ASSIGN_BLOCK_ELEMS // self.n_lists)
+        for start in range(0, len(points), block):
+            d = points[start:start + block].astype(np.float32) @ neg2_ct
+            d += c_sq
+            out[start:start + len(d)] = d.argmin(axis=1)
+        return out
+
+    def _kmeans(self, data, rng):
+        sample_size = min(self.n, self.n_lists * SAMPLE_PER_LIST)
+        sample = data[rng.choice(self.n, sample_size, replace=False)] if sample_size < self.n else data
+        self.centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        for _ in range(KMEANS_ITERS):
+            assign = self._assign(sample)
+            counts = np.bincount(assign, minlength=self.n_lists)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assign, sample)
+            filled = counts > 0   # Cluster kosong mempertahankan centroid lamanya
+            self.centroids[filled] = sums[filled] / counts[filled, None]
+        return self.centroids
+
+    def list_sizes(self):
+        return np.diff(self._offsets)
+
+    def query_batch(self, queries, k, n_probe=None, alive=None):
+        """
+        K tetangga (approximate) untuk banyak titik -> (indeks (Q x K), jarak (Q x K)) urut (jarak, indeks).
+        Cluster diperiksa dari centroid terdekat; minimal n_probe cluster, ditambah jika kandidat < k.
+        alive: mask boolean per titik; titik False dilewati (dihapus tanpa membangun ulang indeks).
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, self.dim)
+        k = min(k, self.n if alive is None else int(np.count_nonzero(alive)))
+        q = len(queries)
+        out_idx = np.empty((q, k), dtype=np.int64)
+        out_dist = np.empty((q, k), dtype=np.float64)
+        if k == 0 or q == 0: return out_idx, out_dist
+        n_probe = self.n_lists if n_probe is None else max(1, min(n_probe, self.n_lists))
+
+        c_sq = (self.centroids ** 2).sum(axis=1)
+        sizes = self.list_sizes()
+        if alive is not None:   # Ukuran list = titik hidup -> cluster tambahan tetap dipindai jika kandidat < k
+            list_of = np.repeat(np.arange(self.n_lists), sizes)
+            sizes = np.bincount(list_of[alive[self._perm]], minlength=self.n_lists)
+        for r, point in enumerate(queries):
+            centroid_dist = c_sq - 2.0 * self.centroids @ point
+            if n_probe < self.n_lists:
+                nearest = np.argpartition(centroid_dist, n_probe - 1)[:n_probe]
+                lists = nearest[np.argsort(centroid_dist[nearest], kind='stable')]
+                if sizes[lists].sum() < k:   # Cluster terdekat terlalu kecil -> periksa semua secara berurutan
+                    lists = np.argsort(centroid_dist, kind='stable')
+                    lists = lists[:max(n_probe, int(np.searchsorted(np.cumsum(sizes[lists]), k)) + 1)]
+            else:
+                lists = np.arange(self.n_lists)
+            pos = np.concatenate([np.arange(self._offsets[l], self._offsets[l + 1]) for l in lists])
+            if alive is not None: pos = pos[alive[self._perm[pos]]]
+
+            # Jarak exact ke kandidat: kuadrat per kolom dijumlah kiri -> kanan (sama dengan brute-force)
+            pts = self._points[pos]
+            diff = point[0] - pts[:, 0]
+            sq = diff * diff
+            for i in range(1, self.dim):
+                diff = point[i] - pts[:, i]
+                sq += diff * diff
+            dist = np.sqrt(sq)
+            idx = self._perm[pos]
+            best = np.lexsort((idx, dist))[:k]
+            out_idx[r] = idx[best]
+            out_dist[r] = dist[best]
+        return out_idx, out_dist
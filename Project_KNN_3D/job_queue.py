@@ -0,0 +1,152 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_DIR = os.path.join(BASE_DIR, "jobs")   # Satu sub-folder per job: input, result.json, preview.glb, status.json
+MAX_CONCURRENT = 2          # Job yang dianalisis bersamaan
+MAX_PENDING = 32            # Job yang boleh menunggu di antrian (lebih dari ini -> QueueFull)
+RETENTION_SECONDS = 3600    # Folder job yang sudah selesai dihapus setelah 1 jam
+STATUS_FILE = "status.json"
+RESULT_FILE = "result.json"
+PREVIEW_FILE = "preview.glb"
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+class QueueFull(Exception):
+    pass
+
+class JobQueue:
+    """
+    Antrian analisis di background untuk app Streamlit. Setiap job punya ID & folder kerja
+    sendiri (tidak ada lagi result.json/preview.glb bersama), jumlah job yang jalan bersamaan
+    dibatasi, dan status bisa di-poll dari rerun mana pun. Status juga ditulis ke status.json
+    sehingga hasil tetap bisa dibaca setelah server restart, sampai masa retensi habis.
+    """
+    def __init__(self, root=JOBS_DIR, max_concurrent=MAX_CONCURRENT, max_pending=MAX_PENDING,
+                 retention=RETENTION_SECONDS):
+        self.root = root
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.retention = retention
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_concurrent, thread_name_prefix="polypix-job")
+        os.makedirs(root, exist_ok=True)
+
+    def job_dir(self, job_id):
+        return os.path.join(self.root, job_id)
+
+    # --- STATUS ---
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.setdefault(job_id, {"id": job_id})
+            job.update(fields)
+            snapshot = dict(job)
+            self._changed.notify_all()
+        path = os.path.join(self.job_dir(job_id), STATUS_FILE)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w') as f: json.dump(snapshot, f)
+        os.replace(tmp, path)
+
+    def status(self, job_id):
+        """Status job (dict) atau None jika ID tidak dikenal / sudah dibersihkan"""
+        if not job_id or not _JOB_ID.fullmatch(job_id): return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job = dict(job)
+                if job["state"] == QUEUED:
+                    job["position"] = 1 + sum(1 for j in self._jobs.values()
+                                              if j["state"] == QUEUED and j["created"] < job["created"])
+                return job
+        # Job dari proses server sebelumnya -> baca dari disk
+        try:
+            with open(os.path.join(self.job_dir(job_id), STATUS_FILE), 'r') as f: job = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if job.get("state") in (QUEUED, RUNNING):
+            job.update(state=FAILED, error="Job terhenti karena server restart.")
+        return job
+
+    def wait(self, job_id, timeout):
+        """Tunggu hingga job selesai/gagal atau timeout habis (pengganti sleep saat polling)"""
+        with self._changed:
+            self._changed.wait_for(lambda: self._jobs.get(job_id, {}).get("state") not in (QUEUED, RUNNING),
+                                   timeout=timeout)
+
+    def result(self, job_id):
+        """Isi result.json job yang sudah selesai"""
+        job = self.status(job_id)
+        if job is None or job["state"] != DONE: return None
+        with open(os.path.join(self.job_dir(job_id), RESULT_FILE), 'r') as f:
+            return json.load(f)
+
+    def preview_path(self, job_id):
+        path = os.path.join(self.job_dir(job_id), PREVIEW_FILE)
+        return path if os.path.exists(path) else None
+
+    # --- SUBMIT & EKSEKUSI ---
+    def submit(self, filename, data, runner):
+        """
+        Simpan upload ke folder job baru lalu antrekan. runner(input_path, out_json, out_glb)
+        dijalankan di thread worker. Return job ID; QueueFull jika antrian penuh.
+        """
+        self.cleanup()
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if j["state"] in (QUEUED, RUNNING))
+        if active >= self.max_concurrent + self.max_pending:
+            raise QueueFull(f"Antrian penuh ({active} job aktif). Coba lagi sebentar.")
+
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_dir(job_id))
+        ext = os.path.splitext(filename)[1].lower()
+        input_path = os.path.join(self.job_dir(job_id), "input" + ext)  # Ekstensi menentukan importer
+        with open(input_path, 'wb') as f: f.write(data)
+
+        self._update(job_id, filename=filename, state=QUEUED, created=time.time(),
+                     started=None, finished=None, error=None)
+        self._executor.submit(self._run, job_id, input_path, runner)
+        return job_id
+
+    def _run(self, job_id, input_path, runner):
+        self._update(job_id, state=RUNNING, started=time.time())
+        out_json = os.path.join(self.job_dir(job_id), RESULT_FILE)
+        out_glb = os.path.join(self.job_dir(job_id), PREVIEW_FILE)
+        try:
+            runner(input_path, out_json, out_glb)
+            if not os.path.exists(out_json): raise RuntimeError("No Result Data.")
+            self._update(job_id, state=DONE, finished=time.time())
+        except Exception as e:
+            self._update(job_id, state=FAILED, finished=time.time(), error=str(e))
+        finally:
+            if os.path.exists(input_path): os.remove(input_path)  # Upload tidak dibutuhkan lagi
+
+    # --- RETENSI ---
+    def cleanup(self, now=None):
+        """Hapus folder job yang selesai lebih lama dari masa retensi (job aktif tidak disentuh)"""
+        now = now or time.time()
+        with self._lock:
+            active = {j["id"] for j in self._jobs.values() if j["state"] in (QUEUED, RUNNING)}
+        removed = 0
+        for job_id in os.listdir(self.root):
+            if job_id in active or not _JOB_ID.fullmatch(job_id): continue
+            job = self.status(job_id) or {}
+            # Folder tanpa status.json (mis. crash saat submit) -> pakai mtime folder
+            finished = job.get("finished") or os.path.getmtime(self.job_dir(job_id))
+            if now - finished < self.retention: continue
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+            with self._lock: self._jobs.pop(job_id, None)
+            removed += 1
+        return removed
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,130 @@
+import heapq
+import numpy as np
+
+# --- KONFIGURASI ---
+LEAF_SIZE = 32   # Jumlah titik maksimum per daun; daun di-scan dengan numpy
+
+class KDTree:
+    """
+    KD-Tree untuk pencarian K tetangga terdekat pada fitur yang sudah ternormalisasi.
+    Dibangun SEKALI saat fit, query ~logaritmik terhadap jumlah data latih.
+
+    Hasil query identik dengan brute-force: jarak dihitung dengan urutan operasi yang
+    sama (kuadrat per kolom dijumlah kiri->kanan, lalu sqrt) dan urutan tetangga
+    ditentukan oleh (jarak, indeks) = sort stabil pada jalur brute-force.
+    """
+    def __init__(self, data, leaf_size=LEAF_SIZE):
+        data = np.asarray(data, dtype=np.float64)
+        self.n, self.dim = data.shape
+        self.leaf_size = max(1, leaf_size)
+        self._perm = np.arange(self.n, dtype=np.int64)
+        # Node disimpan dalam list paralel (lebih ringan dari objek per node)
+        self._start, self._end, self._left, self._right = [], [], [], []
+        self._box_lo, self._box_hi = [], []
+        if self.n:
+            self._build(data, 0, self.n)
+        self._points = data[self._perm]   # Titik diurutkan per daun -> scan daun kontigu
+
+    def _new_node(self, data, start, end):
+        pts = data[self._perm[start:end]]
+        self._start.append(start)
+        self._end.append(end)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._box_lo.append(pts.min(axis=0))
+        self._box_hi.append(pts.max(axis=0))
+        return len(self._start) - 1
+
+    def _build(self, data, start, end):
+        # Iteratif (tanpa rekursi) agar aman untuk jutaan titik
+        root = self._new_node(data, start, end)
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            s, e = self._start[node], self._end[node]
+            if e - s <= self.leaf_size: continue
+            spread = self._box_hi[node] - self._box_lo[node]
+            axis = int(np.argmax(spread))
+            if spread[axis] == 0: continue  # Semua titik identik -> jadikan daun
+
+            mid = (s + e) // 2
+            idx = self._perm[s:e]
+            order = np.argpartition(data[idx, axis], mid - s)
+            self._perm[s:e] = idx[order]
+
+            left = self._new_node(data, s, mid)
+            right = self._new_node(data, mid, e)
+            self._left[node], self._right[node] = left, right
+            stack.extend((left, right))
+
+        self._box_lo = np.array(self._box_lo)
+        self._box_hi = np.array(self._box_hi)
+
+    def _box_dist(self, node, q):
+        """Jarak minimum query ke kotak pembatas node (<= jarak ke titik mana pun di dalamnya)"""
+        gap = np.maximum(np.maximum(self._box_lo[node] - q, q - self._box_hi[node]), 0.0)
+        total = gap[0] * gap[0]
+        for i in range(1, self.dim):
+            total += gap[i] * gap[i]
+        return float(np.sqrt(total))
+
+    def _leaf_dist(self, s, e, q):
+        pts = self._points[s:e]
+        diff = pts[:, 0] - q[0]
+        sq = diff * diff
+        for i in range(1, self.dim):
+            diff = pts[:, i] - q[i]
+            sq += diff * diff
+        return np.sqrt(sq)
+
+    def query(self, q, k, alive=None):
+        """
+        K tetangga terdekat untuk satu titik -> (list indeks, list jarak) urut (jarak, indeks).
+        alive: mask boolean per titik; titik False dilewati (dihapus tanpa membangun ulang tree).
+        """
+        q = np.asarray(q, dtype=np.float64)
+        k = min(k, self.n if alive is None else int(np.count_nonzero(alive)))
+        if k <= 0: return [], []
+
+        best = []  # Max-heap berisi (-jarak, -indeks) -> elemen terburuk ada di best[0]
+        stack = [(0.0, 0)]
+        while stack:
+            bound, node = stack.pop()
+            if len(best) == k and bound > -best[0][0]: continue  # Seri tetap diperiksa
+
+            left = self._left[node]
+            if left < 0:
+                s, e = self._start[node], self._end[node]
+                dists = self._leaf_dist(s, e, q)
+                for j in range(e - s):
+                    d, i = float(dists[j]), int(self._perm[s + j])
+                    if alive is not None and not alive[i]: continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, -i))
+                    elif (d, i) < (-best[0][0], -best[0][1]):
+                        heapq.heapreplace(best, (-d, -i))
+                continue
+
+            right = self._right[node]
+            d_left, d_right = self._box_dist(left, q), self._box_dist(right, q)
+            # Child yang lebih dekat di-push terakhir agar diproses lebih dulu
+            if d_left <= d_right:
+                stack.append((d_right, right))
+                stack.append((d_left, left))
+            else:
+                stack.append((d_left, left))
+                stack.append((d_right, right))
+
+        result = sorted((-nd, -ni) for nd, ni in best)
+        return [i for _, i in result], [d for d, _ in result]
+
+    def query_batch(self, queries, k, alive=None):
+        """Versi banyak titik -> (indeks (Q x K), jarak (Q x K))"""
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, self.dim)
+        k = max(min(k, self.n if alive is None else int(np.count_nonzero(alive))), 0)
+        out_idx = np.empty((len(queries), k), dtype=np.int64)
+        out_dist = np.empty((len(queries), k), dtype=np.float64)
+        for r, q in enumerate(queries):
+            idx, dist = self.query(q, k, alive)
+            out_idx[r], out_dist[r] = idx, dist
+        return out_idx, out_dist
@@ -0,0 +1,540 @@
+import os
+import sys
+import math
+import random
+
+# Blender tidak otomatis memasukkan folder script ke sys.path -> modul pendamping tidak ketemu
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dataset_format import load_rows, load_dataset, resolve
+
+try:
+    import numpy as np  # Opsional: backend "numpy" & "kdtree" (Blender sudah membawa numpy)
+    import model_artifact
+    from kd_tree import KDTree
+    from ivf_index import IVFIndex
+except ImportError:
+    np = None
+    model_artifact = None
+    KDTree = None
+    IVFIndex = None
+
+# --- KONFIGURASI ---
+N_FEATURES = 5              # Poly, Vert, Mat, Tex, Rig
+BATCH_BLOCK_ELEMS = 1 << 22 # Batas sel matriks jarak (query x data latih) per blok (~32 MB float64)
+IVF_N_PROBE = 8             # Backend "ivf": cluster yang dipindai per query (naik = recall naik, lebih lambat)
+INDEX_REBUILD_FRACTION = 0.1  # partial_fit/remove: indeks dibangun ulang jika baris baru + terhapus > 10% isi indeks
+INDEX_REBUILD_MIN = 1024      # ... dan lebih dari jumlah ini (sampai batas tsb. baris baru cukup di-scan exact)
+
+# --- 1. MATEMATIKA BERSAMA (satu-satunya definisi Min-Max, jarak & voting) ---
+def min_max(rows):
+    """Min & Max per fitur dari baris [Poly, Vert, Mat, Tex, Rig, (Label)]"""
+    min_vals = [float('inf')] * N_FEATURES
+    max_vals = [float('-inf')] * N_FEATURES
+    for row in rows:
+        for i in range(N_FEATURES):
+            val = float(row[i])
+            if val < min_vals[i]: min_vals[i] = val
+            if val > max_vals[i]: max_vals[i] = val
+    return min_vals, max_vals
+
+def normalize(values, min_vals, max_vals):
+    """Min-Max satu baris (0.0 jika rentang fitur nol)"""
+    norm = []
+    for i in range(N_FEATURES):
+        denom = max_vals[i] - min_vals[i]
+        if denom == 0: norm.append(0.0)
+        else: norm.append((values[i] - min_vals[i]) / denom)
+    return norm
+
+def distance(a, b):
+    """Euclidean; kuadrat dijumlah kiri -> kanan (urutan yang sama dipakai backend numpy & KD-Tree)"""
+    return math.sqrt(sum((a[i] - b[i]) ** 2 for i in range(N_FEATURES)))
+
+def vote(neighbor_labels):
+    """Voting terbanyak (mode); jika seri, label pertama menurut abjad yang menang"""
+    if not neighbor_labels: return "Unknown"
+    unique_labels = sorted(set(neighbor_labels))
+    return max(unique_labels, key=neighbor_labels.count)
+
+# --- 2. ENGINE ---
+class KNNEngine:
+    """
+    Inti KNN bersama untuk produksi (backend_processor), Streamlit & evaluasi.
+
+    backend:
+        "native" -> Python murni (tanpa numpy, dipakai di Blender tanpa numpy)
+        "numpy"  -> matriks latih ternormalisasi + jarak per blok + argpartition
+        "kdtree" -> indeks KD-Tree dibangun sekali saat fit, query ~logaritmik
+        "ivf"    -> APPROXIMATE: partisi k-means, hanya n_probe cluster terdekat yang dipindai
+                    (untuk katalog jutaan aset; ukur kualitasnya dengan recall())
+        "auto"   -> "numpy" jika numpy tersedia, selain itu "native"
+    Semua backend exact menghasilkan tetangga (urut jarak, lalu indeks), jarak & label yang identik;
+    "ivf" juga identik jika n_probe=None (semua cluster).
+
+    Data latih bisa diubah tanpa fit ulang lewat partial_fit(rows) & remove(indices); hasilnya sama
+    dengan fit_rows() atas data latih yang sudah diubah.
+    """
+    BACKENDS = ("auto", "native", "numpy", "kdtree", "ivf")
+    INDEXED = ("kdtree", "ivf")
+
+    def __init__(self, k=5, backend="auto", n_probe=IVF_N_PROBE):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend KNN tidak dikenal: {backend}")
+        if backend == "auto":
+            backend = "numpy" if np is not None else "native"
+        if backend != "native" and np is None:
+            raise ImportError(f"Backend '{backend}' membutuhkan paket numpy.")
+        self.k = k
+        self.backend = backend
+        self.n_probe = n_probe
+        self.min_vals = []
+        self.max_vals = []
+        self.classes = []        # Label unik terurut abjad; kode label = indeks di list ini
+        self.label_codes = []    # Kode label per baris latih
+        self.n_rows = 0
+        self._norm_rows = None   # Baris latih ternormalisasi (backend native)
+        self._train_matrix = None
+        self._index = None       # KDTree / IVFIndex
+        self._alive = None       # Baris indeks yang belum di-remove() (None = semua)
+        self._raw = None         # Fitur mentah (matriks / list baris native) -> normalisasi ulang saat Min-Max bergeser
+        self._artifact = None    # Artefak model ter-memmap (lihat model_artifact.py)
+        self._dataset_path = None
+
+    # --- FIT ---
+    def fit(self, dataset_path):
+        """
+        Latih dari file dataset (.pds / JSON lama). Backend numpy/kdtree memakai artefak
+        model yang sudah dikompilasi (di-cache, dibangun ulang jika dataset berubah).
+        FileNotFoundError jika dataset tidak ada.
+        """
+        dataset_path = resolve(dataset_path)
+        if not os.path.exists(dataset_path):
+            raise FileNotFoundError(dataset_path)
+        if self.backend == "native":
+            return self.fit_rows(load_rows(dataset_path))
+
+        artifact = model_artifact.load_artifact(dataset_path)
+        self._reset()
+        self._artifact = artifact
+        self._dataset_path = dataset_path
+        self.min_vals = list(artifact.min_vals)
+        self.max_vals = list(artifact.max_vals)
+        self.classes = list(artifact.classes)
+        self.label_codes = artifact.label_codes
+        self.n_rows = artifact.n_rows
+        self._train_matrix = artifact.matrix
+        self._build_index()
+        return self
+
+    def fit_rows(self, rows):
+        """Latih dari list baris [Poly, Vert, Mat, Tex, Rig, Label] di memori"""
+        self._reset()
+        self.min_vals, self.max_vals = min_max(rows)
+        self.classes = sorted(set(row[-1] for row in rows))
+        code_of = {c: i for i, c in enumerate(self.classes)}
+        self.label_codes = [code_of[row[-1]] for row in rows]
+        self.n_rows = len(rows)
+
+        if self.backend == "native":
+            self._raw = [[float(x) for x in row[:N_FEATURES]] for row in rows]
+            self._norm_rows = [normalize(values, self.min_vals, self.max_vals) for values in self._raw]
+        else:
+            self.label_codes = np.asarray(self.label_codes, dtype=np.int16)
+            self._raw = self._raw_matrix(rows)
+            self._train_matrix = self.normalize_matrix(self._raw)
+            self._build_index()
+        return self
+
+    def _reset(self):
+        self._norm_rows = None
+        self._train_matrix = None
+        self._index = None
+        self._alive = None
+        self._raw = None
+        self._artifact = None
+        self._dataset_path = None
+
+    def _build_index(self):
+        if self.backend not in self.INDEXED: return
+        # Dari artefak: indeks dibangun sekali per proses & dipakai ulang oleh fit berikutnya
+        cache = self._artifact.indexes if self._artifact is not None else {}
+        if self.backend not in cache:
+            cache[self.backend] = self._new_index()
+        self._index = cache[self.backend]
+
+    def _new_index(self):
+        if self.backend == "kdtree": return KDTree(self._train_matrix)
+        if self._artifact is None: return IVFIndex(self._train_matrix)
+        # k-means IVF mahal untuk jutaan baris -> partisi disimpan di folder artefak (dipakai lintas proses)
+        arrays = model_artifact.load_index_arrays(self._artifact, "ivf")
+        if arrays is not None: return IVFIndex(self._train_matrix, arrays=arrays)
+        index = IVFIndex(self._train_matrix)
+        model_artifact.save_index_arrays(self._artifact, "ivf", index.to_arrays())
+        return index
+
+    # --- PEMBARUAN INKREMENTAL (tanpa fit ulang) ---
+    def partial_fit(self, rows):
+        """
+        Tambahkan baris [Poly, Vert, Mat, Tex, Rig, Label] di akhir data latih (indeks = fit_rows(lama + baru)).
+        Min-Max & normalisasi seluruh matriks hanya dihitung ulang jika baris baru melewati batas lama;
+        selain itu hanya baris baru yang dinormalisasi dan indeks tidak dibangun ulang (baris baru
+        di-scan exact sampai melewati INDEX_REBUILD_FRACTION).
+        """
+        rows = list(rows)
+        if not rows: return self
+        if not self.n_rows: return self.fit_rows(rows)
+        self._detach()
+        lo, hi = min_max(rows)
+        min_vals = [min(a, b) for a, b in zip(self.min_vals, lo)]
+        max_vals = [max(a, b) for a, b in zip(self.max_vals, hi)]
+        moved = min_vals != self.min_vals or max_vals != self.max_vals
+        self.min_vals, self.max_vals = min_vals, max_vals
+        self._set_classes(sorted(set(self.classes) | set(row[-1] for row in rows)))
+        code_of = {c: i for i, c in enumerate(self.classes)}
+        codes = [code_of[row[-1]] for row in rows]
+
+        if self.backend == "native":
+            raw = [[float(x) for x in row[:N_FEATURES]] for row in rows]
+            self._raw.extend(raw)
+            self.label_codes.extend(codes)
+            if moved:
+                self._norm_rows = [normalize(values, self.min_vals, self.max_vals) for values in self._raw]
+            else:
+                self._norm_rows.extend(normalize(values, self.min_vals, self.max_vals) for values in raw)
+        else:
+            raw = self._raw_matrix(rows)
+            self._raw = np.concatenate((self._raw, raw))
+            self.label_codes = np.concatenate((self.label_codes, np.asarray(codes, dtype=np.int16)))
+            if moved:
+                self._train_matrix = self.normalize_matrix(self._raw)
+            else:
+                self._train_matrix = np.concatenate((self._train_matrix, self.normalize_matrix(raw)))
+        self.n_rows += len(rows)
+        self._refresh_index(moved)
+        return self
+
+    def remove(self, indices):
+        """
+        Hapus baris latih pada indeks (posisi saat ini); baris sesudahnya bergeser = fit_rows() tanpa baris tsb.
+        Min-Max hanya dihitung ulang jika ada baris terhapus yang memegang nilai min/max suatu fitur.
+        IndexError jika indeks di luar data latih, ValueError jika semua baris dihapus.
+        """
+        drop = sorted(set(int(i) for i in indices))
+        if not drop: return self
+        if drop[0] < 0 or drop[-1] >= self.n_rows:
+            raise IndexError(f"Indeks data latih di luar rentang 0..{self.n_rows - 1}")
+        if len(drop) == self.n_rows:
+            raise ValueError("Tidak bisa menghapus semua data latih (gunakan fit_rows)")
+        self._detach()
+        self._drop_from_index(drop)
+
+        if self.backend == "native":
+            dropped = set(drop)
+            removed = [self._raw[i] for i in drop]
+            self._raw = [v for i, v in enumerate(self._raw) if i not in dropped]
+            self._norm_rows = [v for i, v in enumerate(self._norm_rows) if i not in dropped]
+            self.label_codes = [c for i, c in enumerate(self.label_codes) if i not in dropped]
+            held = any(values[i] in (self.min_vals[i], self.max_vals[i])
+                       for values in removed for i in range(N_FEATURES))
+            bounds = min_max(self._raw) if held else None
+        else:
+            keep = np.ones(self.n_rows, dtype=bool)
+            keep[drop] = False
+            removed = self._raw[~keep]
+            self._raw = self._raw[keep]
+            self._train_matrix = self._train_matrix[keep]
+            self.label_codes = self.label_codes[keep]
+            held = bool(np.any((removed == np.asarray(self.min_vals)) | (removed == np.asarray(self.max_vals))))
+            bounds = (self._raw.min(axis=0).tolist(), self._raw.max(axis=0).tolist()) if held else None
+        self.n_rows -= len(drop)
+
+        # Baris pemegang batas yang dihapus belum tentu menggeser batas (nilai yang sama ada di baris lain)
+        moved = bounds is not None and (bounds[0] != self.min_vals or bounds[1] != self.max_vals)
+        if moved:
+            self.min_vals, self.max_vals = bounds
+            if self.backend == "native":
+                self._norm_rows = [normalize(values, self.min_vals, self.max_vals) for values in self._raw]
+            else:
+                self._train_matrix = self.normalize_matrix(self._raw)
+        used = set(self.label_codes) if self.backend == "native" else set(np.unique(self.label_codes).tolist())
+        self._set_classes([c for i, c in enumerate(self.classes) if i in used])
+        self._refresh_index(moved)
+        return self
+
+    def _detach(self):
+        """
+        Sebelum data latih diubah: salin dari artefak ter-memmap ke memori (artefak, cache & indeksnya
+        dipakai bersama engine lain) dan muat fitur mentah dari dataset untuk normalisasi ulang.
+        """
+        if self._artifact is None: return
+        meta = self._artifact.meta
+        if model_artifact.file_stat(self._dataset_path) != (meta["dataset_size"], meta["dataset_mtime_ns"]):
+            raise RuntimeError(f"{self._dataset_path} berubah sejak fit(); panggil fit() ulang.")
+        self._raw = load_dataset(self._dataset_path).features()
+        self._train_matrix = np.array(self._train_matrix)
+        self.label_codes = np.array(self.label_codes, dtype=np.int16)
+        self._artifact = None
+
+    def _set_classes(self, classes):
+        """Ganti daftar kelas (terurut abjad) & petakan ulang kode label"""
+        if classes == self.classes: return
+        code_of = {c: i for i, c in enumerate(classes)}
+        remap = [code_of.get(c, -1) for c in self.classes]
+        if self.backend == "native":
+            self.label_codes = [remap[c] for c in self.label_codes]
+        else:
+            self.label_codes = np.asarray(remap, dtype=np.int16)[self.label_codes]
+        self.classes = classes
+
+    def _drop_from_index(self, drop):
+        """Tandai baris terhapus yang ada di indeks (posisi sebelum dihapus); indeks sendiri tidak diubah"""
+        if self._index is None: return
+        alive = np.ones(self._index.n, dtype=bool) if self._alive is None else self._alive.copy()
+        live = np.flatnonzero(alive)
+        drop = np.asarray(drop, dtype=np.int64)
+        alive[live[drop[drop < len(live)]]] = False
+        self._alive = alive
+
+    def _refresh_index(self, moved):
+        """
+        Bangun ulang indeks jika skala normalisasi berubah, atau baris baru (ekor) + baris mati sudah
+        terlalu banyak. IVF tanpa perubahan skala memakai centroid lama (tanpa k-means).
+        """
+        if self.backend not in self.INDEXED: return
+        live = self._index.n if self._alive is None else int(np.count_nonzero(self._alive))
+        stale = (self.n_rows - live) + (self._index.n - live)
+        if not moved and stale <= max(INDEX_REBUILD_MIN, INDEX_REBUILD_FRACTION * self._index.n): return
+        if self.backend == "ivf" and not moved:
+            self._index = IVFIndex(self._train_matrix, centroids=self._index.centroids)
+        else:
+            self._index = self._new_index()
+        self._alive = None
+
+    # --- NORMALISASI ---
+    @staticmethod
+    def _raw_matrix(rows):
+        if isinstance(rows, np.ndarray): return np.asarray(rows[:, :N_FEATURES], dtype=np.float64)
+        return np.array([[float(x) for x in row[:N_FEATURES]] for row in rows],
+                        dtype=np.float64).reshape(-1, N_FEATURES)
+
+    def normalize_matrix(self, raw):
+        """Versi vektor dari normalize() (operasi float64 per elemen yang sama persis)"""
+        return model_artifact.normalize_matrix(raw, self.min_vals, self.max_vals)
+
+    def label(self, idx):
+        return self.classes[self.label_codes[idx]]
+
+    # --- TETANGGA ---
+    def _kneighbors_native(self, values):
+        norm_input = normalize(values, self.min_vals, self.max_vals)
+        distances = [(idx, distance(norm_input, norm_train)) for idx, norm_train in enumerate(self._norm_rows)]
+        distances.sort(key=lambda x: x[1])  # Sort stabil -> jarak seri diurutkan menurut indeks
+        k_neighbors = distances[:self.k]
+        return [d[0] for d in k_neighbors], [d[1] for d in k_neighbors]
+
+    def _kneighbors_numpy(self, norm_queries, train=None):
+        """
+        Jarak query (Q x 5, ternormalisasi) ke matriks latih (default seluruh data latih) per blok
+        (maks BATCH_BLOCK_ELEMS sel), lalu K terdekat dipilih dengan argpartition.
+        """
+        train = self._train_matrix if train is None else train
+        n = train.shape[0]
+        q = norm_queries.shape[0]
+        k = min(self.k, n)
+        out_idx = np.empty((q, max(k, 0)), dtype=np.int64)
+        out_dist = np.empty((q, max(k, 0)), dtype=np.float64)
+        if k <= 0 or q == 0: return out_idx, out_dist
+
+        block = max(1, BATCH_BLOCK_ELEMS // n)
+        for start in range(0, q, block):
+            chunk = norm_queries[start:start + block]
+            # Jumlahkan kuadrat per kolom dari kiri ke kanan (urutan sama dengan distance())
+            diff = chunk[:, 0, None] - train[None, :, 0]
+            sq = diff * diff
+            for i in range(1, N_FEATURES):
+                diff = chunk[:, i, None] - train[None, :, i]
+                sq += diff * diff
+            dist = np.sqrt(sq, out=sq)
+
+            part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            part_dist = np.take_along_axis(dist, part, axis=1)
+            kth_val = part_dist.max(axis=1)
+            # Urutkan per baris berdasarkan (jarak, indeks) = sort stabil jalur native
+            order = np.lexsort((part, part_dist), axis=1)
+            sel_idx = np.take_along_axis(part, order, axis=1)
+            sel_dist = np.take_along_axis(part_dist, order, axis=1)
+
+            # Jika ada data seri di batas jarak ke-k, argpartition bisa memilih indeks
+            # yang salah -> hitung ulang baris tsb dengan sort stabil atas kandidat.
+            n_cand = np.count_nonzero(dist <= kth_val[:, None], axis=1)
+            for r in np.flatnonzero(n_cand > k):
+                cand = np.flatnonzero(dist[r] <= kth_val[r])
+                best = cand[np.argsort(dist[r, cand], kind='stable')][:k]
+                sel_idx[r] = best
+                sel_dist[r] = dist[r, best]
+
+            out_idx[start:start + len(chunk)] = sel_idx
+            out_dist[start:start + len(chunk)] = sel_dist
+        return out_idx, out_dist
+
+    def _kneighbors_indexed(self, norm_queries):
+        """
+        Query indeks + perubahan sejak indeks dibangun: baris yang sudah di-remove() dilewati indeks
+        (mask _alive), baris baru dari partial_fit() di-scan exact, lalu digabung urut (jarak, indeks).
+        """
+        live = self._index.n if self._alive is None else int(np.count_nonzero(self._alive))
+        k = min(self.k, live) if self.backend == "kdtree" else self.k
+        if self.backend == "kdtree":
+            idx, dist = self._index.query_batch(norm_queries, k, alive=self._alive)
+        else:
+            idx, dist = self._index.query_batch(norm_queries, k, self.n_probe, alive=self._alive)
+        if live == self.n_rows and self._alive is None: return idx, dist
+        if self._alive is not None:
+            idx = (np.cumsum(self._alive) - 1)[idx]   # Baris di indeks -> posisi di data latih saat ini
+        if live < self.n_rows:
+            tail_idx, tail_dist = self._kneighbors_numpy(norm_queries, self._train_matrix[live:])
+            idx = np.concatenate((idx, tail_idx + live), axis=1)
+            dist = np.concatenate((dist, tail_dist), axis=1)
+        order = np.lexsort((idx, dist), axis=1)[:, :min(self.k, self.n_rows)]
+        return np.take_along_axis(idx, order, axis=1), np.take_along_axis(dist, order, axis=1)
+
+    def kneighbors(self, rows):
+        """
+        K tetangga terdekat untuk banyak baris (list baris atau matriks N x 5).
+        Return (indeks (N x K), jarak (N x K)); array numpy, atau list of list untuk backend native.
+        """
+        if self.backend == "native":
+            neighbor_idx, neighbor_dist = [], []
+            for row in rows:
+                idx, dist = self._kneighbors_native([float(x) for x in row[:N_FEATURES]])
+                neighbor_idx.append(idx)
+                neighbor_dist.append(dist)
+            return neighbor_idx, neighbor_dist
+
+        norm_queries = self.normalize_matrix(self._raw_matrix(rows))
+        if self.backend in self.INDEXED: return self._kneighbors_indexed(norm_queries)
+        return self._kneighbors_numpy(norm_queries)
+
+    def recall(self, rows):
+        """
+        Kualitas backend terhadap jalur exact (scan numpy atas matriks latih yang sama):
+        recall = porsi tetangga exact yang ikut ditemukan, label_agreement = porsi prediksi yang sama.
+        """
+        if self.backend == "native": raise ValueError("recall() butuh backend numpy/kdtree/ivf")
+        exact_idx, _ = self._kneighbors_numpy(self.normalize_matrix(self._raw_matrix(rows)))
+        approx_idx, _ = self.kneighbors(rows)
+        hits = sum(len(set(a.tolist()) & set(e.tolist())) for a, e in zip(approx_idx, exact_idx))
+        same = sum(vote([self.label(i) for i in a]) == vote([self.label(i) for i in e])
+                   for a, e in zip(approx_idx, exact_idx))
+        return {"recall": hits / exact_idx.size if exact_idx.size else 1.0,
+                "label_agreement": same / len(exact_idx) if len(exact_idx) else 1.0}
+
+    # --- PREDIKSI ---
+    def predict_batch(self, rows):
+        """Return: (list label prediksi, indeks tetangga (N x K), jarak tetangga (N x K))"""
+        neighbor_idx, neighbor_dist = self.kneighbors(rows)
+        labels = [vote([self.label(i) for i in idx]) for idx in neighbor_idx]
+        return labels, neighbor_idx, neighbor_dist
+
+    def predict(self, row):
+        """Satu baris [Poly, Vert, Mat, Tex, Rig, (Label)] -> label prediksi"""
+        labels, _, _ = self.predict_batch([row])
+        return labels[0]
+
+# --- 3. CEK PARITAS ANTAR BACKEND ---
+def parity_report(train_rows, test_rows, k=5, backends=None):
+    """
+    Jalankan semua backend (ivf tanpa pendekatan) pada data yang sama; bandingkan tetangga, jarak & label
+    dengan backend native (referensi). Return list pesan selisih (kosong = identik).
+    """
+    backends = backends or [b for b in KNNEngine.BACKENDS if b not in ("auto", "native")]
+    reference = KNNEngine(k, "native").fit_rows(train_rows)
+    ref_labels, ref_idx, ref_dist = reference.predict_batch(test_rows)
+    problems = []
+    for backend in backends:
+        # ivf dengan n_probe=None memindai semua cluster -> harus identik dengan exact
+        engine = KNNEngine(k, backend, n_probe=None).fit_rows(train_rows)
+        labels, idx, dist = engine.predict_batch(test_rows)
+        for r in range(len(test_rows)):
+            if list(idx[r]) != list(ref_idx[r]) or [float(d) for d in dist[r]] != ref_dist[r]:
+                problems.append(f"{backend}: tetangga baris {r} berbeda ({list(idx[r])} vs {ref_idx[r]})")
+            elif labels[r] != ref_labels[r]:
+                problems.append(f"{backend}: label baris {r} berbeda ({labels[r]} vs {ref_labels[r]})")
+    return problems
+
+def incremental_report(train_rows, test_rows, k=5, backends=None, seed=0):
+    """
+    fit_rows(separuh data) lalu partial_fit per potongan kecil diselingi remove() acak; setiap langkah
+    dibandingkan dengan fit_rows numpy (= native, lihat parity_report) atas data latih yang sama.
+    Return list pesan selisih.
+    """
+    backends = backends or [b for b in KNNEngine.BACKENDS if b != "auto"]
+    rng = random.Random(seed)
+    current, pending = list(train_rows[:len(train_rows) // 2]), list(train_rows[len(train_rows) // 2:])
+    engines = {backend: KNNEngine(k, backend, n_probe=None).fit_rows(current) for backend in backends}
+    problems = []
+    step = 0
+    while pending and engines:
+        added = [pending.pop() for _ in range(min(len(pending), rng.randint(1, 25)))]
+        current += added
+        dropped = set(rng.sample(range(len(current)), rng.randint(1, 5))) \
+            if len(current) > 3 and rng.random() < 0.6 else set()
+        current = [row for i, row in enumerate(current) if i not in dropped]
+        step += 1
+        ref_labels, ref_idx, ref_dist = KNNEngine(k, "numpy").fit_rows(current).predict_batch(test_rows)
+        for backend, engine in list(engines.items()):
+            labels, idx, dist = engine.partial_fit(added).remove(dropped).predict_batch(test_rows)
+            if labels != ref_labels or [list(r) for r in idx] != ref_idx.tolist() \
+                    or [[float(d) for d in r] for r in dist] != ref_dist.tolist():
+                problems.append(f"{backend}: hasil berbeda setelah langkah {step}")
+                del engines[backend]
+    return problems
+
+def _tie_heavy_rows(n, seed):
+    """Data sintetis dengan banyak duplikat & jarak seri (kasus tersulit untuk paritas tie-break)"""
+    rng = random.Random(seed)
+    labels = ["High-Poly", "Low-Poly", "Medium-Poly"]
+    return [[rng.choice([100, 200, 300]), rng.choice([100, 400]), rng.randint(1, 3), rng.randint(0, 2),
+             rng.randint(0, 1), rng.choice(labels)] for _ in range(n)]
+
+def main():
+    # python knn_engine.py [train.pds test.pds] -> cek paritas semua backend (exit 1 jika berbeda)
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    args = sys.argv[1:]
+    train_file = args[0] if args else os.path.join(base_dir, "train_dataset.pds")
+    test_file = args[1] if len(args) > 1 else os.path.join(base_dir, "test_dataset.pds")
+
+    cases = [("dataset", load_rows(train_file), load_rows(test_file))]
+    for seed in range(3):
+        cases.append((f"seri-{seed}", _tie_heavy_rows(300, seed), _tie_heavy_rows(100, seed + 100)))
+    cases.append(("k>n", _tie_heavy_rows(3, 7), _tie_heavy_rows(10, 8)))
+
+    failed = False
+    for name, train_rows, test_rows in cases:
+        for k in (1, 5, 8):
+            problems = parity_report(train_rows, test_rows, k)
+            status = "OK" if not problems else f"{len(problems)} SELISIH"
+            print(f"{name:<10} k={k}  latih={len(train_rows):<5} uji={len(test_rows):<5} {status}")
+            for line in problems[:5]: print(f"  - {line}")
+            failed = failed or bool(problems)
+
+    # partial_fit / remove harus sama dengan fit ulang dari nol
+    for name, train_rows, test_rows in cases[:-1]:
+        problems = incremental_report(train_rows, test_rows, 5)
+        print(f"{name:<10} inkremental {'OK' if not problems else f'{len(problems)} SELISIH'}")
+        for line in problems: print(f"  - {line}")
+        failed = failed or bool(problems)
+
+    # Artefak model (fit dari file, dipakai produksi) harus sama dengan fit_rows
+    test_rows = cases[0][2]
+    reference = KNNEngine(5, "native").fit(train_file).predict_batch(test_rows)
+    for backend in ("numpy", "kdtree", "ivf"):
+        labels, idx, dist = KNNEngine(5, backend, n_probe=None).fit(train_file).predict_batch(test_rows)
+        same = labels == reference[0] and [list(r) for r in idx] == reference[1] \
+            and [[float(d) for d in r] for r in dist] == reference[2]
+        print(f"artefak    {backend:<6} {'OK' if same else 'BERBEDA'}")
+        failed = failed or not same
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,227 @@
-import objaverse
-import trimesh
+try:
+    import objaverse  # Opsional: tidak dibutuhkan jika sumber data folder lokal (--local)
+except ImportError:
+    objaverse = None
 import random
-import json
 import os
+import queue
 import shutil
+import argparse
+import tempfile
+import threading
+from extraction_cache import ExtractionCache
+from stream_counter import count_file
+from dataset_format import save_rows
+from process_local import asset_rng, simulate_row
 
 # --- KONFIGURASI ---
-TOTAL_SAMPLES = 500 
-OUTPUT_FILE = "objaverse_dataset.json"
+TOTAL_SAMPLES = 500
+OUTPUT_FILE = "objaverse_dataset.pds"
+CACHE_FILE = "objaverse_cache.jsonl"  # Hasil per UID ditulis langsung -> run yang terputus bisa dilanjutkan
+EXTRACTOR_VERSION = 3                 # v3: kolom simulasi dari RNG per UID (sama dengan process_local.py)
+BATCH_SIZE = 50                       # UID per unduhan
+PREFETCH_BATCHES = 2                  # Batch terunduh yang boleh antri menunggu ekstraksi
+MAX_STAGED_BYTES = 2 << 30            # Batas disk file unduhan yang belum diekstrak (lihat FetchPipeline)
+DOWNLOAD_PROCESSES = 4
 
-def get_smart_label_and_price(poly_count):
+# --- 1. SUMBER DATA (pluggable: list_uids() & fetch(uids) -> {uid: path}) ---
+# File hasil fetch milik pipeline: dihapus setelah diekstrak.
+class ObjaverseFetcher:
+    """Unduh dari Objaverse (~/.objaverse); file dihapus pipeline setelah diekstrak"""
+    def __init__(self, processes=DOWNLOAD_PROCESSES):
+        if objaverse is None: raise ImportError("Package 'objaverse' belum terpasang (pip install objaverse).")
+        self.processes = processes
+
+    def list_uids(self):
+        return objaverse.load_uids()
+
+    def fetch(self, uids):
+        return objaverse.load_objects(uids, download_processes=self.processes)
+
+class LocalDirFetcher:
     """
-    Logika pelabelan otomatis berdasarkan jumlah polygon.
-    Ini adalah 'Ground Truth' heuristik.
+    Folder lokal sebagai pengganti Objaverse (tes / offline). UID = nama file tanpa ekstensi.
+    fetch() menyalin ke folder staging (seperti unduhan) -> file sumber tidak ikut terhapus.
     """
-  
-    noise = random.randint(-5, 5)
-    
-    if poly_count < 5000:
-        price = max(5, 10 + noise)
-        return "Low-Poly", price
-    elif poly_count < 50000:
-        price = 30 + noise
-        return "Medium-Poly", price
-    else:
-        price = 60 + noise * 2
-        return "High-Poly", price
+    EXTENSIONS = (".glb", ".gltf", ".obj")
 
-def main():
-    print("1. Mengambil list UID dari Objaverse...")
-    uids = objaverse.load_uids()
-    
-    # Ambil sampel acak
-    selected_uids = random.sample(uids, TOTAL_SAMPLES)
-    print(f"2. Mendownload & Memproses {TOTAL_SAMPLES} model...")
-
-    dataset = []
-    
-    # Kita download batch kecil agar tidak memakan RAM
-    objects = objaverse.load_objects(selected_uids)
-    
-    success_count = 0
-    
-    for uid, path in objects.items():
+    def __init__(self, root, staging=None):
+        self.root = root
+        self.staging = staging or tempfile.mkdtemp(prefix="polypix-fetch-")
+        self._files = {os.path.splitext(name)[0]: os.path.join(root, name)
+                       for name in sorted(os.listdir(root)) if name.lower().endswith(self.EXTENSIONS)}
+
+    def list_uids(self):
+        return list(self._files)
+
+    def fetch(self, uids):
+        out = {}
+        for uid in uids:
+            src = self._files.get(uid)
+            if src is None: continue
+            dst = os.path.join(self.staging, os.path.basename(src))
+            shutil.copyfile(src, dst)
+            out[uid] = dst
+        return out
+
+# --- 2. PIPELINE UNDUH -> EKSTRAK ---
+class FetchPipeline:
+    """
+    Producer/consumer: thread producer mengunduh batch UID ke antrian terbatas (PREFETCH_BATCHES)
+    sementara consumer mengekstrak batch sebelumnya -> I/O jaringan & CPU tumpang tindih.
+    Consumer memanggil done(path) setelah ekstraksi: file dihapus & kuota disk dikembalikan.
+    Producer berhenti mengunduh selama file yang belum diekstrak >= max_bytes (ukuran batch
+    baru baru diketahui setelah diunduh -> batas bisa terlampaui paling banyak satu batch).
+    """
+    def __init__(self, fetcher, uids, batch_size=BATCH_SIZE, prefetch=PREFETCH_BATCHES,
+                 max_bytes=MAX_STAGED_BYTES):
+        self.fetcher = fetcher
+        self.uids = list(uids)
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.staged_bytes = 0
+        self.peak_bytes = 0
+        self._sizes = {}
+        self._current = {}   # Batch yang sedang diiterasi consumer
+        self._batches = queue.Queue(maxsize=prefetch)
+        self._space = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True, name="polypix-fetch")
+
+    def _produce(self):
+        try:
+            for start in range(0, len(self.uids), self.batch_size):
+                with self._space:
+                    self._space.wait_for(lambda: self._stop.is_set() or self.staged_bytes < self.max_bytes)
+                if self._stop.is_set(): return
+                batch = self.uids[start:start + self.batch_size]
+                try:
+                    paths = self.fetcher.fetch(batch)
+                except Exception as e:
+                    print(f"Error fetching batch {start // self.batch_size}: {e}")
+                    continue
+                with self._space:
+                    for path in paths.values():
+                        self._sizes[path] = os.path.getsize(path) if os.path.exists(path) else 0
+                        self.staged_bytes += self._sizes[path]
+                    self.peak_bytes = max(self.peak_bytes, self.staged_bytes)
+                while not self._stop.is_set():
+                    try:
+                        self._batches.put(paths, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                else:
+                    for path in paths.values(): self.done(path)  # Dihentikan -> buang batch ini
+        finally:
+            self._batches.put(None)
+
+    def __iter__(self):
+        """(uid, path) per file yang berhasil diunduh, urut batch"""
+        self._thread.start()
+        for paths in iter(self._batches.get, None):
+            self._current = paths
+            for uid, path in paths.items():
+                if self._stop.is_set():
+                    self.done(path)
+                else:
+                    yield uid, path
+
+    def done(self, path):
         try:
-            # Load mesh menggunakan trimesh (Cepat & Ringan)
-            mesh = trimesh.load(path, force='mesh')
-            
-            # Jika scene (banyak objek), gabungkan
-            if isinstance(mesh, trimesh.Scene):
-                # Dump semua geometry di scene menjadi satu mesh
-                geometries = list(mesh.geometry.values())
-                if not geometries: continue
-                mesh = trimesh.util.concatenate(geometries)
-
-            # Ekstrak Data
-            poly = len(mesh.faces)
-            vert = len(mesh.vertices)
-            
-            # sm: makin kompleks mesh, makin banyak material
-            mat = max(1, int(poly / 5000)) + random.randint(0, 2)
-            
-            # Buat Label
-            label, price = get_smart_label_and_price(poly)
-            
-            # Format Data untuk KNN Anda: [Poly, Vert, Mat, Tex, Rig, Label]
-            tex = random.randint(1, 5) if label != "Low-Poly" else 1
-            rig = 1 if label == "High-Poly" and random.random() > 0.5 else 0
-            
-            entry = [poly, vert, mat, tex, rig, label]
-            dataset.append(entry)
-            
-            success_count += 1
-            print(f"[{success_count}/{TOTAL_SAMPLES}] {uid[:8]}... -> P:{poly} ({label})")
-
-        except Exception as e:
-            print(f"Error processing {uid}: {e}")
-            continue
-            
-    # Simpan JSON
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(dataset, f, indent=2)
-        
-    print(f"\nSUKSES! {len(dataset)} data tersimpan di {OUTPUT_FILE}")
-    print("PENTING: Cek folder user directory anda (misal C:/Users/Name/.objaverse) dan hapus isinya jika sudah selesai.")
+            os.remove(path)
+        except OSError:
+            pass
+        with self._space:
+            self.staged_bytes -= self._sizes.pop(path, 0)
+            self._space.notify_all()
+
+    def close(self):
+        """Hentikan producer & hapus file yang sudah diunduh tapi belum diekstrak"""
+        self._stop.set()
+        with self._space: self._space.notify_all()
+        if self._thread.ident is None: return  # Belum pernah diiterasi
+        for path in self._current.values(): self.done(path)  # Sisa batch saat consumer berhenti (done() idempoten)
+        while True:
+            alive = self._thread.is_alive()
+            try:
+                paths = self._batches.get(timeout=0.1)
+            except queue.Empty:
+                if alive: continue
+                break   # Producer sudah selesai & antrian kosong
+            for path in (paths or {}).values(): self.done(path)
+        self._thread.join()
+
+# --- 3. EKSTRAKSI ---
+def extract_row(path, uid):
+    """
+    Satu file -> [Poly, Vert, Mat, Tex, Rig, Label] atau None jika tanpa mesh.
+    Kolom simulasi memakai RNG per UID dari process_local -> aset yang sama menghasilkan baris yang
+    sama di kedua pipeline dan di setiap run.
+    """
+    # Hitung langsung dari chunk JSON GLB (accessor count) -> buffer geometri tidak di-decode
+    counts = count_file(path, triangulate=True)   # Semantik dataset, sama dengan process_local.py
+    if counts.poly == 0: return None
+    return simulate_row(counts.poly, counts.vert, asset_rng(uid))
+
+def mine(fetcher, total=TOTAL_SAMPLES, cache_file=CACHE_FILE, output_file=OUTPUT_FILE,
+         batch_size=BATCH_SIZE, max_bytes=MAX_STAGED_BYTES):
+    print("1. Mengambil list UID...")
+    uids = fetcher.list_uids()
+
+    # UID yang sudah pernah diproses (run sebelumnya) tidak diunduh/diekstrak ulang
+    cache = ExtractionCache(cache_file, version=EXTRACTOR_VERSION)
+    success_count = sum(1 for uid in cache.keys() if cache.lookup(uid))
+    candidates = [u for u in uids if u not in cache]
+    # Urutan acak; diunduh bertahap sampai target tercapai (file tanpa mesh tidak mengurangi target)
+    random.shuffle(candidates)
+    print(f"2. {success_count} model dari cache, target {total}: mengunduh & memproses per batch {batch_size}...")
+
+    pipeline = FetchPipeline(fetcher, candidates if success_count < total else [], batch_size, max_bytes=max_bytes)
+    try:
+        for uid, path in pipeline:
+            try:
+                entry = extract_row(path, uid)
+                cache.record(uid, entry)  # None = tanpa mesh -> tidak diunduh ulang di run berikutnya
+                if entry is None: continue
+                success_count += 1
+                print(f"[{success_count}/{total}] {uid[:8]}... -> P:{entry[0]} ({entry[-1]})")
+            except Exception as e:
+                print(f"Error processing {uid}: {e}")
+            finally:
+                pipeline.done(path)  # Hapus file setelah diekstrak -> disk konstan
+            if success_count >= total: break
+    finally:
+        pipeline.close()
+        cache.close()
+
+    # Dataset akhir = semua baris di cache (run ini + run sebelumnya)
+    dataset = [cache.lookup(uid) for uid in cache.keys()]
+    dataset = [row for row in dataset if row]
+
+    # Simpan dataset biner (atomik)
+    save_rows(output_file, dataset)
+
+    print(f"\nSUKSES! {len(dataset)} data tersimpan di {output_file}")
+    print(f"Disk puncak untuk file unduhan: {pipeline.peak_bytes / (1 << 20):.1f} MB (semua file sudah dihapus)")
+    return dataset
+
+def main():
+    parser = argparse.ArgumentParser(description="Mining dataset dari Objaverse (streaming unduh -> ekstrak -> hapus)")
+    parser.add_argument("--total", type=int, default=TOTAL_SAMPLES)
+    parser.add_argument("--local", help="Folder berisi .glb/.gltf/.obj sebagai pengganti Objaverse")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-disk-mb", type=int, default=MAX_STAGED_BYTES >> 20)
+    parser.add_argument("--processes", type=int, default=DOWNLOAD_PROCESSES, help="Proses unduh Objaverse")
+    parser.add_argument("--cache", default=CACHE_FILE)
+    parser.add_argument("--out", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    fetcher = LocalDirFetcher(args.local) if args.local else ObjaverseFetcher(args.processes)
+    try:
+        mine(fetcher, args.total, args.cache, args.out, args.batch, args.max_disk_mb << 20)
+    finally:
+        if args.local: shutil.rmtree(fetcher.staging, ignore_errors=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
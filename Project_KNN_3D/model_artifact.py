@@ -0,0 +1,169 @@
+import os
+import json
+import numpy as np
+from dataset_format import load_dataset, resolve
+from extraction_cache import file_hash
+
+# --- KONFIGURASI ---
+ARTIFACT_VERSION = 1          # Naikkan jika format artefak berubah -> semua artefak lama dibangun ulang
+ARTIFACT_SUFFIX = ".model"    # train_dataset.pds -> train_dataset.model/
+META_FILE = "meta.json"
+
+# Cache per proses: path dataset -> (stat, ModelArtifact). Dipakai ulang antar request
+# (worker Blender yang hidup lama, rerun Streamlit) selama file sumber tidak berubah.
+_CACHE = {}
+
+class ModelArtifact:
+    """
+    Model KNN yang sudah "dikompilasi" dari dataset (.pds / JSON lama):
+    matriks fitur ternormalisasi (N x 5), kode label, daftar kelas, Min-Max, dan hash dataset.
+    Matriks & label dibuka dengan memory-map sehingga biaya load ~konstan.
+    """
+    def __init__(self, meta, matrix, label_codes, path=None):
+        self.meta = meta
+        self.path = path    # Folder artefak (untuk indeks yang disimpan ke disk)
+        self.matrix = matrix
+        self.label_codes = label_codes
+        self.classes = meta["classes"]
+        self.min_vals = meta["min_vals"]
+        self.max_vals = meta["max_vals"]
+        self.dataset_hash = meta["dataset_hash"]
+        self.n_rows = meta["n_rows"]
+        self.indexes = {}   # Indeks pencarian (KD-Tree, IVF) yang sudah dibangun di proses ini
+
+    def label(self, idx):
+        return self.classes[self.label_codes[idx]]
+
+def artifact_dir(dataset_path):
+    return os.path.splitext(os.path.abspath(dataset_path))[0] + ARTIFACT_SUFFIX
+
+def file_stat(path):
+    """Sidik jari murah (ukuran, mtime) untuk cek perubahan tanpa membaca isi file"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def normalize_matrix(raw, min_vals, max_vals):
+    """Min-Max per kolom, identik dengan _normalize() versi native (0.0 jika rentang nol)"""
+    norm = np.zeros_like(raw)
+    for i in range(5):
+        denom = max_vals[i] - min_vals[i]
+        if denom != 0: norm[:, i] = (raw[:, i] - min_vals[i]) / denom
+    return norm
+
+# File sementara memuat PID: beberapa proses (worker batch, pool Blender) bisa membangun artefak bersamaan
+def _write_json_atomic(path, payload):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f: json.dump(payload, f)
+    os.replace(tmp, path)
+
+def _save_npy_atomic(path, arr):
+    """np.save ke file sementara lalu rename -> pembaca lain tidak pernah melihat file setengah jadi"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f: np.save(f, arr)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Windows: file tujuan sedang di-memmap proses lain. Nama memuat hash dataset -> isinya sama.
+        os.remove(tmp)
+
+def build_artifact(dataset_path):
+    """Baca dataset sekali (kolom + Min-Max dari header .pds), normalisasi, lalu simpan ke folder artefak"""
+    digest = file_hash(dataset_path)
+    stat = file_stat(dataset_path)
+    dataset = load_dataset(dataset_path)
+
+    raw = dataset.features()
+    min_vals, max_vals = dataset.min_vals, dataset.max_vals
+    classes = dataset.classes   # Sudah terurut abjad = kode label
+    label_codes = np.asarray(dataset.label_codes, dtype=np.int16)
+
+    out_dir = artifact_dir(dataset_path)
+    os.makedirs(out_dir, exist_ok=True)
+    # Nama file memuat hash dataset: file lama yang masih di-memmap (Windows) tidak perlu ditimpa
+    matrix_file = f"matrix-{digest[:16]}.npy"
+    labels_file = f"labels-{digest[:16]}.npy"
+    _save_npy_atomic(os.path.join(out_dir, matrix_file), normalize_matrix(raw, min_vals, max_vals))
+    _save_npy_atomic(os.path.join(out_dir, labels_file), label_codes)
+
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "dataset_hash": digest,
+        "dataset_size": stat[0],
+        "dataset_mtime_ns": stat[1],
+        "n_rows": dataset.n_rows,
+        "min_vals": min_vals,
+        "max_vals": max_vals,
+        "classes": classes,
+        "matrix_file": matrix_file,
+        "labels_file": labels_file,
+    }
+    # meta.json ditulis terakhir = penanda artefak lengkap
+    _write_json_atomic(os.path.join(out_dir, META_FILE), meta)
+
+    # Bersihkan file versi lama (boleh gagal jika masih terbuka)
+    for name in os.listdir(out_dir):
+        stale_index = name.endswith((".npz", ".png")) and digest[:16] not in name  # Indeks & render visualisasi
+        if (name.endswith(".npy") and name not in (matrix_file, labels_file)) or stale_index:
+            try: os.remove(os.path.join(out_dir, name))
+            except OSError: pass
+    return meta
+
+def _read_meta(dataset_path):
+    path = os.path.join(artifact_dir(dataset_path), META_FILE)
+    try:
+        with open(path, 'r') as f: meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == ARTIFACT_VERSION else None
+
+def _meta_is_fresh(dataset_path, meta, stat):
+    if meta is None: return False
+    if (meta["dataset_size"], meta["dataset_mtime_ns"]) == stat: return True
+    # mtime berubah (mis. file disalin ulang) -> cek isi lewat hash
+    if meta["dataset_size"] == stat[0] and file_hash(dataset_path) == meta["dataset_hash"]:
+        meta["dataset_mtime_ns"] = stat[1]
+        _write_json_atomic(os.path.join(artifact_dir(dataset_path), META_FILE), meta)
+        return True
+    return False
+
+def load_artifact(dataset_path):
+    """
+    Ambil artefak model untuk dataset_path. Urutan:
+    1. Cache proses (stat file sama) -> tanpa I/O tambahan
+    2. Artefak di disk masih cocok dengan dataset -> memory-map
+    3. Dataset berubah / artefak belum ada -> build ulang otomatis
+    """
+    key = os.path.abspath(resolve(dataset_path))
+    stat = file_stat(key)
+    cached = _CACHE.get(key)
+    if cached and cached[0] == stat:
+        return cached[1]
+
+    meta = _read_meta(key)
+    if not _meta_is_fresh(key, meta, stat):
+        meta = build_artifact(key)
+
+    out_dir = artifact_dir(key)
+    matrix = np.load(os.path.join(out_dir, meta["matrix_file"]), mmap_mode='r')
+    label_codes = np.load(os.path.join(out_dir, meta["labels_file"]), mmap_mode='r')
+    artifact = ModelArtifact(meta, matrix, label_codes, out_dir)
+    _CACHE[key] = (stat, artifact)
+    return artifact
+
+# --- INDEKS TERSIMPAN (mis. partisi IVF: mahal dibangun, dipakai ulang lintas proses) ---
+def _index_file(artifact, name):
+    return os.path.join(artifact.path, f"{name}-{artifact.dataset_hash[:16]}.npz")
+
+def load_index_arrays(artifact, name):
+    """Array indeks `name` untuk versi dataset ini, atau None jika belum dibangun"""
+    try:
+        with np.load(_index_file(artifact, name)) as data:
+            return {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return None
+
+def save_index_arrays(artifact, name, arrays):
+    path = _index_file(artifact, name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f: np.savez(f, **arrays)
+    os.replace(tmp, path)
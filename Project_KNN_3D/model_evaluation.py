@@ -1,64 +1,156 @@
-import json
-import math
 import sys
+import random
+import argparse
+import statistics
+from dataset_format import load_rows
+from data_splitter import read_pair
+from knn_engine import KNNEngine, vote
+
+try:
+    import numpy as np  # Opsional: voting semua k sekaligus di mode --cv
+except ImportError:
+    np = None
 
 # --- KONFIGURASI ---
-TRAIN_FILE = "train_dataset.json"
-TEST_FILE = "test_dataset.json"
-
-# --- FUNGSI MATEMATIKA (Sama persis dengan backend Anda) ---
-def get_min_max(dataset):
-    min_vals = [float('inf')] * 5
-    max_vals = [float('-inf')] * 5
-    for row in dataset:
-        for i in range(5):
-            val = float(row[i])
-            if val < min_vals[i]: min_vals[i] = val
-            if val > max_vals[i]: max_vals[i] = val
-    return min_vals, max_vals
-
-def normalize(raw_values, min_vals, max_vals):
-    norm = []
-    for i in range(5):
-        denom = max_vals[i] - min_vals[i]
-        if denom == 0: norm.append(0.0)
-        else: norm.append((raw_values[i] - min_vals[i]) / denom)
-    return norm
-
-def predict_knn_single(input_row, training_data, min_v, max_v, k=5):
-    # Input row: [Poly, Vert, Mat, Tex, Rig, ActualLabel]
-    # Kita hanya ambil 5 fitur pertama untuk prediksi
-    input_feats = [float(x) for x in input_row[:5]]
-    norm_input = normalize(input_feats, min_v, max_v)
-    
-    distances = []
-    for row in training_data:
-        train_feats = [float(x) for x in row[:5]]
-        norm_train = normalize(train_feats, min_v, max_v)
-        
-        # Euclidean Distance
-        dist = math.sqrt(sum((norm_input[i] - norm_train[i])**2 for i in range(5)))
-        distances.append((row[-1], dist)) # Simpan (Label, Jarak)
-    
-    # Sort jarak terdekat
-    distances.sort(key=lambda x: x[1])
-    
-    # Ambil K tetangga
-    k = min(k, len(training_data))
-    neighbors = [d[0] for d in distances[:k]]
-    
-    # Voting
-    prediction = max(set(neighbors), key=neighbors.count)
-    return prediction
+TRAIN_FILE = "train_dataset.pds"
+TEST_FILE = "test_dataset.pds"
+CV_FILE = "objaverse_dataset.pds"   # Mode --cv: seluruh data mentah (file train/test tidak disentuh)
+LABELS = ["Low-Poly", "Medium-Poly", "High-Poly"]
+# Indeks pencarian -> backend knn_engine ("auto" = numpy, atau Python murni jika numpy tidak ada)
+INDEXES = {"brute": "auto", "kdtree": "kdtree", "native": "native"}
+
+# --- PREDIKSI (engine yang sama dengan backend & Streamlit -> akurasi = perilaku produksi) ---
+def predict_knn_batch(test_rows, training_data, k=5, index="brute"):
+    """
+    Prediksi banyak baris sekaligus. Min-Max dipelajari dari training_data.
+    index: "brute" (matriks jarak per blok), "kdtree" (KD-Tree) atau "native" (loop Python);
+    ketiganya menghasilkan tetangga & label identik.
+    Return: (labels, neighbor_idx, neighbor_dist)
+    """
+    return KNNEngine(k, INDEXES[index]).fit_rows(training_data).predict_batch(test_rows)
+
+def confusion(actual_labels, predictions, labels=LABELS):
+    """(jumlah benar, confusion matrix [asli][prediksi])"""
+    matrix = {l: {l2: 0 for l2 in labels} for l in labels}
+    correct = 0
+    for actual, predicted in zip(actual_labels, predictions):
+        if predicted == actual: correct += 1
+        if actual in labels and predicted in labels:
+            matrix[actual][predicted] += 1
+    return correct, matrix
+
+def print_confusion(matrix, labels=LABELS):
+    print("\nCONFUSION MATRIX (Baris=Asli, Kolom=Prediksi):")
+    print(f"{'':<12} | {'Low':<8} | {'Med':<8} | {'High':<8}")
+    print("-" * 46)
+    for l in labels:
+        row_str = f"{l:<12} | "
+        for l2 in labels:
+            val = matrix[l][l2]
+            row_str += f"{val:<8} | "
+        print(row_str)
+    print("-" * 46)
+
+# --- CROSS-VALIDATION & SWEEP K ---
+def stratified_folds(labels, n_folds, seed):
+    """Indeks baris dibagi ke n_folds fold; tiap kelas diacak lalu dibagikan bergiliran (proporsi kelas terjaga)"""
+    rng = random.Random(seed)
+    by_class = {}
+    for i, label in enumerate(labels): by_class.setdefault(label, []).append(i)
+    folds = [[] for _ in range(n_folds)]
+    offset = 0
+    for label in sorted(by_class):
+        idx = by_class[label]
+        rng.shuffle(idx)
+        for j, i in enumerate(idx): folds[(offset + j) % n_folds].append(i)
+        offset += len(idx)  # Kelas berikutnya mulai dari fold lain -> ukuran fold seimbang
+    return [sorted(f) for f in folds]
+
+def sweep_predictions(engine, neighbor_idx, ks):
+    """
+    Prediksi untuk setiap k dari SATU daftar tetangga terurut (panjang max(ks)):
+    tetangga k terdekat = prefiks daftar tsb, jadi matriks jarak cukup dihitung sekali.
+    Return {k: list label}
+    """
+    if np is None:
+        return {k: [vote([engine.label(i) for i in idx[:k]]) for idx in neighbor_idx] for k in ks}
+    codes = np.asarray(engine.label_codes)[np.asarray(neighbor_idx)]          # Q x K
+    onehot = codes[:, :, None] == np.arange(len(engine.classes))[None, None, :]
+    counts = np.cumsum(onehot, axis=1)                                        # Q x K x kelas
+    # argmax memilih kelas pertama (abjad) saat seri = tie-break vote()
+    return {k: [engine.classes[c] for c in counts[:, min(k, codes.shape[1]) - 1].argmax(axis=1)] for k in ks}
+
+def cross_validate(rows, ks, n_folds=5, repeats=3, seed=0, index="brute"):
+    """
+    Stratified k-fold diulang `repeats` kali (seed berbeda). Per fold: fit sekali, tetangga
+    max(ks) dihitung sekali, semua k dibaca dari daftar itu.
+    Return {k: {"scores": akurasi per fold (%), "matrix": confusion matrix gabungan}}
+    """
+    labels = [row[-1] for row in rows]
+    results = {k: {"scores": [], "matrix": confusion([], [])[1]} for k in ks}
+    for r in range(repeats):
+        folds = stratified_folds(labels, n_folds, seed + r)
+        for f, test_idx in enumerate(folds):
+            if not test_idx: continue
+            held_out = set(test_idx)
+            train = [rows[i] for i in range(len(rows)) if i not in held_out]
+            test = [rows[i] for i in test_idx]
+            actual = [row[-1] for row in test]
+            engine = KNNEngine(max(ks), INDEXES[index]).fit_rows(train)
+            neighbor_idx, _ = engine.kneighbors(test)
+            for k, predictions in sweep_predictions(engine, neighbor_idx, ks).items():
+                correct, matrix = confusion(actual, predictions)
+                results[k]["scores"].append(correct / len(test) * 100)
+                for a in LABELS:
+                    for p in LABELS: results[k]["matrix"][a][p] += matrix[a][p]
+    return results
+
+def parse_k_range(text):
+    """'1-15' -> [1..15], '3,5,7' -> [3, 5, 7], '1-15:2' -> [1, 3, ..., 15]"""
+    ks = []
+    for part in text.split(","):
+        part, _, step = part.partition(":")
+        lo, _, hi = part.partition("-")
+        ks.extend(range(int(lo), int(hi or lo) + 1, int(step or 1)))
+    return sorted(set(k for k in ks if k > 0))
+
+def run_cv(args):
+    try:
+        rows = load_rows(args.data)
+    except FileNotFoundError:
+        print(f"ERROR: File dataset {args.data} tidak ditemukan.")
+        return
+    ks = parse_k_range(args.k)
+    print(f"Data       : {args.data} ({len(rows)} sampel)")
+    print(f"Validasi   : stratified {args.folds}-fold x {args.repeats} ulangan, k = {ks[0]}..{ks[-1]}")
+    print("-" * 40)
+
+    results = cross_validate(rows, ks, args.folds, args.repeats, args.seed, args.index)
+    print(f"{'k':>3} | {'Akurasi':>8} | {'Std':>6} | {'Min':>7} | {'Max':>7}")
+    print("-" * 44)
+    for k in ks:
+        scores = results[k]["scores"]
+        std = statistics.pstdev(scores) if len(scores) > 1 else 0.0
+        print(f"{k:>3} | {statistics.mean(scores):>7.2f}% | {std:>6.2f} | {min(scores):>6.2f}% | {max(scores):>6.2f}%")
+    print("-" * 44)
+
+    # k terbaik: akurasi rata-rata tertinggi; jika seri, yang paling stabil lalu k terkecil
+    best = min(ks, key=lambda k: (-statistics.mean(results[k]["scores"]), statistics.pstdev(results[k]["scores"]), k))
+    print(f"\nk TERBAIK: {best} (akurasi rata-rata {statistics.mean(results[best]['scores']):.2f}%)")
+    if args.matrices:
+        for k in ks:
+            print(f"\n[k={k}]", end="")
+            print_confusion(results[k]["matrix"])
+    else:
+        print_confusion(results[best]["matrix"])
 
 # --- MAIN EVALUATION ---
-def main():
+def run_holdout(index):
     print("--- MEMULAI EVALUASI MODEL ---")
-    
+
     # 1. Load Data
     try:
-        with open(TRAIN_FILE, 'r') as f: train_data = json.load(f)
-        with open(TEST_FILE, 'r') as f: test_data = json.load(f)
+        train_data, test_data = read_pair(TRAIN_FILE, TEST_FILE, lambda train, test: (load_rows(train), load_rows(test)))
     except FileNotFoundError:
         print("ERROR: File dataset tidak ditemukan. Pastikan sudah menjalankan splitting.")
         return
@@ -67,33 +159,15 @@ def main():
     print(f"Data Uji   : {len(test_data)} sampel")
     print("-" * 40)
 
-    # 2. Pre-calculation (Min-Max) dari Training Data
-    min_v, max_v = get_min_max(train_data)
-
-    # 3. Proses Pengujian
-    correct = 0
+    # 2. Proses Pengujian (Min-Max dipelajari dari Training Data di dalam engine)
     total = len(test_data)
-    
-    # Untuk Confusion Matrix
-    labels = ["Low-Poly", "Medium-Poly", "High-Poly"]
-    matrix = {l: {l2: 0 for l2 in labels} for l in labels}
-    
     print("Sedang menguji...", end="")
-    
-    for row in test_data:
-        actual = row[-1] # Label asli ada di kolom terakhir
-        predicted = predict_knn_single(row, train_data, min_v, max_v, k=5)
-        
-        if predicted == actual:
-            correct += 1
-            
-        # Isi Matrix [Actual][Predicted]
-        if actual in labels and predicted in labels:
-            matrix[actual][predicted] += 1
-            
+    predictions, _, _ = predict_knn_batch(test_data, train_data, k=5, index=index)
+    # Label asli ada di kolom terakhir; matrix [Actual][Predicted]
+    correct, matrix = confusion([row[-1] for row in test_data], predictions)
     print(" Selesai.\n")
 
-    # 4. Tampilkan Hasil Statistik
+    # 3. Tampilkan Hasil Statistik
     accuracy = (correct / total) * 100
     print("=" * 40)
     print(f"HASIL AKHIR (METODE KNN, K=5)")
@@ -101,17 +175,28 @@ def main():
     print(f"Akurasi Model : {accuracy:.2f}%")
     print(f"Jumlah Benar  : {correct} dari {total}")
     print("-" * 40)
-    
-    print("\nCONFUSION MATRIX (Baris=Asli, Kolom=Prediksi):")
-    print(f"{'':<12} | {'Low':<8} | {'Med':<8} | {'High':<8}")
-    print("-" * 46)
-    for l in labels:
-        row_str = f"{l:<12} | "
-        for l2 in labels:
-            val = matrix[l][l2]
-            row_str += f"{val:<8} | "
-        print(row_str)
-    print("-" * 46)
+    print_confusion(matrix)
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluasi model KNN (holdout train/test atau cross-validation)")
+    parser.add_argument("--kdtree", dest="index", action="store_const", const="kdtree", default="brute",
+                        help="Pakai indeks KD-Tree (hasil identik)")
+    parser.add_argument("--native", dest="index", action="store_const", const="native",
+                        help="Pakai loop Python murni (hasil identik)")
+    parser.add_argument("--cv", action="store_true", help="Stratified k-fold cross-validation + sweep k")
+    parser.add_argument("--data", default=CV_FILE, help="Dataset untuk --cv (default: data mentah lengkap)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3, help="Jumlah ulangan k-fold dengan pengacakan berbeda")
+    parser.add_argument("--k", default="1-15", help="Rentang k, mis. 1-15, 3,5,7 atau 1-21:2")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--matrices", action="store_true", help="Tampilkan confusion matrix untuk setiap k")
+    args = parser.parse_args()
+
+    if args.cv:
+        print("--- CROSS-VALIDATION MODEL KNN ---")
+        run_cv(args)
+    else:
+        run_holdout(args.index)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
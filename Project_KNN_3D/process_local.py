@@ -1,18 +1,33 @@
 import os
-import json
-import trimesh
+import re
+import sys
+import zlib
+import signal
 import random
+from extraction_cache import ExtractionCache, MISS, file_hash
+from stream_counter import count_file
+from dataset_format import save_rows
+from deadline_pool import DeadlinePool, OK, TIMEOUT
 
 # --- KONFIGURASI KRITIS ---
 # GANTI PATH INI dengan lokasi folder tempat 357 file Anda berada
 # Contoh: r"C:\Users\echaa\.objaverse\hf-objaverse-v1\glbs"
-SOURCE_FOLDER = r"E:\Project_KNN_3D\Project_KNN_3D\.objaverse\hf-objaverse-v1\glbs" 
+SOURCE_FOLDER = r"E:\Project_KNN_3D\Project_KNN_3D\.objaverse\hf-objaverse-v1\glbs"
 
-OUTPUT_FILE = "objaverse_dataset.json"
+OUTPUT_FILE = "objaverse_dataset.pds"
+CACHE_FILE = "extraction_cache.jsonl"   # Cache per file (path, size, mtime, hash) -> run ulang hanya proses file baru/berubah
+EXTRACTOR_VERSION = 5                   # v5: seed RNG file non-Objaverse dari path relatif -> cache lama diekstrak ulang
 
-def get_smart_label_and_price(poly_count):
+# --- KONFIGURASI PARALEL ---
+WORKERS = max(1, (os.cpu_count() or 2) - 1)  # 1 = satu worker (tanpa timeout: serial di proses ini)
+FILE_TIMEOUT = 120                           # Detik per file; file yang lebih lama di-skip
+KILL_GRACE = 5                               # Detik tambahan sebelum worker yang macet di-terminate induk
+SEED = 42                                    # Seed dasar RNG per file (kolom simulasi mat/tex/rig)
+OBJAVERSE_UID = re.compile(r"[0-9a-f]{32}")  # Nama file unduhan Objaverse: <UID>.glb
+
+def get_smart_label_and_price(poly_count, rng=random):
     # Logika pelabelan otomatis (Heuristik)
-    noise = random.randint(-5, 5)
+    noise = rng.randint(-5, 5)
     if poly_count < 5000:
         return "Low-Poly", max(5, 10 + noise)
     elif poly_count < 50000:
@@ -20,75 +35,168 @@ def get_smart_label_and_price(poly_count):
     else:
         return "High-Poly", 60 + noise * 2
 
+def cache_key(file_path):
+    """Path relatif terhadap SOURCE_FOLDER (pemisah '/') -> key cache yang portabel (juga ID aset file non-Objaverse)"""
+    return os.path.relpath(file_path, SOURCE_FOLDER).replace(os.sep, "/")
+
+def asset_rng(asset_id):
+    """
+    RNG per aset: seed dari ID aset -> hasil sama berapa pun jumlah worker & urutan selesai,
+    dan sama di semua pipeline (process_local.py & mining_objaverse.py)
+    """
+    return random.Random(SEED ^ zlib.crc32(asset_id.encode("utf-8")))
+
+def file_rng(file_path):
+    """
+    RNG per file. File Objaverse (<UID>.glb) -> ID aset = UID, sama dengan mining_objaverse.py.
+    File lain -> ID aset = cache_key (path relatif), sehingga file bernama sama di folder
+    berbeda (mis. */scene.gltf) tidak mendapat kolom simulasi yang identik.
+    """
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return asset_rng(stem if OBJAVERSE_UID.fullmatch(stem) else cache_key(file_path))
+
+def simulate_row(poly, vert, rng):
+    """Kolom simulasi Mat/Tex/Rig + label heuristik -> [Poly, Vert, Mat, Tex, Rig, Label]"""
+    # Estimasi Material & Label
+    mat = max(1, int(poly / 5000)) + rng.randint(0, 2)
+    label, price = get_smart_label_and_price(poly, rng)
+
+    # Simulasi Texture & Rig (dipertahankan agar distribusi dataset tetap sama)
+    tex = rng.randint(1, 5) if label != "Low-Poly" else 1
+    rig = 1 if label == "High-Poly" and rng.random() > 0.5 else 0
+    return [poly, vert, mat, tex, rig, label]
+
+class FileTimeout(Exception):
+    pass
+
+def _on_alarm(signum, frame):
+    raise FileTimeout()
+
+def extract_features(file_path, timeout=None):
+    """
+    Ekstraksi satu file -> (file_path, entry atau None, pesan error atau None, sha256).
+    Dijalankan di proses worker; timeout dihentikan rapi dengan SIGALRM jika tersedia (POSIX).
+    Batas keras di semua OS ditegakkan run_extraction (worker di-terminate).
+    """
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        digest = file_hash(file_path)  # Dihitung di worker, dipakai sebagai key isi di cache
+
+        # Hitung streaming (OBJ per chunk, GLB/glTF dari chunk JSON) -> geometri tidak dimuat ke RAM
+        # triangulate: poly = segitiga seperti dataset lama (trimesh), bukan n-gon ala Blender
+        counts = count_file(file_path, triangulate=True)
+        poly = counts.poly
+        vert = counts.vert
+
+        # Skip file kosong/rusak
+        if poly == 0: return file_path, None, None, digest
+
+        # [Poly, Vert, Mat, Tex, Rig, Label]
+        return file_path, simulate_row(poly, vert, file_rng(file_path)), None, digest
+
+    except FileTimeout:
+        return file_path, None, f"timeout > {timeout}s", None
+    except Exception as e:
+        return file_path, None, str(e), None
+    finally:
+        if use_alarm: signal.setitimer(signal.ITIMER_REAL, 0)
+
+def run_extraction(all_files, workers=WORKERS, timeout=FILE_TIMEOUT, cache=None, extract=extract_features):
+    """
+    Ekstraksi semua file (serial atau paralel). Hasil selalu dikembalikan dalam urutan
+    all_files sehingga output identik berapa pun jumlah worker.
+    Jika cache diberikan, setiap file yang selesai langsung ditulis ke cache (append),
+    sehingga run yang terputus bisa dilanjutkan. File error/timeout tidak di-cache.
+    Deadline per file dihitung sejak file mulai diproses worker; worker yang melewatinya
+    di-terminate & diganti, sehingga file berikutnya tetap jalan (juga di Windows).
+    """
+    total_files = len(all_files)
+    results = {}
+    done = 0
+
+    def report(file_path, entry, error, digest=None):
+        nonlocal done
+        done += 1
+        results[file_path] = entry
+        if cache is not None and error is None:
+            cache.record(cache_key(file_path), entry, file_path, digest)
+        name = os.path.basename(file_path)
+        if entry: print(f"[{done}/{total_files}] OK: {name} -> {entry[-1]}")
+        elif error: print(f"[{done}/{total_files}] SKIP: {name} ({error})")
+        else: print(f"[{done}/{total_files}] SKIP: {name} (kosong)")
+
+    if workers <= 1 and not timeout:
+        for file_path in all_files:
+            report(*extract(file_path, timeout))
+    else:
+        # Worker dulu berhenti sendiri via SIGALRM (POSIX); KILL_GRACE = batas keras di sisi induk
+        deadline = timeout + KILL_GRACE if timeout else None
+        with DeadlinePool(extract, workers, timeout=deadline) as pool:
+            for file_path in all_files: pool.submit(file_path, file_path, timeout)
+            while len(pool):
+                for file_path, status, value in pool.poll():
+                    if status == OK: report(*value)
+                    elif status == TIMEOUT: report(file_path, None, f"timeout > {timeout}s")
+                    else: report(file_path, None, f"worker {status}: {value}")
+
+    return [results[f] for f in all_files if results.get(f)]
+
 def main():
     if "GANTI_DENGAN" in SOURCE_FOLDER:
         print("ERROR: Yang Mulia, Anda belum mengganti SOURCE_FOLDER di dalam script!")
         return
 
+    # Jumlah worker bisa di-override: python process_local.py --workers 8
+    workers = WORKERS
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
     print(f"Membaca file dari: {SOURCE_FOLDER}")
-    
+
     # Cari semua file GLB/OBJ/GLTF secara rekursif
     all_files = []
     for root, dirs, files in os.walk(SOURCE_FOLDER):
         for file in files:
             if file.lower().endswith(('.glb', '.gltf', '.obj')):
                 all_files.append(os.path.join(root, file))
+    all_files.sort()  # Urutan stabil antar OS/filesystem
 
     total_files = len(all_files)
-    print(f"Ditemukan {total_files} file 3D. Memulai ekstraksi...")
+    print(f"Ditemukan {total_files} file 3D. Memulai ekstraksi ({workers} worker)...")
 
     if total_files == 0:
         print("GAGAL: Tidak ada file 3D ditemukan di folder tersebut. Cek path-nya lagi.")
         return
 
+    # Hanya file baru / berubah yang diekstrak ulang
+    cache = ExtractionCache(CACHE_FILE, version=EXTRACTOR_VERSION)
+    todo = [f for f in all_files if cache.lookup(cache_key(f), f) is MISS]
+    print(f"{total_files - len(todo)} file diambil dari cache, {len(todo)} file perlu diekstrak.")
+
+    try:
+        run_extraction(todo, workers, cache=cache)
+    finally:
+        cache.close()
+
     dataset = []
-    success_count = 0
-
-    for i, file_path in enumerate(all_files):
-        try:
-            # Load mesh
-            mesh = trimesh.load(file_path, force='mesh')
-            
-            # Handle Scene (jika file berisi banyak objek)
-            if isinstance(mesh, trimesh.Scene):
-                geoms = list(mesh.geometry.values())
-                if not geoms: continue
-                mesh = trimesh.util.concatenate(geoms)
-
-            poly = len(mesh.faces)
-            vert = len(mesh.vertices)
-            
-            # Skip file kosong/rusak
-            if poly == 0: continue
-
-            # Estimasi Material & Label
-            mat = max(1, int(poly / 5000)) + random.randint(0, 2)
-            label, price = get_smart_label_and_price(poly)
-            
-            # Simulasi Texture & Rig (karena trimesh terbatas bacanya)
-            tex = random.randint(1, 5) if label != "Low-Poly" else 1
-            rig = 1 if label == "High-Poly" and random.random() > 0.5 else 0
-            
-            # [Poly, Vert, Mat, Tex, Rig, Label]
-            entry = [poly, vert, mat, tex, rig, label]
-            dataset.append(entry)
-            
-            success_count += 1
-            print(f"[{success_count}/{total_files}] OK: {os.path.basename(file_path)} -> {label}")
-
-        except Exception as e:
-            print(f"[SKIP] Error membaca {os.path.basename(file_path)}")
-
-    # Simpan JSON
+    for file_path in all_files:
+        row = cache.lookup(cache_key(file_path))
+        if row is not MISS and row is not None: dataset.append(row)
+    # Buang entri file yang sudah tidak ada di SOURCE_FOLDER
+    cache.compact(keep=[cache_key(f) for f in all_files])
+
+    # Simpan dataset biner (atomik)
     if len(dataset) > 0:
-        with open(OUTPUT_FILE, 'w') as f:
-            json.dump(dataset, f, indent=2)
+        save_rows(OUTPUT_FILE, dataset)
         print("\n" + "="*40)
         print(f"SELESAI! {len(dataset)} data berhasil diekstrak ke {OUTPUT_FILE}")
-        print("Pindahkan file JSON ini ke folder backend Anda.")
+        print("Pindahkan file dataset ini ke folder backend Anda.")
         print("="*40)
     else:
         print("GAGAL TOTAL: Tidak ada data yang berhasil diekstrak.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,118 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+import model_artifact
+from extraction_cache import file_hash
+from knn_engine import IVF_N_PROBE
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, "result_cache")
+MAX_BYTES = 512 << 20        # Batas total ukuran cache di disk (LRU dibuang jika lewat)
+RESULT_FILE = "result.json"
+PREVIEW_FILE = "preview.glb"
+
+def model_version(dataset_path, condense=None, backend="auto", n_probe=IVF_N_PROBE):
+    """
+    Versi model = versi format artefak + hash dataset latih + backend KNN -> hasil lama otomatis
+    tidak terpakai saat retrain. Backend exact (native/numpy/kdtree) memberi hasil identik -> satu versi;
+    ivf approximate -> hasil bergantung n_probe, tidak boleh tercampur dengan hasil exact.
+    """
+    artifact = model_artifact.load_artifact(dataset_path)
+    search = f"ivf{n_probe}" if backend == "ivf" else "exact"
+    version = f"v{model_artifact.ARTIFACT_VERSION}-{artifact.dataset_hash[:16]}-{search}"
+    return f"{version}-{condense}" if condense else version  # Data latih terkondensasi = model berbeda
+
+def _place(src, dst):
+    """Hardlink jika bisa (instan, aman terhadap eviction), selain itu salin"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+class ResultCache:
+    """
+    Cache hasil analisis berbasis isi file: key = sha256(isi upload) + ekstensi + versi model.
+    Tiap entri adalah folder <key>/ berisi result.json & preview.glb. mtime folder = waktu
+    akses terakhir; jika total ukuran melebihi max_bytes, entri paling lama tidak dipakai dibuang.
+    """
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def make_key(file_path, version):
+        ext = os.path.splitext(file_path)[1].lower()  # Importer (dan hasil hitung) bergantung pada format
+        return hashlib.sha256(f"{file_hash(file_path)}|{ext}|{version}".encode("utf-8")).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key, output_json_path, output_glb_path=None):
+        """
+        Cache hit -> tulis result.json (& preview) ke path output, return payload. Miss -> None.
+        Payload berisi filename & metrik analisis pertama; pemanggil menimpanya (lihat app.run_analysis).
+        """
+        entry = self._entry(key)
+        with self._lock:
+            try:
+                with open(os.path.join(entry, RESULT_FILE), 'r') as f: result = json.load(f)
+                if output_glb_path and os.path.exists(os.path.join(entry, PREVIEW_FILE)):
+                    _place(os.path.join(entry, PREVIEW_FILE), output_glb_path)
+                _place(os.path.join(entry, RESULT_FILE), output_json_path)
+                os.utime(entry)  # Tandai baru dipakai (LRU)
+            except (OSError, ValueError):
+                return None
+        return result
+
+    def put(self, key, result_json_path, preview_glb_path=None):
+        """Simpan hasil analisis yang sukses. Entri ditulis ke folder sementara lalu di-rename (atomik)."""
+        try:
+            with open(result_json_path, 'r') as f: result = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if result.get("status") != "success": return False  # Error bisa sementara (crash) -> jangan di-cache
+
+        entry = self._entry(key)
+        tmp = f"{entry}.{threading.get_ident()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        shutil.copyfile(result_json_path, os.path.join(tmp, RESULT_FILE))
+        if preview_glb_path and os.path.exists(preview_glb_path):
+            shutil.copyfile(preview_glb_path, os.path.join(tmp, PREVIEW_FILE))
+        with self._lock:
+            if os.path.exists(entry):
+                shutil.rmtree(tmp, ignore_errors=True)  # Sudah diisi job lain dengan file yang sama
+            else:
+                os.replace(tmp, entry)
+            self._evict()
+        return True
+
+    def size(self):
+        return sum(size for _, _, size in self._scan())
+
+    def _scan(self):
+        """(mtime, path, ukuran) semua entri lengkap"""
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.endswith(".tmp") or not os.path.isdir(path): continue
+            try:
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                entries.append((os.path.getmtime(path), path, size))
+            except OSError:
+                continue
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._scan())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes: break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
@@ -0,0 +1,188 @@
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource  # Hanya Unix; di Windows peak RSS tidak dilaporkan
+except ImportError:
+    resource = None
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS_LOG = os.path.join(BASE_DIR, "metrics.jsonl")   # Satu baris JSON per analisis (semua proses)
+MAX_LOG_BYTES = 4 << 20       # Lebih dari ini -> log diputar ke metrics.jsonl.1 (rolling, 1 cadangan)
+PROFILE_ENV = "POLYPIX_PROFILE"           # "1" -> cProfile per analisis
+TRACE_MEMORY_ENV = "POLYPIX_TRACEMALLOC"  # "1" -> peak alokasi Python per analisis (tracemalloc)
+PROFILE_TOP = 25              # Fungsi teratas (cumulative) yang disimpan di result.json
+
+def _env_flag(name):
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+def profiling_flags():
+    """Flag profiling dari environment proses ini (diteruskan ke worker Blender per job)"""
+    return {"profile": _env_flag(PROFILE_ENV), "trace_memory": _env_flag(TRACE_MEMORY_ENV)}
+
+class ProfilingFlags:
+    """
+    Flag profiling bersama satu proses server (panel admin), dijaga lock. Job mengambil
+    snapshot() saat disubmit dan meneruskannya eksplisit ke StageTimer / worker Blender,
+    sehingga os.environ tidak pernah diubah. Nilai awal dari environment.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flags = profiling_flags()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._flags)
+
+    def set(self, name, enabled):
+        with self._lock:
+            if name not in self._flags: raise KeyError(f"Flag profiling tidak dikenal: {name}")
+            self._flags[name] = bool(enabled)
+
+# --- 1. TIMER PER TAHAP ---
+class StageTimer:
+    """
+    Waktu per tahap satu analisis (ms, urut sesuai eksekusi). Dipakai sebagai context manager
+    di sekitar seluruh analisis -> cProfile & tracemalloc (opsional) aktif selama blok tsb.
+
+        timer = StageTimer()
+        with timer:
+            with timer.stage("load"): ...
+        payload["metrics"] = timer.report()
+
+    Tahap yang sama dipanggil berulang -> durasinya dijumlahkan.
+    """
+    def __init__(self, profile=None, trace_memory=None):
+        flags = profiling_flags()
+        self.profile = flags["profile"] if profile is None else profile
+        self.trace_memory = flags["trace_memory"] if trace_memory is None else trace_memory
+        self.stages = {}
+        self._start = None
+        self._elapsed = None
+        self._profiler = None
+        self._profile_text = None
+        self._py_peak = None
+        self._own_tracing = False
+
+    def record(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds * 1000
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def __enter__(self):
+        if self.trace_memory:
+            self._own_tracing = not tracemalloc.is_tracing()
+            if self._own_tracing: tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._elapsed = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+            self._profile_text = out.getvalue()
+            self._profiler = None
+        if self.trace_memory:
+            self._py_peak = tracemalloc.get_traced_memory()[1]
+            if self._own_tracing: tracemalloc.stop()
+        return False
+
+    def report(self):
+        """Dict untuk result.json["metrics"] & log metrik"""
+        report = {"stages": {name: round(ms, 3) for name, ms in self.stages.items()}}
+        if self._elapsed is not None: report["total_ms"] = round(self._elapsed * 1000, 3)
+        if self._py_peak is not None: report["py_peak_mb"] = round(self._py_peak / (1 << 20), 3)
+        rss = peak_rss_mb()
+        if rss is not None: report["rss_peak_mb"] = rss
+        if self._profile_text: report["profile"] = self._profile_text
+        return report
+
+def peak_rss_mb():
+    """Peak RSS proses (seumur proses, termasuk alokasi C Blender/numpy) atau None"""
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: byte
+    return round(peak / (1 << 20) if os.uname().sysname == "Darwin" else peak / 1024, 1)
+
+# --- 2. LOG METRIK (JSONL, rolling) ---
+def append_metrics(record, path=METRICS_LOG, max_bytes=MAX_LOG_BYTES):
+    """
+    Tambah satu record ke log. Satu write() per baris dengan mode append -> aman dipakai
+    bersamaan oleh worker Blender & app. Output profil tidak ikut (hanya di result.json).
+    """
+    record = {k: v for k, v in record.items() if k != "profile"}
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    try:
+        if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+            os.replace(path, path + ".1")
+        with open(path, 'a', encoding='utf-8') as f: f.write(line)
+    except OSError as e:
+        print(f"Warning: metrik tidak tersimpan ({e})")  # Metrik tidak boleh menggagalkan analisis
+
+def load_metrics(path=METRICS_LOG, limit=None):
+    """Record terbaru (cadangan .1 lalu log aktif, urut waktu); baris rusak dilewati"""
+    records = []
+    for p in (path + ".1", path):
+        try:
+            with open(p, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # Baris terpotong (mis. proses mati saat menulis)
+        except OSError:
+            continue
+    return records[-limit:] if limit else records
+
+def percentile(sorted_values, q):
+    """Persentil nearest-rank dari list terurut"""
+    if not sorted_values: return None
+    rank = max(1, -(-len(sorted_values) * q // 100))  # ceil(n * q / 100)
+    return sorted_values[int(rank) - 1]
+
+def summarize(records):
+    """
+    {tahap: {"count", "p50", "p95", "max"}} dalam ms; "total" = seluruh analisis.
+    Cache hit (cached=True) tidak dihitung: bukan waktu analisis.
+    """
+    samples = {}
+    for record in records:
+        if record.get("cached"): continue
+        for name, ms in record.get("stages", {}).items():
+            samples.setdefault(name, []).append(ms)
+        if "total_ms" in record: samples.setdefault("total", []).append(record["total_ms"])
+    summary = {}
+    for name, values in samples.items():
+        values.sort()
+        summary[name] = {"count": len(values), "p50": percentile(values, 50),
+                         "p95": percentile(values, 95), "max": values[-1]}
+    return summary
+
+def finish(timer, result_data, filename, backend, cached=False):
+    """Lampirkan metrik ke payload result.json lalu catat ke log metrik (cached=True: hasil dari cache)"""
+    metrics = timer.report()
+    if cached: metrics["cached"] = True
+    result_data["metrics"] = metrics
+    append_metrics(dict(metrics, time=time.time(), file=filename, backend=backend,
+                        status=result_data.get("status")))
+    return result_data
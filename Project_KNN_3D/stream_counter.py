@@ -0,0 +1,272 @@
+import os
+import re
+import sys
+import json
+import struct
+
+# --- KONFIGURASI ---
+CHUNK_SIZE = 8 << 20   # 8 MB per baca -> memori konstan berapa pun ukuran file OBJ
+
+# Kunci tekstur glTF (material PBR) & statement tekstur di file MTL
+GLTF_TEXTURE_KEYS = ("baseColorTexture", "metallicRoughnessTexture", "normalTexture",
+                     "occlusionTexture", "emissiveTexture")
+MTL_TEXTURE_KEYS = ("map_ka", "map_kd", "map_ks", "map_ke", "map_ns", "map_d", "map_bump",
+                    "bump", "disp", "decal", "refl", "norm", "map_pr", "map_pm")
+
+# glTF primitive.mode: 4 = TRIANGLES (default), 5 = TRIANGLE_STRIP, 6 = TRIANGLE_FAN, 0-3 = titik/garis
+GLTF_TRIANGLES, GLTF_STRIP, GLTF_FAN = 4, 5, 6
+
+# Statement OBJ yang jarang tapi perlu isinya (material & pemisah objek)
+_OBJ_META = re.compile(rb"\n(usemtl|mtllib|o)[ \t]+([^\r\n]*)")
+_OBJ_FACE = re.compile(rb"\nf[ \t]+([^\r\n]*)")   # Hanya dipakai mode triangulate (semantik dataset)
+
+class GeometryCounts:
+    """Hasil hitung streaming (poly, vert, material slot, tekstur unik, rig)"""
+    def __init__(self):
+        self.poly = 0
+        self.vert = 0
+        self.mat = 0
+        self.tex = 0
+        self.rig = 0
+        # Instancing: poly/vert dihitung per objek, unique_* sekali per data mesh
+        self.objects = 0
+        self.mesh_data = 0
+        self.unique_poly = 0
+        self.unique_vert = 0
+
+    def to_features(self, features):
+        """Isi object ModelFeatures (backend_processor) dari hasil hitung"""
+        features.polygon_count = self.poly
+        features.vertex_count = self.vert
+        features.material_count = self.mat
+        features.texture_count = self.tex
+        features.rig_count = self.rig
+        features.object_count = self.objects
+        features.mesh_data_count = self.mesh_data
+        features.unique_polygon_count = self.unique_poly
+        features.unique_vertex_count = self.unique_vert
+        return features
+
+# --- 1. OBJ (scan prefix baris per chunk) ---
+def parse_mtl_textures(mtl_path):
+    """Nama material -> set file tekstur (map_Kd, bump, dst.) dari satu file MTL"""
+    result, current = {}, None
+    if not os.path.exists(mtl_path): return result
+    with open(mtl_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            parts = line.split()
+            if not parts: continue
+            key = parts[0].lower()
+            if key == "newmtl":
+                current = " ".join(parts[1:])
+                result[current] = set()
+            elif key in MTL_TEXTURE_KEYS and current is not None and len(parts) > 1:
+                result[current].add(parts[-1])  # Nama file ada di akhir (setelah opsi -s, -o, dst.)
+    return result
+
+def _count_positions(segment):
+    return segment.count(b"\nv ") + segment.count(b"\nv\t")
+
+def _count_uvs(segment):
+    return segment.count(b"\nvt ") + segment.count(b"\nvt\t")
+
+def count_obj(path, chunk_size=CHUNK_SIZE, triangulate=False):
+    """
+    Hitung 'v' (vertex), 'f' (polygon, n-gon = 1 seperti Blender), serta 'usemtl'/'mtllib'/'o'
+    dengan membaca file per chunk. Mode default: memori konstan, tidak ada geometri yang di-decode.
+    Material slot = material unik per objek ('o'), tekstur = file map_* unik dari MTL.
+
+    triangulate=True -> semantik dataset (sama dengan ekstraksi lama via trimesh):
+    face n-vertex = n-2 segitiga, vertex = pasangan unik (v, vt) yang dipakai face
+    (vertex dipisah di seam UV). Mode ini menyimpan satu int per vertex unik.
+    """
+    counts = GeometryCounts()
+    objects = [set()]
+    n_objects = [0]   # Statement 'o'
+    mtllibs = []
+    seen = [0, 0]     # Jumlah 'v' & 'vt' sejauh ini (untuk indeks negatif/relatif)
+    corners = set()   # (v, vt) unik -> v << 32 | vt
+
+    def scan_faces(segment):
+        pos = 0
+        for m in _OBJ_FACE.finditer(segment):
+            gap = segment[pos:m.start()]
+            seen[0] += _count_positions(gap)
+            seen[1] += _count_uvs(gap)
+            pos = m.end()
+            refs = m.group(1).split()
+            counts.poly += max(0, len(refs) - 2)
+            for ref in refs:
+                parts = ref.split(b"/")
+                v = int(parts[0])
+                vt = int(parts[1]) if len(parts) > 1 and parts[1] else 0
+                if v < 0: v += seen[0] + 1
+                if vt < 0: vt += seen[1] + 1
+                corners.add(v << 32 | vt)
+        tail = segment[pos:]
+        seen[0] += _count_positions(tail)
+        seen[1] += _count_uvs(tail)
+
+    def scan(segment):
+        # segment selalu diawali "\n" -> setiap awal baris bisa dicari sebagai "\n<prefix>"
+        if triangulate:
+            scan_faces(segment)
+        else:
+            counts.vert += _count_positions(segment)
+            counts.poly += segment.count(b"\nf ") + segment.count(b"\nf\t")
+        if b"\nusemtl" in segment or b"\nmtllib" in segment or b"\no" in segment:
+            for m in _OBJ_META.finditer(segment):
+                key, value = m.group(1), m.group(2).decode("utf-8", "replace").strip()
+                if key == b"usemtl":
+                    objects[-1].add(value)
+                elif key == b"o":
+                    n_objects[0] += 1
+                    if objects[-1]: objects.append(set())
+                else:
+                    mtllibs.extend(value.split())
+
+    carry = b"\n"
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk: break
+            data = carry + chunk
+            cut = data.rfind(b"\n")
+            if cut <= 0:
+                carry = data
+                continue
+            scan(data[:cut])
+            carry = data[cut:]  # Baris terakhir yang belum lengkap -> chunk berikutnya
+    scan(carry)
+    if triangulate: counts.vert = len(corners)
+
+    base = os.path.dirname(path)
+    mtl_textures = {}
+    for name in mtllibs:
+        mtl_textures.update(parse_mtl_textures(os.path.join(base, name)))
+
+    images = set()
+    for used in objects:
+        counts.mat += len(used)
+        for name in used:
+            images |= mtl_textures.get(name, set())
+    counts.tex = len(images)
+    # OBJ tidak punya instancing: setiap objek punya geometri sendiri
+    counts.objects = counts.mesh_data = max(1, n_objects[0])
+    counts.unique_poly, counts.unique_vert = counts.poly, counts.vert
+    return counts
+
+# --- 2. GLB / glTF (baca chunk JSON saja, buffer biner tidak disentuh) ---
+def read_gltf_json(path):
+    """Ambil dokumen JSON glTF (dari chunk pertama GLB atau file .gltf) tanpa membaca buffer"""
+    with open(path, 'rb') as f:
+        if os.path.splitext(path)[1].lower() == ".gltf":
+            return json.loads(f.read().decode("utf-8"))
+        magic, version, length = struct.unpack("<4sII", f.read(12))
+        if magic != b"glTF": raise ValueError("Bukan file GLB yang valid.")
+        chunk_len, chunk_type = struct.unpack("<II", f.read(8))
+        if chunk_type != 0x4E4F534A: raise ValueError("Chunk JSON GLB tidak ditemukan.")
+        return json.loads(f.read(chunk_len).decode("utf-8"))
+
+def gltf_material_stats(doc):
+    """
+    Hitung (material slot, tekstur unik, rig) ala Blender importer:
+    tiap node ber-mesh = satu objek, slot = material unik pada primitive mesh tsb.
+    """
+    meshes = doc.get("meshes", [])
+    materials = doc.get("materials", [])
+    textures = doc.get("textures", [])
+
+    material_count = 0
+    used_materials = set()
+    mesh_materials = {}   # Mesh yang di-instance banyak node dibaca sekali
+    has_rig = False
+    for node in doc.get("nodes", []):
+        if "skin" in node: has_rig = True
+        if "mesh" not in node: continue
+        mats = mesh_materials.get(node["mesh"])
+        if mats is None:
+            mats = mesh_materials[node["mesh"]] = {p["material"] for p in meshes[node["mesh"]].get("primitives", [])
+                                                   if "material" in p}
+            used_materials |= mats
+        material_count += len(mats)
+
+    images = set()
+    for m in used_materials:
+        mat = materials[m]
+        infos = [mat.get(key) for key in GLTF_TEXTURE_KEYS]
+        infos += [mat.get("pbrMetallicRoughness", {}).get(key) for key in GLTF_TEXTURE_KEYS]
+        for info in infos:
+            if not info or info.get("index") is None: continue
+            source = textures[info["index"]].get("source")
+            if source is not None: images.add(source)
+
+    if doc.get("skins"): has_rig = True
+    return material_count, len(images), has_rig
+
+def _primitive_counts(prim, accessors):
+    """(polygon, vertex) satu primitive dari jumlah elemen accessor"""
+    vert = accessors[prim["attributes"]["POSITION"]]["count"] if "POSITION" in prim.get("attributes", {}) else 0
+    n = accessors[prim["indices"]]["count"] if "indices" in prim else vert
+    mode = prim.get("mode", GLTF_TRIANGLES)
+    if mode == GLTF_TRIANGLES: poly = n // 3
+    elif mode in (GLTF_STRIP, GLTF_FAN): poly = max(0, n - 2)
+    else: poly = 0
+    return poly, vert
+
+def count_gltf(path):
+    """
+    Poly/vert per node ber-mesh (instance dihitung per objek seperti Blender) + stats material.
+    Primitive glTF sudah berupa segitiga & vertex sudah terpisah per seam -> sama untuk kedua semantik.
+    """
+    doc = read_gltf_json(path)
+    accessors = doc.get("accessors", [])
+    meshes = doc.get("meshes", [])
+
+    mesh_counts = []
+    for mesh in meshes:
+        poly = vert = 0
+        for prim in mesh.get("primitives", []):
+            p, v = _primitive_counts(prim, accessors)
+            poly += p
+            vert += v
+        mesh_counts.append((poly, vert))
+
+    counts = GeometryCounts()
+    used = set()
+    for node in doc.get("nodes", []):
+        if "mesh" in node:
+            poly, vert = mesh_counts[node["mesh"]]
+            counts.poly += poly
+            counts.vert += vert
+            counts.objects += 1
+            used.add(node["mesh"])
+    counts.mesh_data = len(used)
+    counts.unique_poly = sum(mesh_counts[m][0] for m in used)
+    counts.unique_vert = sum(mesh_counts[m][1] for m in used)
+
+    counts.mat, counts.tex, rig = gltf_material_stats(doc)
+    counts.rig = 1 if rig else 0
+    return counts
+
+# --- 3. ENTRY POINT ---
+def count_file(path, triangulate=False):
+    """
+    OBJ / GLB / GLTF -> GeometryCounts (ValueError untuk format lain).
+    triangulate=True dipakai pipeline dataset (poly = segitiga, lihat count_obj);
+    analisis upload memakai semantik Blender (n-gon = 1 polygon).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".obj": return count_obj(path, triangulate=triangulate)
+    if ext in (".glb", ".gltf"): return count_gltf(path)
+    raise ValueError(f"Format tidak didukung stream counter: {ext}")
+
+def main():
+    # python stream_counter.py <file> [file ...]
+    for path in sys.argv[1:]:
+        c = count_file(path)
+        print(f"{os.path.basename(path)}: poly={c.poly} vert={c.vert} mat={c.mat} tex={c.tex} rig={c.rig} "
+              f"objects={c.objects} mesh_data={c.mesh_data} unique_poly={c.unique_poly} unique_vert={c.unique_vert}")
+
+if __name__ == "__main__":
+    main()
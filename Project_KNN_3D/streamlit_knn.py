@@ -0,0 +1,57 @@
+import os
+from dataset_format import load_dataset, resolve
+from knn_engine import KNNEngine
+from data_splitter import read_pair
+
+# --- CLASS KNN UNTUK STREAMLIT (Agar Tab 2 & 3 jalan tanpa Blender) ---
+class StreamlitKNN(KNNEngine):
+    """KNN Streamlit = engine bersama (knn_engine.py), sehingga akurasi di tab Evaluasi sama dengan produksi"""
+    INDEXES = {"brute": "numpy", "kdtree": "kdtree"}
+
+    def __init__(self, k=5, index="brute"):
+        # index: "brute" (scan penuh) atau "kdtree" (KD-Tree, hasil identik)
+        super().__init__(k, backend=self.INDEXES[index])
+        self.index = index
+
+    def fit(self, dataset_path):
+        # Artefak model (matriks ternormalisasi + Min-Max + label) di-memmap & di-cache per proses;
+        # otomatis dibangun ulang jika dataset berubah (mis. setelah Retrain & Reshuffle)
+        try:
+            super().fit(dataset_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+# --- FUNGSI EVALUASI (INI YANG HILANG TADI) ---
+def run_evaluation(test_file, train_file, index="brute"):
+    # Train & test dibaca sebagai satu pasangan (tidak tercampur dengan reshuffle yang sedang berjalan)
+    return read_pair(train_file, test_file, lambda train, test: _evaluate(test, train, index))
+
+def _evaluate(test_file, train_file, index):
+    knn = StreamlitKNN(k=5, index=index)
+    # Coba load data latih
+    if not knn.fit(train_file): 
+        return None, None, 0, 0
+    
+    # Coba load data uji
+    test_file = resolve(test_file)
+    if not os.path.exists(test_file):
+        return None, None, 0, 0
+        
+    # Kolom fitur & label langsung dari file .pds (tanpa float() per nilai)
+    test_data = load_dataset(test_file)
+    actual_labels = test_data.labels()
+    
+    correct = 0
+    labels = ["Low-Poly", "Medium-Poly", "High-Poly"]
+    matrix = {l: {l2: 0 for l2 in labels} for l in labels}
+    
+    # Satu panggilan batch untuk seluruh data uji (bukan loop predict per baris)
+    predictions, _, _ = knn.predict_batch(test_data.features())
+    for actual, predicted in zip(actual_labels, predictions):
+        if predicted == actual: correct += 1
+        if actual in labels and predicted in labels:
+            matrix[actual][predicted] += 1
+            
+    accuracy = (correct / len(test_data)) * 100
+    return matrix, labels, accuracy, len(test_data)
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import signal
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import batch_analyze
+import fast_analyzer
+
+def _analyze(path, timer=None):
+    """Pengganti fast_analyzer.analyze: 'hang' macet tanpa bisa diinterupsi SIGALRM, 'crash' mematikan worker"""
+    name = os.path.basename(path)
+    if name.startswith("hang"):
+        if hasattr(signal, "SIGALRM"): signal.signal(signal.SIGALRM, signal.SIG_IGN)
+        while True: time.sleep(60)
+    if name.startswith("crash"): os._exit(9)
+    if name.startswith("slow"): time.sleep(10)
+    return {"status": "success", "classification": "Low-Poly"}
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setattr(fast_analyzer, "analyze", _analyze)   # Diwarisi worker (fork)
+    monkeypatch.setattr(batch_analyze, "finish", lambda timer, result, *args, **kwargs: result)  # Log metrik asli tidak disentuh
+    monkeypatch.setattr(batch_analyze, "KILL_GRACE", 0.5)
+    return batch_analyze.BatchRunner(workers=2, retries=1, timeout=0.3)
+
+def _run(runner, names):
+    records = []
+    start = time.monotonic()
+    runner.run(names, records.append)
+    return {r["filename"]: r for r in records}, time.monotonic() - start
+
+def test_hung_and_crashed_assets_do_not_block(runner):
+    names = ["hang.obj", "crash.obj"] + [f"ok{i}.obj" for i in range(6)]
+    records, elapsed = _run(runner, names)
+    assert len(records) == len(names) and elapsed < 10
+    assert runner.summary["Low-Poly"] == 6 and runner.summary["error"] == 2
+    assert "timeout > 0.3s" in records["hang.obj"]["message"]
+    assert "crash" in records["crash.obj"]["message"]
+    assert runner.retried == 2
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="butuh setitimer (POSIX)")
+def test_subsecond_timeout_uses_itimer(runner):
+    records, elapsed = _run(runner, ["slow.obj"])
+    # alarm(int(0.3)) dulu = alarm(0) -> tidak pernah timeout; setitimer menghentikan di 0.3s
+    assert records["slow.obj"]["message"] == "Gagal setelah 2 percobaan: timeout > 0.3s"
+    assert elapsed < 5
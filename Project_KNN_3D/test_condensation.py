@@ -0,0 +1,64 @@
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from condensation import condense, condense_cnn, edit_enn, METHODS
+from knn_engine import KNNEngine, N_FEATURES, _tie_heavy_rows
+
+def _clustered_rows(n, seed):
+    """Tiga cluster yang saling tumpang tindih -> CNN membuang sebagian besar baris"""
+    rng = random.Random(seed)
+    centers = {"Low-Poly": 1000, "Medium-Poly": 20000, "High-Poly": 200000}
+    rows = []
+    for _ in range(n):
+        label = rng.choice(sorted(centers))
+        poly = int(centers[label] * rng.uniform(0.3, 2.5))
+        rows.append([poly, int(poly * rng.uniform(0.5, 1.5)), rng.randint(1, 4), rng.randint(0, 5),
+                     rng.randint(0, 1), label])
+    return rows
+
+CASES = {
+    "seri": _tie_heavy_rows(300, 0),
+    "cluster": _clustered_rows(400, 1),
+}
+
+def _min_max(rows):
+    return [(min(float(r[i]) for r in rows), max(float(r[i]) for r in rows)) for i in range(N_FEATURES)]
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("k", [1, 3, 5])
+@pytest.mark.parametrize("backend", ["native", "numpy"])
+def test_cnn_keeps_training_rows_correct(case, k, backend):
+    """Invarian Hart: setiap baris yang dibuang tetap diklasifikasi benar oleh prototipe (tie-break engine)"""
+    rows = CASES[case]
+    keep = condense_cnn(rows, k, seed=3)
+    dropped = [rows[i] for i in range(len(rows)) if i not in set(keep)]
+    assert dropped and len(keep) < len(rows)
+    labels, _, _ = KNNEngine(k, backend).fit_rows([rows[i] for i in keep]).predict_batch(dropped)
+    assert labels == [row[-1] for row in dropped]
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("case", CASES)
+def test_min_max_anchors_kept(method, case):
+    rows = CASES[case]
+    reduced = condense(rows, method, k=5)
+    assert _min_max(reduced) == _min_max(rows)
+    # Urutan asli dipertahankan (tie-break indeks konsisten dengan data penuh)
+    index = {id(r): i for i, r in enumerate(rows)}
+    positions = [index[id(r)] for r in reduced]
+    assert positions == sorted(positions)
+
+def test_cnn_respects_enn_candidates():
+    rows = CASES["cluster"]
+    candidates = set(edit_enn(rows))
+    keep = condense_cnn(rows, 5, candidates=candidates)
+    dropped = sorted(candidates - set(keep))
+    labels, _, _ = KNNEngine(5, "numpy").fit_rows([rows[i] for i in keep]).predict_batch([rows[i] for i in dropped])
+    assert labels == [rows[i][-1] for i in dropped]
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        condense(CASES["seri"], "lvq")
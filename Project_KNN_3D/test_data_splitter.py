@@ -0,0 +1,109 @@
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from data_splitter import split_stream, reshuffle, read_pair, split_id, SPLIT_RATIO
+from dataset_format import DatasetWriter, load_rows
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "objaverse_dataset.pds")
+
+def _rows(seed):
+    """Label tidak seimbang, termasuk kelas sangat kecil (5 & 1 baris)"""
+    rng = random.Random(seed)
+    sizes = {"High-Poly": 137, "Low-Poly": 88, "Medium-Poly": 412, "Rare": 5, "Single": 1}
+    rows = [[rng.randint(1, 10 ** 6), rng.randint(1, 10 ** 6), rng.randint(1, 9), rng.randint(0, 5),
+             rng.randint(0, 1), label] for label, n in sizes.items() for _ in range(n)]
+    rng.shuffle(rows)
+    return rows
+
+def _assert_stratified(counts, ratio):
+    for label, (n_train, n_test) in counts.items():
+        assert abs(n_test - (1 - ratio) * (n_train + n_test)) <= 1, label
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("ratio", [SPLIT_RATIO, 0.7, 0.5])
+def test_label_ratio_within_one_row(tmp_path, seed, ratio):
+    rows = _rows(seed)
+    train, test = str(tmp_path / "train.pds"), str(tmp_path / "test.pds")
+    counts = split_stream(rows, train, test, ratio, seed)
+    _assert_stratified(counts, ratio)
+    if ratio == SPLIT_RATIO: assert counts["Rare"] == [4, 1]   # 5 baris -> tepat 1 baris uji
+    assert sorted(map(tuple, load_rows(train) + load_rows(test))) == sorted(map(tuple, rows))
+
+@pytest.mark.skipif(not os.path.exists(DATASET), reason="objaverse_dataset.pds tidak ada")
+@pytest.mark.parametrize("seed", range(4))
+def test_dataset_split_stratified(tmp_path, seed):
+    counts = split_stream(load_rows(DATASET), str(tmp_path / "train.pds"), str(tmp_path / "test.pds"),
+                          SPLIT_RATIO, seed)
+    _assert_stratified(counts, SPLIT_RATIO)
+
+def test_split_is_reproducible(tmp_path):
+    rows = _rows(0)
+    outputs = []
+    for run in range(2):
+        train, test = str(tmp_path / f"train{run}.pds"), str(tmp_path / f"test{run}.pds")
+        split_stream(rows, train, test, SPLIT_RATIO, seed=3)
+        outputs.append((load_rows(train), load_rows(test)))
+    assert outputs[0] == outputs[1]
+
+def test_reshuffle_keeps_rows_and_ratio(tmp_path):
+    rows = _rows(1)
+    train, test = str(tmp_path / "train.pds"), str(tmp_path / "test.pds")
+    split_stream(rows, train, test)
+    before = load_rows(test)
+    counts = reshuffle(train, test, seed=7)
+    _assert_stratified(counts, SPLIT_RATIO)
+    assert load_rows(test) != before
+    assert sorted(map(tuple, load_rows(train) + load_rows(test))) == sorted(map(tuple, rows))
+
+def test_empty_input_keeps_outputs(tmp_path):
+    train, test = str(tmp_path / "train.pds"), str(tmp_path / "test.pds")
+    split_stream(_rows(2), train, test)
+    before = load_rows(train)
+    assert split_stream([], train, test) == {}
+    assert load_rows(train) == before
+
+def test_pair_shares_split_id(tmp_path):
+    train, test = str(tmp_path / "train.pds"), str(tmp_path / "test.pds")
+    split_stream(_rows(3), train, test)
+    first = split_id(train)
+    assert first and split_id(test) == first
+    reshuffle(train, test, seed=1)
+    assert split_id(train) == split_id(test) != first
+
+def test_failed_write_replaces_neither_file(tmp_path, monkeypatch):
+    train, test = str(tmp_path / "train.pds"), str(tmp_path / "test.pds")
+    split_stream(_rows(4), train, test)
+    before = (load_rows(train), load_rows(test), split_id(train))
+
+    def fail(self):
+        raise OSError("disk penuh")
+    monkeypatch.setattr(DatasetWriter, "prepare", fail)
+    with pytest.raises(OSError):
+        reshuffle(train, test, seed=9)
+    assert (load_rows(train), load_rows(test), split_id(train)) == before
+    assert sorted(os.listdir(tmp_path)) == ["test.pds", "train.pds"]   # File sementara ikut dibersihkan
+
+def test_read_pair_retries_across_reshuffle(tmp_path):
+    train, test = str(tmp_path / "train.pds"), str(tmp_path / "test.pds")
+    split_stream(_rows(5), train, test)
+    calls = []
+
+    def reader(train_path, test_path):
+        calls.append(split_id(train_path))
+        if len(calls) == 1: reshuffle(train, test, seed=2)   # Pasangan diganti di tengah pembacaan
+        return load_rows(train_path), load_rows(test_path)
+
+    rows_train, rows_test = read_pair(train, test, reader, wait=0)
+    assert len(calls) == 2 and calls[0] != calls[1]
+    assert (rows_train, rows_test) == (load_rows(train), load_rows(test))
+
+def test_read_pair_rejects_mixed_pair(tmp_path):
+    train, test = str(tmp_path / "train.pds"), str(tmp_path / "test.pds")
+    split_stream(_rows(6), train, test)
+    split_stream(_rows(6), str(tmp_path / "other.pds"), test)   # test dari split lain
+    with pytest.raises(RuntimeError):
+        read_pair(train, test, lambda a, b: None, retries=3, wait=0)
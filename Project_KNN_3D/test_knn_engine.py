@@ -0,0 +1,71 @@
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from knn_engine import KNNEngine, parity_report, incremental_report, _tie_heavy_rows
+from dataset_format import save_rows
+
+# Paritas antar backend = jaminan "hasil evaluasi sama dengan produksi" (lihat knn_engine.parity_report)
+BACKENDS = ["numpy", "kdtree", "ivf"]   # Dibandingkan dengan native; ivf memakai n_probe=None (semua cluster)
+INCREMENTAL_BACKENDS = ["native"] + BACKENDS
+
+def _duplicate_rows(n, seed):
+    """Hanya beberapa titik unik yang diulang -> jarak seri di semua posisi tetangga"""
+    rng = random.Random(seed)
+    base = [[100, 100, 1, 0, 0, "Low-Poly"], [100, 100, 1, 0, 0, "High-Poly"],
+            [5000, 5200, 3, 2, 1, "Medium-Poly"], [90000, 91000, 8, 4, 1, "High-Poly"]]
+    return [list(rng.choice(base)) for _ in range(n)]
+
+CASES = {
+    "seri": (_tie_heavy_rows(300, 0), _tie_heavy_rows(100, 100)),
+    "duplikat": (_duplicate_rows(200, 1), _duplicate_rows(50, 2)),
+    "k>n": (_tie_heavy_rows(3, 7), _tie_heavy_rows(10, 8)),
+}
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("k", [1, 5, 8])
+def test_backend_parity(case, k):
+    train, test = CASES[case]
+    assert parity_report(train, test, k, BACKENDS) == []
+
+@pytest.mark.parametrize("case", ["seri", "duplikat"])
+@pytest.mark.parametrize("k", [1, 5])
+def test_incremental_parity(case, k):
+    train, test = CASES[case]
+    assert incremental_report(train, test, k, INCREMENTAL_BACKENDS) == []
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_artifact_fit_matches_fit_rows(tmp_path, backend):
+    train, test = CASES["seri"]
+    path = str(tmp_path / "train.pds")
+    save_rows(path, train)
+    ref_labels, ref_idx, ref_dist = KNNEngine(5, "native").fit_rows(train).predict_batch(test)
+    labels, idx, dist = KNNEngine(5, backend, n_probe=None).fit(path).predict_batch(test)
+    assert labels == ref_labels
+    assert [list(r) for r in idx] == ref_idx
+    assert [[float(d) for d in r] for r in dist] == ref_dist
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_incremental_on_artifact(tmp_path, backend):
+    """partial_fit/remove pada model dari artefak: kelas baru & batas Min-Max bergeser"""
+    train, test = CASES["seri"]
+    path = str(tmp_path / "train.pds")
+    save_rows(path, train)
+    added = [[999999, 999999, 40, 9, 1, "Ultra"], [100, 100, 1, 0, 0, "Low-Poly"]]
+    engine = KNNEngine(5, backend, n_probe=None).fit(path).partial_fit(added).remove([0, 5])
+    current = [row for i, row in enumerate(train + added) if i not in (0, 5)]
+    reference = KNNEngine(5, "native").fit_rows(current)
+    assert engine.classes == reference.classes
+    assert engine.predict_batch(test)[0] == reference.predict_batch(test)[0]
+    # Artefak bersama tidak ikut berubah
+    assert KNNEngine(5, backend, n_probe=None).fit(path).n_rows == len(train)
+
+def test_remove_errors():
+    engine = KNNEngine(3, "numpy").fit_rows(_tie_heavy_rows(5, 3))
+    with pytest.raises(IndexError):
+        engine.remove([5])
+    with pytest.raises(ValueError):
+        engine.remove(range(5))
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import process_local
+from deadline_pool import DeadlinePool, OK, TIMEOUT, CRASH
+from stream_counter import count_file, count_obj
+
+# Quad + segitiga, seam UV (v2 dipakai dengan dua vt), indeks negatif
+OBJ = """v 0 0 0
+v 1 0 0
+v 1 1 0
+v 0 1 0
+v 2 0 0
+vt 0 0
+vt 1 0
+vt 1 1
+vt 0 1
+vt 0.5 0.5
+f 1/1 2/2 3/3 4/4
+f 2/5 5/2 -3/3
+f -5/1 -4/2 -2/4
+"""
+
+def _hanging_extract(file_path, timeout=None):
+    """Extractor yang sengaja macet (mengabaikan timeout, seperti loader yang hang di kode native)"""
+    if "hang" in file_path:
+        while True: time.sleep(60)
+    return file_path, [1000, 500, 1, 1, 0, "Low-Poly"], None, "digest"
+
+def _crashing(x):
+    if x == "crash": os._exit(3)
+    return x * 2
+
+def test_hung_file_is_killed_and_others_finish(monkeypatch, capsys):
+    monkeypatch.setattr(process_local, "KILL_GRACE", 0)
+    files = ["a_hang.obj", "b.obj", "c_hang.obj", "d.obj", "e.obj", "f.obj"]
+    start = time.monotonic()
+    rows = process_local.run_extraction(files, workers=2, timeout=0.5, extract=_hanging_extract)
+    elapsed = time.monotonic() - start
+    assert len(rows) == 4
+    # Dua file macet memakan kedua slot bersamaan; deadline dihitung sejak mulai, bukan sejak antre
+    assert elapsed < 5
+    out = capsys.readouterr().out
+    assert out.count("timeout > 0.5s") == 2 and out.count("OK:") == 4
+
+def test_serial_mode_has_deadline(monkeypatch):
+    monkeypatch.setattr(process_local, "KILL_GRACE", 0)
+    rows = process_local.run_extraction(["hang.obj", "ok.obj"], workers=1, timeout=0.3, extract=_hanging_extract)
+    assert len(rows) == 1
+
+def test_timeout_counts_from_task_start():
+    # Tiap task 0.3s, 1 worker, deadline 1s: task terakhir mulai setelah >1s antre tapi tetap OK
+    with DeadlinePool(time.sleep, 1, timeout=1) as pool:
+        statuses = [status for _, status, _ in pool.run([0.3] * 5)]
+    assert statuses == [OK] * 5
+
+def test_crash_only_fails_own_task():
+    with DeadlinePool(_crashing, 2, max_tasks=2) as pool:
+        results = {key: (status, value) for key, status, value in pool.run([1, "crash", 2, 3, 4, 5])}
+    assert results["crash"] == (CRASH, 3)
+    assert {k: v for k, (s, v) in results.items() if s == OK} == {1: 2, 2: 4, 3: 6, 4: 8, 5: 10}
+    assert TIMEOUT not in {s for s, _ in results.values()}
+
+@pytest.mark.parametrize("chunk_size", [7, 1 << 20])
+def test_obj_dataset_counts_triangles(tmp_path, chunk_size):
+    path = tmp_path / "quad.obj"
+    path.write_text(OBJ)
+    blender = count_file(str(path))
+    assert (blender.poly, blender.vert) == (3, 5)          # n-gon = 1 polygon (analisis upload)
+    dataset = count_obj(str(path), chunk_size=chunk_size, triangulate=True)
+    assert (dataset.poly, dataset.vert) == (4, 6)          # Semantik trimesh lama
+    assert process_local.extract_features(str(path))[1][:2] == [4, 6]
+    trimesh = pytest.importorskip("trimesh")
+    mesh = trimesh.load(str(path), force="mesh")
+    assert (len(mesh.faces), len(mesh.vertices)) == (dataset.poly, dataset.vert)
+
+def _rows_for(paths):
+    return [process_local.simulate_row(100000, 60000, process_local.file_rng(p)) for p in paths]
+
+def test_simulated_columns_seeded_per_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(process_local, "SOURCE_FOLDER", str(tmp_path))
+    # Nama file sama di folder berbeda -> seed dari path relatif, bukan nama file
+    paths = [str(tmp_path / f"asset{i}" / "scene.gltf") for i in range(8)]
+    rows = _rows_for(paths)
+    assert len({tuple(r) for r in rows}) > 1
+    assert rows == _rows_for(paths)   # Tetap deterministik
+
+def test_objaverse_files_seeded_by_uid(monkeypatch, tmp_path):
+    # File Objaverse: seed dari UID -> baris sama dengan mining_objaverse di folder mana pun
+    uid = "0123456789abcdef0123456789abcdef"
+    a, b = str(tmp_path / "x" / f"{uid}.glb"), str(tmp_path / "y" / f"{uid}.glb")
+    monkeypatch.setattr(process_local, "SOURCE_FOLDER", str(tmp_path))
+    expected = process_local.simulate_row(100000, 60000, process_local.asset_rng(uid))
+    assert _rows_for([a, b]) == [expected, expected]
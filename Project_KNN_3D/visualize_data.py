@@ -1,54 +1,155 @@
-import json
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+import io
+import os
+import argparse
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+from mpl_toolkits.mplot3d import Axes3D  # Registrasi projection='3d'
+
+from model_artifact import load_artifact
 
 # --- KONFIGURASI ---
-DATASET_FILE = "train_dataset.json"
+DATASET_FILE = "train_dataset.pds"
+MODES = ("auto", "full", "sample", "bin")
+FULL_LIMIT = 20_000          # auto: sampai jumlah ini semua titik digambar, di atasnya di-bin
+SAMPLE_PER_CLASS = 2_000     # sample: maks. titik acak per label (stratified)
+BINS = 24                    # bin: sel grid per sumbu (log poly x log vert x material)
+RENDER_VERSION = 1           # Naikkan jika tampilan berubah -> cache PNG lama tidak dipakai
+STYLE = {
+    "Low-Poly": {"c": "green", "m": "o"},
+    "Medium-Poly": {"c": "orange", "m": "^"},
+    "High-Poly": {"c": "red", "m": "x"},
+}
+
+# Sumbu X/Y (polygon, vertex) memakai log10(n) (n < 1 dihitung 1): aset ratusan sampai jutaan poligon terlihat
+# dalam satu grafik. Sumbu Z (material) tetap linear.
+
+# --- 1. AGREGASI DI SERVER ---
+def _points(artifact):
+    """(poly, vert, mat) mentah (N x 3) dari matriks artefak (memory-map, tanpa parse dataset)"""
+    lo = np.asarray(artifact.min_vals[:3], dtype=np.float64)
+    span = np.asarray(artifact.max_vals[:3], dtype=np.float64) - lo
+    raw = np.asarray(artifact.matrix[:, :3], dtype=np.float64) * span + lo
+    return np.rint(raw, out=raw)
+
+def _to_axes(raw):
+    out = raw.copy()
+    out[:, :2] = np.log10(np.maximum(out[:, :2], 1))
+    return out
+
+def aggregate(artifact, mode="auto", per_class=SAMPLE_PER_CLASS, bins=BINS, seed=0):
+    """
+    Titik per label siap gambar: {label: {"x", "y", "z", "n"}} (koordinat sumbu log).
+    full   : semua titik
+    sample : maks. per_class titik acak per label (seed tetap -> gambar stabil)
+    bin    : grid bins^3 per label; satu titik per sel terisi (rata-rata anggotanya), n = jumlah anggota
+    """
+    if mode == "auto": mode = "full" if artifact.n_rows <= FULL_LIMIT else "bin"
+    if mode not in MODES: raise ValueError(f"Mode visualisasi tidak dikenal: {mode}")
+    pts = _to_axes(_points(artifact))
+    codes = np.asarray(artifact.label_codes)
+    rng = np.random.default_rng(seed)
+
+    if mode == "bin":
+        lo, hi = pts.min(axis=0), pts.max(axis=0)
+        scale = np.where(hi > lo, (bins - 1e-9) / np.where(hi > lo, hi - lo, 1), 0)
+        cell = ((pts - lo) * scale).astype(np.int64)
+        flat = (cell[:, 0] * bins + cell[:, 1]) * bins + cell[:, 2]
+
+    groups = {}
+    for code, label in enumerate(artifact.classes):
+        idx = np.flatnonzero(codes == code)
+        if not len(idx): continue
+        if mode == "sample" and len(idx) > per_class:
+            idx = np.sort(rng.choice(idx, per_class, replace=False))
+        if mode == "bin":
+            keys, inverse, counts = np.unique(flat[idx], return_inverse=True, return_counts=True)
+            center = np.stack([np.bincount(inverse, weights=pts[idx, i], minlength=len(keys)) / counts
+                               for i in range(3)], axis=1)
+            groups[label] = {"x": center[:, 0], "y": center[:, 1], "z": center[:, 2], "n": counts}
+        else:
+            groups[label] = {"x": pts[idx, 0], "y": pts[idx, 1], "z": pts[idx, 2],
+                             "n": np.ones(len(idx), dtype=np.int64)}
+    return groups, mode
+
+# --- 2. RENDER ---
+def draw(fig, groups, binned=False, dark=False):
+    """Scatter 3D ke figure; mode bin -> ukuran marker ~ log(jumlah anggota sel)"""
+    ax = fig.add_subplot(111, projection='3d')
+    fg = 'white' if dark else 'black'
+    if dark:
+        ax.set_facecolor('#0E1117')
+        fig.patch.set_facecolor('#0E1117')
+
+    for label, grp in groups.items():
+        style = STYLE.get(label, {"c": "gray", "m": "o"})
+        size = 12 + 18 * np.log10(grp["n"]) if binned else 20
+        ax.scatter(grp["x"], grp["y"], grp["z"], s=size, c=style["c"], marker=style["m"],
+                   label=f"{label} ({int(grp['n'].sum()):,})", alpha=0.6)
+
+    log_ticks = FuncFormatter(lambda v, _: f"{10 ** v:,.0f}")
+    ax.xaxis.set_major_formatter(log_ticks)
+    ax.yaxis.set_major_formatter(log_ticks)
+    ax.set_xlabel('Polygon (log)', color=fg)
+    ax.set_ylabel('Vertex (log)', color=fg)
+    ax.set_zlabel('Material', color=fg)
+    for axis in ('x', 'y', 'z'): ax.tick_params(axis=axis, colors=fg)
+    ax.legend(facecolor='#262730' if dark else 'white', labelcolor=fg)
+    return ax
+
+def render_png(dataset_path, mode="auto", dark=True):
+    """
+    PNG scatter 3D untuk dataset_path. Disimpan di folder artefak model dengan hash dataset
+    di nama file -> rerun / sesi lain / restart server hanya membaca file; dataset berubah ->
+    render ulang (file lama dibersihkan saat artefak dibangun ulang).
+    """
+    artifact = load_artifact(dataset_path)
+    theme = "dark" if dark else "light"
+    path = os.path.join(artifact.path, f"vis-{mode}-{theme}-v{RENDER_VERSION}-{artifact.dataset_hash[:16]}.png")
+    try:
+        with open(path, 'rb') as f: return f.read()
+    except OSError:
+        pass
+
+    groups, used = aggregate(artifact, mode)
+    fig = Figure(figsize=(10, 6))   # Tanpa pyplot: aman dipanggil dari thread Streamlit
+    draw(fig, groups, binned=used == "bin", dark=dark)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=100, facecolor=fig.get_facecolor())
+    data = buf.getvalue()
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f: f.write(data)
+    os.replace(tmp, path)
+    return data
 
 def main():
+    parser = argparse.ArgumentParser(description="Visualisasi distribusi dataset (scatter 3D)")
+    parser.add_argument("--data", default=DATASET_FILE)
+    parser.add_argument("--mode", default="auto", choices=MODES)
+    parser.add_argument("--out", help="Simpan PNG ke file (default: tampilkan jendela)")
+    args = parser.parse_args()
+
     try:
-        with open(DATASET_FILE, 'r') as f:
-            data = json.load(f)
+        artifact = load_artifact(args.data)
     except FileNotFoundError:
         print("Dataset tidak ditemukan!")
         return
 
-    # Siapkan List untuk menampung data per kategori
-    # Struktur data: [Poly, Vert, Mat, Tex, Rig, Label]
-    groups = {
-        "Low-Poly": {"x": [], "y": [], "z": [], "c": "green", "m": "o"},
-        "Medium-Poly": {"x": [], "y": [], "z": [], "c": "orange", "m": "^"},
-        "High-Poly": {"x": [], "y": [], "z": [], "c": "red", "m": "x"}
-    }
-
-    print(f"Memvisualisasikan {len(data)} titik data...")
-
-    for row in data:
-        label = row[-1]
-        if label in groups:
-            # Sumbu X: Polygon Count (Dibagi 1000 biar angkanya kecil di grafik)
-            groups[label]["x"].append(row[0]) 
-            # Sumbu Y: Vertex Count
-            groups[label]["y"].append(row[1])
-            # Sumbu Z: Material Count
-            groups[label]["z"].append(row[2])
-
-    # Bikin Plot 3D
-    fig = plt.figure(figsize=(10, 8))
-    ax = fig.add_subplot(111, projection='3d')
-
-    for label, grp in groups.items():
-        ax.scatter(grp["x"], grp["y"], grp["z"], 
-                   c=grp["c"], marker=grp["m"], label=label, alpha=0.6)
+    if args.out:
+        with open(args.out, 'wb') as f: f.write(render_png(args.data, args.mode, dark=False))
+        print(f"Grafik disimpan ke {args.out}")
+        return
 
-    ax.set_xlabel('Polygon Count')
-    ax.set_ylabel('Vertex Count')
-    ax.set_zlabel('Material Count')
+    import matplotlib.pyplot as plt
+    groups, used = aggregate(artifact, args.mode)
+    print(f"Memvisualisasikan {artifact.n_rows} titik data (mode {used}, "
+          f"{sum(len(g['x']) for g in groups.values())} titik digambar)...")
+    fig = plt.figure(figsize=(10, 8))
+    ax = draw(fig, groups, binned=used == "bin")
     ax.set_title('Distribusi Data 3D: Clustering Low vs Med vs High')
-    ax.legend()
-
     print("Grafik berhasil dibuat. Simpan gambar yang muncul untuk Laporan Bab 4.")
     plt.show()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()